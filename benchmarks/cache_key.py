@@ -0,0 +1,81 @@
+"""Compare the cost of computing prediction cache keys.
+
+`freeze` is how the arguments used to be made hashable for `functools.lru_cache`,
+while `get_cache_key` is the canonical serialisation used by the PredictionCaches.
+
+Usage:
+    python benchmarks/cache_key.py
+"""
+
+from functools import _make_key  # type: ignore
+from timeit import repeat
+from typing import Any, Callable, Dict, List, Tuple
+
+from pydantic import BaseModel
+
+from great_ai.helper import freeze, get_cache_key
+
+
+class Document(BaseModel):
+    title: str
+    tags: List[str]
+    scores: Dict[str, float]
+
+
+def freeze_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> int:
+    return hash(
+        _make_key(
+            tuple(freeze(a) for a in args),
+            {k: freeze(v) for k, v in kwargs.items()},
+            typed=False,
+        )
+    )
+
+
+def canonical_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    return get_cache_key(args, kwargs)
+
+
+CASES: Dict[str, Tuple[Tuple[Any, ...], Dict[str, Any]]] = {
+    "scalar": (("Hello, World!",), {"language": "en"}),
+    "small JSON": (
+        ({"id": 3, "text": "lorem ipsum", "tags": ["a", "b", "c"]},),
+        {},
+    ),
+    "large JSON": (
+        (
+            {
+                f"key_{i}": {
+                    "values": list(range(20)),
+                    "text": "lorem ipsum dolor sit amet" * 4,
+                    "nested": {"a": i, "b": [str(i)] * 5},
+                }
+                for i in range(500)
+            },
+        ),
+        {},
+    ),
+    "pydantic": (
+        (
+            Document(
+                title="A title",
+                tags=["x", "y"],
+                scores={str(i): i / 3 for i in range(50)},
+            ),
+        ),
+        {},
+    ),
+}
+
+
+def measure(func: Callable, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> float:
+    number = 200
+    return min(repeat(lambda: func(args, kwargs), number=number, repeat=5)) / number
+
+
+if __name__ == "__main__":
+    print(f"{'case':<12}{'freeze (µs)':>14}{'canonical (µs)':>17}{'speed-up':>10}")
+    for name, (args, kwargs) in CASES.items():
+        old = measure(freeze_key, args, kwargs) * 1e6
+        new = measure(canonical_key, args, kwargs) * 1e6
+        print(f"{name:<12}{old:>14.1f}{new:>17.1f}{old / new:>9.1f}x")
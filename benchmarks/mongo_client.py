@@ -0,0 +1,88 @@
+"""Compare the per-save latency of MongoDbDriver with and without a pooled client.
+
+Previously, each operation created (and closed) its own MongoClient, thereby paying
+for the TCP/TLS handshake, server discovery, and starting the monitor threads. Now,
+each process reuses a single client with a pool of connections.
+
+Without a connection string, mongomock stands in for mongod; in that case, only the
+overhead of creating the clients is measured, not that of the network.
+
+Usage:
+    python benchmarks/mongo_client.py [connection_string] [database]
+"""
+
+import sys
+from statistics import median
+from time import perf_counter
+from typing import Any, Callable, List
+from unittest.mock import patch
+
+from great_ai import MongoDbDriver, Trace
+from great_ai.persistence import mongodb_driver
+
+SAVE_COUNT = 500
+
+
+def create_trace(i: int) -> Trace:
+    return Trace(
+        trace_id=f"{i:032x}",
+        created="2022-07-11T14:31:00",
+        original_execution_time_ms=1,
+        logged_values={"arg:text:value": f"document number {i}"},
+        models=[],
+        exception=None,
+        output=i,
+        tags=["benchmark", "online"],
+    )
+
+
+def save_with_new_client(trace: Trace) -> None:
+    serialized = trace.to_flat_dict()
+    serialized["_id"] = trace.trace_id
+
+    with mongodb_driver.MongoClient(MongoDbDriver.mongo_connection_string) as client:
+        client[MongoDbDriver.mongo_database].traces.insert_one(serialized)
+
+
+def measure(save: Callable[[Trace], Any], offset: int) -> List[float]:
+    latencies = []
+    for i in range(SAVE_COUNT):
+        trace = create_trace(offset + i)
+        start = perf_counter()
+        save(trace)
+        latencies.append(perf_counter() - start)
+    return latencies
+
+
+def run() -> None:
+    driver = MongoDbDriver()
+
+    old = measure(save_with_new_client, 0)
+    new = measure(driver.save, SAVE_COUNT)
+
+    print(f"{'client':<12}{'median (ms)':>14}{'p99 (ms)':>12}")
+    for name, latencies in [("per call", old), ("pooled", new)]:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{name:<12}{median(latencies) * 1000:>14.3f}{p99 * 1000:>12.3f}")
+    print(driver.connection_pool_statistics)
+
+    driver.delete_batch([create_trace(i).trace_id for i in range(SAVE_COUNT * 2)])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        MongoDbDriver.configure_credentials(
+            mongo_connection_string=sys.argv[1],
+            mongo_database=sys.argv[2] if len(sys.argv) > 2 else "great_ai_benchmark",
+        )
+        run()
+    else:
+        import mongomock
+
+        MongoDbDriver.configure_credentials(
+            mongo_connection_string="mongodb://localhost:27017",
+            mongo_database="great_ai_benchmark",
+        )
+        with patch.object(mongodb_driver, "MongoClient", mongomock.MongoClient):
+            run()
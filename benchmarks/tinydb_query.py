@@ -0,0 +1,109 @@
+"""Compare the in-memory query path of ParallelTinyDbDriver with its predecessor.
+
+The previous implementation parsed every matching document into a Trace, flattened
+it into a pandas DataFrame, filtered and sorted the DataFrame, and parsed the page
+back into Traces. `query_documents` evaluates the filters on the raw documents,
+sorts the page using a heap, and only parses the returned Traces.
+
+Usage:
+    python benchmarks/tinydb_query.py [count ...]
+"""
+
+import sys
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import pandas as pd
+
+from great_ai import Trace
+from great_ai.persistence.query_documents import query_documents
+from great_ai.views import Filter, Model, SortBy
+
+PAGE_SIZE = 50
+
+
+def create_document(i: int) -> Dict[str, Any]:
+    return Trace(
+        trace_id=f"{i:032x}",
+        created=f"2022-07-11T14:{i % 60:02}:00",
+        original_execution_time_ms=i % 97,
+        logged_values={"arg:text:value": f"document number {i}", "arg:n:value": i},
+        models=[Model(key="model", version=1)],
+        exception=None,
+        output={"label": i % 7, "confidence": i % 100 / 100},
+        feedback=None if i % 10 else i % 7,
+        tags=["f", "online"],
+    ).dict()
+
+
+def pandas_query(
+    documents: Sequence[Dict[str, Any]],
+    skip: int = 0,
+    take: int = PAGE_SIZE,
+    conjunctive_filters: Sequence[Filter] = [],
+    sort_by: Sequence[SortBy] = [],
+) -> Tuple[List[Trace], int]:
+    operator_mapping = {"=": "eq", "<": "lt", ">": "gt"}
+
+    df = pd.DataFrame([Trace.parse_obj(d).to_flat_dict() for d in documents])
+    for f in conjunctive_filters:
+        if f.operator == "contains":
+            df = df.loc[df[f.property].str.contains(f.value, case=False)]
+        else:
+            df = df.loc[getattr(df[f.property], operator_mapping[f.operator])(f.value)]
+
+    if sort_by:
+        df.sort_values(
+            [col.column_id for col in sort_by],
+            ascending=[col.direction == "asc" for col in sort_by],
+            inplace=True,
+        )
+
+    result = df.iloc[skip : skip + take]
+    return [Trace.parse_obj(trace) for _, trace in result.iterrows()], len(df)
+
+
+QUERIES: Dict[str, Dict[str, Any]] = {
+    "first page": {},
+    "filter": {
+        "conjunctive_filters": [Filter(property="arg:n:value", operator=">", value=10)]
+    },
+    "contains": {
+        "conjunctive_filters": [
+            Filter(property="arg:text:value", operator="contains", value="number 12")
+        ]
+    },
+    "sorted page": {
+        "skip": 100,
+        "sort_by": [
+            SortBy(column_id="original_execution_time_ms", direction="desc"),
+            SortBy(column_id="created", direction="asc"),
+        ],
+    },
+}
+
+
+def measure(func: Callable[..., Any], documents: List[Dict[str, Any]]) -> List[float]:
+    timings = []
+    for kwargs in QUERIES.values():
+        start = perf_counter()
+        func(documents, take=PAGE_SIZE, **kwargs)
+        timings.append(perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    counts = [int(c) for c in sys.argv[1:]] or [10000, 100000, 1000000]
+
+    print(
+        f"{'traces':>8} {'query':<12}{'pandas (ms)':>14}{'raw (ms)':>12}{'speed-up':>10}"
+    )
+    for count in counts:
+        documents = [create_document(i) for i in range(count)]
+        old = measure(pandas_query, documents)
+        new = measure(query_documents, documents)
+
+        for name, o, n in zip(QUERIES, old, new):
+            print(
+                f"{count:>8} {name:<12}{o * 1000:>14.1f}{n * 1000:>12.1f}{o / n:>9.1f}x"
+            )
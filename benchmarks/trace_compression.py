@@ -0,0 +1,102 @@
+"""Measure the compression ratio and CPU cost of TraceCompressor.
+
+The sample traces resemble those of a named-entity recogniser: a multi-kilobyte
+document as input and a token-level SequenceLabelingOutput. Each algorithm is run with
+a few thresholds; the sizes are those of the BSON documents stored by MongoDbDriver.
+zstd is skipped if the `zstandard` package is not installed.
+
+Usage:
+    python benchmarks/trace_compression.py [count]
+"""
+
+import sys
+from random import Random
+from string import ascii_lowercase
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import bson
+
+from great_ai import SequenceLabelingOutput, Trace
+from great_ai.persistence import trace_compressor
+from great_ai.persistence.trace_compressor import TraceCompressor
+from great_ai.views.outputs.sequence_labeling_output import LabeledToken
+
+VOCABULARY = [
+    "".join(Random(i).choices(ascii_lowercase, k=Random(-i).randint(2, 10)))
+    for i in range(5000)
+]
+
+
+def create_trace(i: int) -> Trace:
+    random = Random(i)
+    tokens = random.choices(VOCABULARY, k=600)
+    return Trace(
+        trace_id=f"{i:032x}",
+        created=f"2022-07-11T14:{i % 60:02}:00",
+        original_execution_time_ms=i % 97,
+        logged_values={
+            "arg:text:value": " ".join(tokens),
+            "arg:text:length": len(tokens),
+            "arg:language:value": "en",
+        },
+        models=[],
+        exception=None,
+        output=SequenceLabelingOutput(
+            labeled_tokens=[
+                LabeledToken(
+                    token=token,
+                    tag=random.choice(["B", "I", "O", "O", "O"]),
+                    confidence=round(random.random(), 4),
+                    explanation=None,
+                )
+                for token in tokens
+            ],
+            explanation=None,
+        ),
+        tags=["ner", "online", "production"],
+    )
+
+
+def measure(
+    documents: List[Dict[str, Any]], compressor: TraceCompressor
+) -> Tuple[int, float, float]:
+    start = perf_counter()
+    compressed = [compressor.compress(d) for d in documents]
+    compression_time = perf_counter() - start
+
+    start = perf_counter()
+    for c in compressed:
+        TraceCompressor.decompress(c)
+    decompression_time = perf_counter() - start
+
+    size = sum(len(bson.encode(c)) for c in compressed)
+    return size, compression_time, decompression_time
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    documents = [create_trace(i).dict() for i in range(count)]
+    original_size = sum(len(bson.encode(d)) for d in documents)
+
+    settings: List[Tuple[str, Optional[int]]] = [("none", None)]
+    for algorithm in ["zlib", "zstd"]:
+        if algorithm == "zstd" and trace_compressor.zstandard is None:
+            print("zstd: skipped, `pip install zstandard` to measure it")
+            continue
+        settings.extend((algorithm, threshold) for threshold in [256, 1024, 4096])
+
+    print(
+        f"{'algorithm':<10}{'threshold':>10}{'size (MB)':>11}{'ratio':>8}"
+        f"{'compress (µs/trace)':>22}{'decompress (µs/trace)':>24}"
+    )
+    for algorithm, threshold in settings:
+        size, compression_time, decompression_time = measure(
+            documents,
+            TraceCompressor(threshold, "zstd" if algorithm == "none" else algorithm),  # type: ignore
+        )
+        print(
+            f"{algorithm:<10}{str(threshold):>10}{size / 1e6:>11.2f}"
+            f"{original_size / size:>8.2f}{compression_time / count * 1e6:>22.1f}"
+            f"{decompression_time / count * 1e6:>24.1f}"
+        )
@@ -0,0 +1,85 @@
+"""Compare the size of the flat and the lean serialisation of traces.
+
+MongoDbDriver and SqliteDriver used to store `Trace.to_flat_dict`, which contains
+every non-numeric logged value twice (raw and pretty-printed) along with the display
+fields (`models_flat`, `output_flat`, etc.). They now store `Trace.dict` and only the
+display fields of the models, the output, the feedback, and the logged values (in
+`_flat`), which are filtered by. Hence, the saving comes from the other display fields
+(and the exception, which is no longer stored twice).
+
+The sample resembles the traces of a text classifier: a short document as input, a
+few metrics, and a `ClassificationOutput` with an explanation.
+
+Usage:
+    python benchmarks/trace_document_size.py [count]
+"""
+
+import json
+import sys
+from typing import Any, Callable, Dict
+
+import bson
+from pydantic.json import pydantic_encoder
+
+from great_ai import ClassificationOutput, Trace
+from great_ai.persistence.get_document_path import get_flat_fields
+from great_ai.views import Model, Span
+
+
+def create_trace(i: int) -> Trace:
+    text = " ".join(f"word{(i * j) % 997}" for j in range(40))
+    return Trace(
+        trace_id=f"{i:032x}",
+        created=f"2022-07-11T14:{i % 60:02}:00",
+        original_execution_time_ms=i % 97,
+        logged_values={
+            "arg:text:value": text,
+            "arg:text:length": len(text),
+            "metric:tokens": ["word", str(i % 13)] * 5,
+        },
+        models=[Model(key="classifier", version=3), Model(key="vectorizer", version=1)],
+        exception=None,
+        output=ClassificationOutput(
+            label=f"label-{i % 7}",
+            confidence=i % 100 / 100,
+            explanation=[f"word{(i * j) % 997}" for j in range(5)],
+        ),
+        feedback=None if i % 10 else f"label-{i % 7}",
+        tags=["classify", "online", "production"],
+        spans=[
+            Span(name="cache_lookup", start_ms=-0.1, duration_ms=0.1, depth=0),
+            Span(name="prediction", start_ms=0, duration_ms=i % 97, depth=0),
+        ],
+    )
+
+
+SERIALISERS: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "BSON (MongoDB)": lambda d: len(bson.encode(d)),
+    "JSON (SQLite)": lambda d: len(json.dumps(d, default=pydantic_encoder)),
+}
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    traces = [create_trace(i) for i in range(count)]
+
+    print(f"{'format':<16}{'flat (MB)':>12}{'lean (MB)':>12}{'reduction':>12}")
+    for name, get_size in SERIALISERS.items():
+        flat = sum(
+            get_size(json.loads(json.dumps(t.to_flat_dict(), default=pydantic_encoder)))
+            for t in traces
+        )
+        lean = sum(
+            get_size(
+                json.loads(
+                    json.dumps(
+                        {**t.dict(), "_flat": get_flat_fields(t.dict())},
+                        default=pydantic_encoder,
+                    )
+                )
+            )
+            for t in traces
+        )
+        print(
+            f"{name:<16}{flat / 1e6:>12.2f}{lean / 1e6:>12.2f}{1 - lean / flat:>11.1%}"
+        )
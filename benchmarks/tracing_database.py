@@ -0,0 +1,106 @@
+"""Compare the local tracing database drivers.
+
+The database is filled with `count` traces using `save_batch`, then the typical
+queries of the dashboard and the `/traces` endpoint are timed.
+
+Usage:
+    python benchmarks/tracing_database.py [count] [driver ...]
+
+For example, `python benchmarks/tracing_database.py 1000000 SqliteDriver` (filling
+ParallelTinyDbDriver with a million traces takes hours since the whole JSON file is
+rewritten on each insert).
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from great_ai import ParallelTinyDbDriver, SqliteDriver, Trace, TracingDatabaseDriver
+from great_ai.utilities import chunk
+from great_ai.views import Filter, SortBy
+
+DRIVERS: Dict[str, Tuple[Type[TracingDatabaseDriver], Dict[str, Any]]] = {
+    "ParallelTinyDbDriver": (ParallelTinyDbDriver, {"storage_mode": "json"}),
+    "ParallelTinyDbDriver-jsonl": (ParallelTinyDbDriver, {"storage_mode": "jsonl"}),
+    "SqliteDriver": (SqliteDriver, {}),
+}
+BATCH_SIZE = 10000
+START = datetime(2022, 1, 1)
+
+
+def create_trace(i: int) -> Trace:
+    return Trace(
+        trace_id=f"{i:032x}",
+        created=(START + timedelta(seconds=i)).isoformat(),
+        original_execution_time_ms=i % 100,
+        logged_values={"arg:text:value": f"document number {i}", "arg:text:length": i},
+        models=[],
+        exception=None,
+        output=i % 7,
+        feedback=None if i % 10 else i % 7,
+        tags=["f", "online" if i % 10 else "ground_truth", f"shard-{i % 16}"],
+    )
+
+
+QUERIES: Dict[str, Callable[[TracingDatabaseDriver, int], Any]] = {
+    "get": lambda db, count: db.get(f"{count // 2:032x}"),
+    "page of tag": lambda db, _: db.query(conjunctive_tags=["shard-3"], take=50),
+    "time range": lambda db, count: db.query(
+        since=START + timedelta(seconds=count // 2),
+        until=START + timedelta(seconds=count // 2 + 100),
+    ),
+    "has feedback": lambda db, _: db.query(has_feedback=True, take=50),
+    "filter": lambda db, _: db.query(
+        conjunctive_filters=[Filter(property="output", operator="=", value=3)],
+        take=50,
+    ),
+    "contains": lambda db, _: db.query(
+        conjunctive_filters=[
+            Filter(property="arg:text:value", operator="contains", value="number 12")
+        ],
+        take=50,
+    ),
+    "sorted page": lambda db, _: db.query(
+        sort_by=[SortBy(column_id="original_execution_time_ms", direction="desc")],
+        skip=100,
+        take=50,
+    ),
+}
+
+
+def benchmark(
+    driver_type: Type[TracingDatabaseDriver], attributes: Dict[str, Any], count: int
+) -> List[float]:
+    with TemporaryDirectory() as directory:
+        driver_type.path_to_db = Path(directory) / "traces"  # type: ignore
+        for key, value in attributes.items():
+            setattr(driver_type, key, value)
+        db = driver_type()
+
+        start = perf_counter()
+        for ids in chunk(range(count), chunk_size=BATCH_SIZE):
+            db.save_batch([create_trace(i) for i in ids])
+        timings = [perf_counter() - start]
+
+        for query in QUERIES.values():
+            start = perf_counter()
+            query(db, count)
+            timings.append(perf_counter() - start)
+
+        return timings
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    drivers = sys.argv[2:] or list(DRIVERS)
+
+    print(f"{'driver':<28}{'insert (s)':>12}" + "".join(f"{q:>14}" for q in QUERIES))
+    for name in drivers:
+        timings = benchmark(*DRIVERS[name], count)
+        print(
+            f"{name:<28}{timings[0]:>12.2f}"
+            + "".join(f"{t * 1000:>12.1f}ms" for t in timings[1:])
+        )
@@ -15,15 +15,33 @@ from .models.save_model import save_model
 from .models.use_model import use_model
 from .parameters.log_metric import log_metric
 from .parameters.parameter import parameter
+from .persistence.async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .persistence.generate_random_trace_id import generate_random_trace_id
+from .persistence.generate_time_ordered_trace_id import generate_time_ordered_trace_id
 from .persistence.mongodb_driver import MongoDbDriver
 from .persistence.parallel_tinydb_driver import ParallelTinyDbDriver
+from .persistence.sqlite_driver import SqliteDriver
 from .persistence.tracing_database_driver import TracingDatabaseDriver
+from .prediction_cache import (
+    InMemoryPredictionCache,
+    PredictionCache,
+    SqlitePredictionCache,
+)
 from .remote.call_remote_great_ai import call_remote_great_ai
 from .remote.call_remote_great_ai_async import call_remote_great_ai_async
 from .tracing.add_ground_truth import add_ground_truth
 from .tracing.delete_ground_truth import delete_ground_truth
+from .tracing.iter_ground_truth import iter_ground_truth
 from .tracing.query_ground_truth import query_ground_truth
-from .views import RouteConfig, Trace
+from .tracing.query_trace_statistics import query_trace_statistics
+from .views import (
+    PersistencePolicy,
+    QueryPlan,
+    RouteConfig,
+    Trace,
+    TraceStatistics,
+    WriteBehindConfig,
+)
 from .views.outputs.classification_output import ClassificationOutput
 from .views.outputs.multi_label_classification_output import (
     MultiLabelClassificationOutput,
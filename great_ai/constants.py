@@ -1,5 +1,6 @@
 from .large_file import LargeFileMongo, LargeFileS3
 from .persistence.mongodb_driver import MongoDbDriver
+from .persistence.sqlite_driver import SqliteDriver
 
 ENV_VAR_KEY = "ENVIRONMENT"
 PRODUCTION_KEY = "production"
@@ -8,6 +9,7 @@ DASHBOARD_PATH = "/dashboard"
 MONGO_CONFIG_PATHS = ["mongodb.ini", "mongo.ini", "mongo_db.ini", "mongo-db.ini"]
 DEFAULT_TRACING_DATABASE_CONFIG_PATHS = {
     MongoDbDriver: MONGO_CONFIG_PATHS,
+    SqliteDriver: ["sqlite.ini"],
 }
 
 DEFAULT_LARGE_FILE_CONFIG_PATHS = {
@@ -27,5 +29,10 @@ ONLINE_TAG_NAME = "online"
 
 SERVER_NAME = "GreatAI-Server"
 
+PREDICTION_SPAN_NAME = "prediction"
+CACHE_LOOKUP_SPAN_NAME = "cache_lookup"
+TOTAL_STAGE_NAME = "total"
+PERSISTENCE_STAGE_NAME = "persistence"
+
 SE4ML_WEBSITE = "https://se-ml.github.io/practices"
 LIST_ITEM_PREFIX = "  🔩 "
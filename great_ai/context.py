@@ -1,8 +1,9 @@
 import os
 import random
+from datetime import datetime
 from logging import DEBUG, Logger
 from pathlib import Path
-from typing import Any, Dict, Optional, Type, Union, cast
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type, Union, cast
 
 from pydantic import BaseModel
 
@@ -17,22 +18,39 @@ from .constants import (
     SE4ML_WEBSITE,
 )
 from .large_file import LargeFileBase, LargeFileLocal
+from .persistence.async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .persistence.generate_random_trace_id import generate_random_trace_id
 from .persistence.parallel_tinydb_driver import ParallelTinyDbDriver
+from .persistence.trace_aggregator import TraceAggregator
+from .persistence.trace_writer import TraceWriter
 from .persistence.tracing_database_driver import TracingDatabaseDriver
+from .prediction_cache import InMemoryPredictionCache, PredictionCache
 from .utilities import get_logger
-from .views import RouteConfig
+from .views import PersistencePolicy, RouteConfig, WriteBehindConfig
+from .views.execution_strategy import ExecutionStrategy
 
 
 class Context(BaseModel):
     version: Union[int, str]
     tracing_database: TracingDatabaseDriver
+    async_tracing_database: AsyncTracingDatabaseDriver
+    trace_writer: TraceWriter
+    trace_aggregator: TraceAggregator
+    persistence_policy: PersistencePolicy
+    indexed_fields: List[str]
+    trace_id_generator: Callable[[datetime], str]
     large_file_implementation: Type[LargeFileBase]
     is_production: bool
     logger: Logger
     should_log_exception_stack: bool
     prediction_cache_size: int
+    prediction_cache_factory: Type[PredictionCache]
+    prediction_cache_ttl_seconds: Optional[float]
+    prediction_cache_max_size_in_bytes: Optional[int]
     dashboard_table_size: int
     route_config: RouteConfig
+    sync_execution_strategy: ExecutionStrategy
+    sync_execution_max_workers: Optional[int]
 
     class Config:
         arbitrary_types_allowed = True
@@ -40,11 +58,21 @@ class Context(BaseModel):
     def to_flat_dict(self) -> Dict[str, Any]:
         return {
             "tracing_database": type(self.tracing_database).__name__,
+            "async_tracing_database": type(self.async_tracing_database).__name__,
+            "write_behind_persistence": self.trace_writer.statistics.is_write_behind,
+            "trace_sample_rate": self.persistence_policy.sample_rate,
+            "trace_retention_days": self.persistence_policy.retention_days,
+            "indexed_fields": self.indexed_fields,
+            "trace_id_generator": getattr(
+                self.trace_id_generator, "__name__", repr(self.trace_id_generator)
+            ),
             "large_file_implementation": self.large_file_implementation.__name__,
             "is_production": self.is_production,
             "should_log_exception_stack": self.should_log_exception_stack,
             "prediction_cache_size": self.prediction_cache_size,
+            "prediction_cache": self.prediction_cache_factory.__name__,
             "dashboard_table_size": self.dashboard_table_size,
+            "sync_execution_strategy": self.sync_execution_strategy,
         }
 
 
@@ -67,9 +95,18 @@ def configure(
     large_file_implementation: Optional[Type[LargeFileBase]] = None,
     should_log_exception_stack: Optional[bool] = None,
     prediction_cache_size: int = 512,
+    prediction_cache_factory: Type[PredictionCache] = InMemoryPredictionCache,
+    prediction_cache_ttl_seconds: Optional[float] = None,
+    prediction_cache_max_size_in_bytes: Optional[int] = None,
     disable_se4ml_banner: bool = False,
     dashboard_table_size: int = 50,
     route_config: RouteConfig = RouteConfig(),
+    write_behind_config: Optional[WriteBehindConfig] = None,
+    persistence_policy: PersistencePolicy = PersistencePolicy(),
+    indexed_fields: Sequence[str] = [],
+    trace_id_generator: Callable[[datetime], str] = generate_random_trace_id,
+    sync_execution_strategy: ExecutionStrategy = "inline",
+    sync_execution_max_workers: Optional[int] = None,
 ) -> None:
     """Set the global configuration used by the great-ai library.
 
@@ -95,10 +132,37 @@ def configure(
         should_log_exception_stack: Log the traces of unhandled exceptions.
         prediction_cache_size: Size of the LRU cache applied over the prediction
             functions.
+        prediction_cache_factory: PredictionCache implementation storing the cached
+            traces. Use `SqlitePredictionCache` to share the cache among the worker
+            processes of the same machine.
+        prediction_cache_ttl_seconds: Cached traces older than this are recomputed.
+            `None` means no expiration.
+        prediction_cache_max_size_in_bytes: Evict the least recently used traces when
+            the overall size of the (pickled) cached traces exceeds this limit. `None`
+            means only `prediction_cache_size` is enforced.
         disable_se4ml_banner: Turn off the warning about the importance of SE4ML best-
             practices.
         dashboard_table_size: Number of rows to display in the dashboard's table.
         route_config: Enable or disable specific HTTP API endpoints.
+        write_behind_config: Persist traces from a background thread in batches
+            instead of on the request path. `None` means saving each trace
+            synchronously.
+        persistence_policy: Sample the persisted traces while always keeping the
+            exceptions, the slow ones, and those with feedback; and delete them after
+            `retention_days`.
+        indexed_fields: Columns of the traces (for example, `arg:text:value` or
+            `metric:accuracy`) for which the tracing database creates secondary
+            indexes, so that the `/traces` endpoint can filter and sort by them
+            efficiently.
+        trace_id_generator: Function returning the trace_id of a new trace given its
+            creation time. Use `generate_time_ordered_trace_id` for IDs that sort by
+            time, which keeps the inserts of the databases' ID indexes local.
+        sync_execution_strategy: How the HTTP endpoints call synchronous prediction
+            functions. `inline` calls them on the event loop, `thread` and `process`
+            use a pool of workers so that slow predictions do not block other
+            requests.
+        sync_execution_max_workers: Size of the thread or process pool. `None` means
+            using the default of `concurrent.futures`.
     """
 
     global _context
@@ -109,6 +173,7 @@ def configure(
             "Configuration has been already initialised, overwriting.\n"
             + "Make sure to call `configure()` before importing your application code."
         )
+        _context.trace_writer.close()
 
     is_production = _is_in_production_mode(logger=logger)
 
@@ -118,6 +183,10 @@ def configure(
         tracing_database_factory, logger=logger
     )
     tracing_database = tracing_database_factory()
+    async_tracing_database = tracing_database.as_async()
+    if indexed_fields:
+        tracing_database.create_indexes(indexed_fields)
+    trace_aggregator = TraceAggregator(tracing_database, logger=logger)
 
     if not tracing_database.is_production_ready:
         message = f"""The selected tracing database ({
@@ -132,6 +201,19 @@ def configure(
     _context = Context(
         version=version,
         tracing_database=tracing_database,
+        async_tracing_database=async_tracing_database,
+        trace_writer=TraceWriter(
+            tracing_database,
+            logger=logger,
+            config=write_behind_config,
+            policy=persistence_policy,
+            async_database=async_tracing_database,
+            aggregator=trace_aggregator,
+        ),
+        trace_aggregator=trace_aggregator,
+        persistence_policy=persistence_policy,
+        indexed_fields=list(indexed_fields),
+        trace_id_generator=trace_id_generator,
         large_file_implementation=_initialize_large_file(
             large_file_implementation, logger=logger
         ),
@@ -141,8 +223,13 @@ def configure(
         if should_log_exception_stack is None
         else should_log_exception_stack,
         prediction_cache_size=prediction_cache_size,
+        prediction_cache_factory=prediction_cache_factory,
+        prediction_cache_ttl_seconds=prediction_cache_ttl_seconds,
+        prediction_cache_max_size_in_bytes=prediction_cache_max_size_in_bytes,
         dashboard_table_size=dashboard_table_size,
         route_config=route_config,
+        sync_execution_strategy=sync_execution_strategy,
+        sync_execution_max_workers=sync_execution_max_workers,
     )
 
     logger.info(f"GreatAI (v{__version__}): configured ✅")
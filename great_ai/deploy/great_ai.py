@@ -1,10 +1,14 @@
-from functools import lru_cache, wraps
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 from textwrap import dedent
+from time import perf_counter
 from typing import (
     Any,
     Awaitable,
     Callable,
     Generic,
+    Iterable,
     List,
     Optional,
     Sequence,
@@ -19,21 +23,31 @@ from fastapi import FastAPI
 from tqdm.cli import tqdm
 from typing_extensions import Literal  # <= Python 3.7
 
-from ..constants import DASHBOARD_PATH
+from ..constants import (
+    CACHE_LOOKUP_SPAN_NAME,
+    DASHBOARD_PATH,
+    PREDICTION_SPAN_NAME,
+)
 from ..context import get_context
-from ..external.async_lru import alru_cache
-from ..helper import freeze_arguments, get_function_metadata_store, snake_case_to_text
+from ..helper import get_cache_key, get_function_metadata_store, snake_case_to_text
 from ..models.use_model import model_versions
 from ..parameters.automatically_decorate_parameters import (
     automatically_decorate_parameters,
 )
+from ..prediction_cache import PredictionCache
 from ..tracing.tracing_context import TracingContext
-from ..utilities import parallel_map
+from ..utilities import async_parallel_map, chunk, parallel_map, unchunk
 from ..views import ApiMetadata, Trace
+from .micro_batcher import MicroBatcher
+from .prediction_executor import PredictionExecutor
+from .routes.bootstrap_batch_prediction_endpoint import (
+    bootstrap_batch_prediction_endpoint,
+)
 from .routes.bootstrap_dashboard import bootstrap_dashboard
 from .routes.bootstrap_docs_endpoints import bootstrap_docs_endpoints
 from .routes.bootstrap_feedback_endpoints import bootstrap_feedback_endpoints
 from .routes.bootstrap_meta_endpoints import bootstrap_meta_endpoints
+from .routes.bootstrap_metrics_endpoint import bootstrap_metrics_endpoint
 from .routes.bootstrap_prediction_endpoint import bootstrap_prediction_endpoint
 from .routes.bootstrap_trace_endpoints import bootstrap_trace_endpoints
 
@@ -44,12 +58,19 @@ V = TypeVar("V")
 class GreatAI(Generic[T, V]):
     """Wrapper for a prediction function providing the implementation of SE4ML best practices.
 
-    Provides caching (with argument freezing), a TracingContext during execution, the
-    scaffolding of HTTP endpoints using FastAPI and a dashboard using Dash.
+    Provides caching, a TracingContext during execution, the scaffolding of HTTP
+    endpoints using FastAPI and a dashboard using Dash.
 
     IMPORTANT: when a request is served from cache, no new trace is created. Thus, the
     same trace can be returned multiple times. If this is undesirable turn off caching
-    using `configure(prediction_cache_size=0)`.
+    using `configure(prediction_cache_size=0)`. The cache backend can be changed
+    through `configure(prediction_cache_factory=...)`, for instance, to share the
+    cached traces among multiple worker processes.
+
+    In batching mode (see `GreatAI.create`), the wrapped function is called with a list
+    of inputs. Single-item calls, the `/predict` endpoint and `process_batch` all take
+    care of collecting the inputs into batches and splitting the outputs into separate
+    traces. Batched predictions are not cached.
 
     Supports wrapping async and synchronous functions while also maintaining correct
     typing.
@@ -66,14 +87,54 @@ class GreatAI(Generic[T, V]):
     def __init__(
         self,
         func: Callable[..., Union[V, Awaitable[V]]],
+        *,
+        max_batch_size: Optional[int] = None,
+        max_batch_wait_ms: float = 10,
     ):
         """Do not call this function directly, use GreatAI.create instead."""
 
         func = automatically_decorate_parameters(func)
-        get_function_metadata_store(func).is_finalised = True
+        store = get_function_metadata_store(func)
+        store.is_finalised = True
+
+        self._max_batch_size = max_batch_size
+        self._max_batch_wait_ms = max_batch_wait_ms
+        self._batched_func: Optional[Callable[..., Any]] = None
+        self._uncached_func: Optional[Callable[..., Any]] = None
+
+        self.version = str(get_context().version)
+        flat_model_versions = ".".join(f"{k}-v{v}" for k, v in model_versions)
+        if flat_model_versions:
+            self.version += f"+{flat_model_versions}"
 
-        self._cached_func = self._get_cached_traced_function(func)
-        self._wrapped_func = wraps(func)(freeze_arguments(self._cached_func))
+        self._cache: Optional[PredictionCache] = None
+
+        if max_batch_size is None:
+            if get_context().prediction_cache_size > 0:
+                self._cache = get_context().prediction_cache_factory(
+                    f"{func.__name__}:{self.version}",
+                    max_size=get_context().prediction_cache_size,
+                    ttl_seconds=get_context().prediction_cache_ttl_seconds,
+                    max_size_in_bytes=get_context().prediction_cache_max_size_in_bytes,
+                )
+
+            self._wrapped_func = wraps(func)(
+                self._get_cached_traced_function(func, self._cache)
+            )
+            self._uncached_func = self._get_cached_traced_function(func, None)
+        else:
+            assert max_batch_size >= 1, "Batches have to contain at least one element"
+            if len(store.input_parameter_names) != 1:
+                raise ValueError(
+                    f"In batching mode, `{func.__name__}` must have exactly one input "
+                    + "parameter (receiving the list of inputs)."
+                )
+            store.is_batched = True
+
+            self._batched_func = self._get_batched_traced_function(func)
+            self._wrapped_func = wraps(func)(
+                self._get_single_item_function(func, self._batched_func)
+            )
 
         wraps(func)(self)
         self.__doc__ = (
@@ -81,11 +142,6 @@ class GreatAI(Generic[T, V]):
             + f"function.\n\n{dedent(self.__doc__ or '')}"
         )
 
-        self.version = str(get_context().version)
-        flat_model_versions = ".".join(f"{k}-v{v}" for k, v in model_versions)
-        if flat_model_versions:
-            self.version += f"+{flat_model_versions}"
-
         self.app = FastAPI(
             title=snake_case_to_text(self.__name__),
             version=self.version,
@@ -95,6 +151,10 @@ class GreatAI(Generic[T, V]):
             redoc_url=None,
         )
 
+        self.app.add_event_handler(
+            "shutdown", lambda: get_context().trace_writer.flush()
+        )
+
         self._bootstrap_rest_api()
 
     @overload
@@ -113,10 +173,26 @@ class GreatAI(Generic[T, V]):
     ) -> "GreatAI[Trace[V], V]":
         ...
 
+    @overload
     @staticmethod
     def create(
-        func: Union[Callable[..., Awaitable[V]], Callable[..., V]],
-    ) -> Union["GreatAI[Awaitable[Trace[V]], V]", "GreatAI[Trace[V], V]"]:
+        *,
+        max_batch_size: int,
+        max_batch_wait_ms: float = ...,
+    ) -> Callable[[Callable[..., Any]], "GreatAI[Any, Any]"]:
+        ...
+
+    @staticmethod
+    def create(
+        func: Optional[Union[Callable[..., Awaitable[V]], Callable[..., V]]] = None,
+        *,
+        max_batch_size: Optional[int] = None,
+        max_batch_wait_ms: float = 10,
+    ) -> Union[
+        "GreatAI[Awaitable[Trace[V]], V]",
+        "GreatAI[Trace[V], V]",
+        Callable[[Callable[..., Any]], "GreatAI[Any, Any]"],
+    ]:
         """Decorate a function by wrapping it in a GreatAI instance.
 
         The function can be typed, synchronous or async. If it has
@@ -128,6 +204,14 @@ class GreatAI(Generic[T, V]):
         while the original return value is available under the `.output`
         property.
 
+        Batching mode can be turned on by specifying `max_batch_size`. In this case,
+        the function must have a single input parameter which receives a list of
+        inputs and it has to return a list of outputs of the same length. Concurrent
+        requests to the `/predict` endpoint are collected into batches of at most
+        `max_batch_size` items, waiting at most `max_batch_wait_ms` for the batch to
+        fill up. Each item still gets its own Trace. This is beneficial for vectorised
+        models which are much cheaper to run on batches.
+
         For configuration options, see [great_ai.configure][].
 
         Examples:
@@ -148,16 +232,35 @@ class GreatAI(Generic[T, V]):
                 ...
             TypeError: type of a must be int; got str instead
 
+            >>> @GreatAI.create(max_batch_size=16)
+            ... def my_batched_function(values: List[int]) -> List[int]:
+            ...     return [v + 2 for v in values]
+            >>> my_batched_function(3).output
+            5
+
         Args:
             func: The prediction function that needs to be decorated.
+            max_batch_size: Turn on batching mode and limit the number of inputs given
+                to `func` at once.
+            max_batch_wait_ms: In batching mode, the maximum time a request waits for
+                others to arrive before its batch is processed.
 
         Returns:
-            A GreatAI instance wrapping `func`.
+            A GreatAI instance wrapping `func` or a decorator creating one if `func` is
+                not given.
         """
 
-        return GreatAI[Trace[V], V](
-            func,
-        )
+        def decorator(func: Callable[..., Any]) -> "GreatAI[Any, Any]":
+            return GreatAI[Trace[V], V](
+                func,
+                max_batch_size=max_batch_size,
+                max_batch_wait_ms=max_batch_wait_ms,
+            )
+
+        if func is None:
+            return decorator
+
+        return decorator(func)
 
     def __call__(self, *args: Any, **kwargs: Any) -> T:
         return self._wrapped_func(*args, **kwargs)
@@ -170,6 +273,7 @@ class GreatAI(Generic[T, V]):
         concurrency: Optional[int] = None,
         unpack_arguments: Literal[True],
         do_not_persist_traces: bool = ...,
+        use_event_loop: bool = ...,
     ) -> List[Trace[V]]:
         ...
 
@@ -181,6 +285,7 @@ class GreatAI(Generic[T, V]):
         concurrency: Optional[int] = None,
         unpack_arguments: Literal[False] = ...,
         do_not_persist_traces: bool = ...,
+        use_event_loop: bool = ...,
     ) -> List[Trace[V]]:
         ...
 
@@ -191,12 +296,19 @@ class GreatAI(Generic[T, V]):
         concurrency: Optional[int] = None,
         unpack_arguments: bool = False,
         do_not_persist_traces: bool = False,
+        use_event_loop: bool = False,
     ) -> List[Trace[V]]:
         """Map the wrapped function over a list of input_values (`batch`).
 
         A wrapper over [parallel_map][great_ai.utilities.parallel_map.parallel_map.parallel_map]
         providing type-safety and a progressbar through tqdm.
 
+        IO-bound `async` functions (for example, ones calling other services) are
+        better served by `use_event_loop=True`. In this case, instead of starting new
+        processes, the inputs are processed concurrently on a single event loop of the
+        current process using
+        [async_parallel_map][great_ai.utilities.parallel_map.async_parallel_map.async_parallel_map].
+
         Args:
             batch: A list of arguments for the original (wrapped) function. If the
                 function expects multiple arguments, provide a list of tuples and set
@@ -207,8 +319,25 @@ class GreatAI(Generic[T, V]):
                 giving them to the wrapped function.
             do_not_persist_traces: Don't save the traces in the database. Useful for
                 evaluations run part of the CI.
+            use_event_loop: Process the inputs of an `async` function on a single
+                event loop. `concurrency` limits the number of concurrent calls
+                (default: 16).
         """
 
+        is_asynchronous = get_function_metadata_store(self).is_asynchronous
+        if use_event_loop and not is_asynchronous:
+            raise ValueError(
+                "Only `async` functions can be processed using `use_event_loop=True`"
+            )
+
+        if self._batched_func is not None:
+            return self._process_batch_in_chunks(
+                [v[0] for v in batch] if unpack_arguments else batch,
+                concurrency=concurrency,
+                do_not_persist_traces=do_not_persist_traces,
+                use_event_loop=use_event_loop,
+            )
+
         wrapped_function = self._wrapped_func
 
         def inner(value: Any) -> T:
@@ -234,12 +363,16 @@ class GreatAI(Generic[T, V]):
                 ),
             )
 
+        if use_event_loop:
+            return cast(
+                List[Trace[V]],
+                _run_in_event_loop(inner_async, batch, concurrency=concurrency or 16),
+            )
+
         return list(
             tqdm(
                 parallel_map(
-                    inner_async
-                    if get_function_metadata_store(self).is_asynchronous
-                    else inner,
+                    inner_async if is_asynchronous else inner,
                     batch,
                     concurrency=concurrency,
                 ),
@@ -247,33 +380,281 @@ class GreatAI(Generic[T, V]):
             )
         )
 
+    def process_stream(
+        self,
+        stream: Iterable,
+        *,
+        chunk_size: int = 64,
+        concurrency: Optional[int] = None,
+        unpack_arguments: bool = False,
+        unordered: bool = False,
+        do_not_persist_traces: bool = False,
+    ) -> Iterable[Trace[V]]:
+        """Lazily map the wrapped function over a (possibly unbounded) stream of inputs.
+
+        Unlike [process_batch][great_ai.GreatAI.process_batch], the input is consumed
+        and the traces are yielded as the processing progresses, hence, the memory
+        usage does not depend on the length of `stream`. The traces are persisted by
+        the calling process in batches of `chunk_size` (using `save_batch`). The
+        results are not cached.
+
+        Args:
+            stream: An iterable of arguments for the original (wrapped) function. If the
+                function expects multiple arguments, provide tuples and set
+                `unpack_arguments=True`.
+            chunk_size: Number of inputs sent to a worker process at once and the
+                number of traces persisted together.
+            concurrency: Number of processes to start. Don't set it too much higher than
+                the number of available CPU cores.
+            unpack_arguments: Expect tuples and unpack them before giving them to the
+                wrapped function.
+            unordered: Yield the traces as soon as they are ready instead of preserving
+                the order of the inputs.
+            do_not_persist_traces: Don't save the traces in the database.
+
+        Yields:
+            The trace of the next processed input.
+        """
+
+        is_asynchronous = get_function_metadata_store(self).is_asynchronous
+
+        if self._batched_func is None:
+            traced_function = cast(Callable[..., Any], self._uncached_func)
+
+            def inner(value: Any) -> Any:
+                return (
+                    traced_function(*value, do_not_persist_traces=True)
+                    if unpack_arguments
+                    else traced_function(value, do_not_persist_traces=True)
+                )
+
+            async def inner_async(value: Any) -> Trace[V]:
+                return await inner(value)
+
+            traces: Iterable[Trace[V]] = parallel_map(
+                inner_async if is_asynchronous else inner,
+                stream,
+                chunk_size=chunk_size,
+                concurrency=concurrency,
+                unordered=unordered,
+            )
+        else:
+            batched_function = self._batched_func
+
+            def inner_batch(values: List[Any]) -> Any:
+                return batched_function(values, do_not_persist_traces=True)
+
+            async def inner_batch_async(values: List[Any]) -> List[Trace[V]]:
+                return await inner_batch(values)
+
+            traces = unchunk(
+                parallel_map(
+                    inner_batch_async if is_asynchronous else inner_batch,
+                    chunk(
+                        (v[0] for v in stream) if unpack_arguments else stream,
+                        chunk_size=cast(int, self._max_batch_size),
+                    ),
+                    chunk_size=max(1, chunk_size // cast(int, self._max_batch_size)),
+                    concurrency=concurrency,
+                    unordered=unordered,
+                )
+            )
+
+        for trace_chunk in chunk(tqdm(traces), chunk_size=chunk_size):
+            if not do_not_persist_traces:
+                get_context().trace_writer.save(trace_chunk)
+            yield from trace_chunk
+
+    def _process_batch_in_chunks(
+        self,
+        batch: Sequence,
+        *,
+        concurrency: Optional[int],
+        do_not_persist_traces: bool,
+        use_event_loop: bool,
+    ) -> List[Trace[V]]:
+        batched_function = cast(Callable[..., Any], self._batched_func)
+
+        def inner(values: List[Any]) -> List[Trace[V]]:
+            return batched_function(values, do_not_persist_traces=do_not_persist_traces)
+
+        async def inner_async(values: List[Any]) -> List[Trace[V]]:
+            return await batched_function(
+                values, do_not_persist_traces=do_not_persist_traces
+            )
+
+        chunks = list(chunk(batch, chunk_size=cast(int, self._max_batch_size)))
+
+        if use_event_loop:
+            return list(
+                unchunk(
+                    _run_in_event_loop(
+                        inner_async, chunks, concurrency=concurrency or 16
+                    )
+                )
+            )
+
+        return list(
+            tqdm(
+                unchunk(
+                    parallel_map(
+                        inner_async
+                        if get_function_metadata_store(self).is_asynchronous
+                        else inner,
+                        chunks,
+                        concurrency=concurrency,
+                    )
+                ),
+                total=len(batch),
+            )
+        )
+
     @staticmethod
-    def _get_cached_traced_function(
+    def _get_batched_traced_function(
         func: Callable[..., Union[V, Awaitable[V]]]
+    ) -> Callable[..., Union[List[Trace[V]], Awaitable[List[Trace[V]]]]]:
+        parameter_name = get_function_metadata_store(func).input_parameter_names[0]
+
+        def func_in_tracing_context_sync(
+            values: Sequence[Any], do_not_persist_traces: bool = False
+        ) -> List[Trace[V]]:
+            values = list(values)
+            if not values:
+                return []
+
+            with TracingContext[V](
+                func.__name__, do_not_persist_traces=do_not_persist_traces
+            ) as t:
+                try:
+                    with TracingContext.record_span(PREDICTION_SPAN_NAME):
+                        result = func(**{parameter_name: values})
+                    outputs = _get_batch_outputs(values, result)
+                except Exception as e:
+                    t.finalise_batch(parameter_name, values, exception=e)
+                    raise
+                return t.finalise_batch(parameter_name, values, outputs=outputs)
+
+        async def func_in_tracing_context_async(
+            values: Sequence[Any], do_not_persist_traces: bool = False
+        ) -> List[Trace[V]]:
+            values = list(values)
+            if not values:
+                return []
+
+            async with TracingContext[V](
+                func.__name__, do_not_persist_traces=do_not_persist_traces
+            ) as t:
+                try:
+                    with TracingContext.record_span(PREDICTION_SPAN_NAME):
+                        result = await cast(Callable[..., Awaitable], func)(
+                            **{parameter_name: values}
+                        )
+                    outputs = _get_batch_outputs(values, result)
+                except Exception as e:
+                    t.finalise_batch(parameter_name, values, exception=e)
+                    raise
+                return t.finalise_batch(parameter_name, values, outputs=outputs)
+
+        return (
+            func_in_tracing_context_async
+            if get_function_metadata_store(func).is_asynchronous
+            else func_in_tracing_context_sync
+        )
+
+    @staticmethod
+    def _get_single_item_function(
+        func: Callable[..., Union[V, Awaitable[V]]], batched_func: Callable[..., Any]
+    ) -> Callable[..., T]:
+        parameter_name = get_function_metadata_store(func).input_parameter_names[0]
+
+        def process_single_item_sync(
+            *args: Any, do_not_persist_traces: bool = False, **kwargs: Any
+        ) -> T:
+            value = args[0] if args else kwargs[parameter_name]
+            return batched_func([value], do_not_persist_traces=do_not_persist_traces)[0]
+
+        async def process_single_item_async(
+            *args: Any, do_not_persist_traces: bool = False, **kwargs: Any
+        ) -> T:
+            value = args[0] if args else kwargs[parameter_name]
+            return (
+                await batched_func([value], do_not_persist_traces=do_not_persist_traces)
+            )[0]
+
+        return cast(
+            Callable[..., T],
+            (
+                process_single_item_async
+                if get_function_metadata_store(func).is_asynchronous
+                else process_single_item_sync
+            ),
+        )
+
+    @staticmethod
+    def _get_cached_traced_function(
+        func: Callable[..., Union[V, Awaitable[V]]], cache: Optional[PredictionCache]
     ) -> Callable[..., T]:
-        @lru_cache(maxsize=get_context().prediction_cache_size)
         def func_in_tracing_context_sync(
             *args: Any,
             do_not_persist_traces: bool = False,
             **kwargs: Any,
         ) -> T:
-            with TracingContext[V](
-                func.__name__, do_not_persist_traces=do_not_persist_traces
-            ) as t:
-                result = func(*args, **kwargs)
-                return cast(T, t.finalise(output=result))
+            lookup_started_at = perf_counter()
+
+            def compute() -> Trace[V]:
+                with TracingContext[V](
+                    func.__name__, do_not_persist_traces=do_not_persist_traces
+                ) as t:
+                    if cache is not None:
+                        t.add_span(CACHE_LOOKUP_SPAN_NAME, lookup_started_at)
+                    with TracingContext.record_span(PREDICTION_SPAN_NAME):
+                        result = func(*args, **kwargs)
+                    return t.finalise(output=result)
+
+            if cache is None:
+                return cast(T, compute())
+
+            return cast(
+                T,
+                cache.get_or_compute(
+                    get_cache_key(
+                        args, {**kwargs, "do_not_persist_traces": do_not_persist_traces}
+                    ),
+                    compute,
+                ),
+            )
 
-        @alru_cache(maxsize=get_context().prediction_cache_size)
         async def func_in_tracing_context_async(
             *args: Any,
             do_not_persist_traces: bool = False,
             **kwargs: Any,
         ) -> T:
-            with TracingContext[V](
-                func.__name__, do_not_persist_traces=do_not_persist_traces
-            ) as t:
-                result = await cast(Callable[..., Awaitable], func)(*args, **kwargs)
-                return cast(T, t.finalise(output=result))
+            lookup_started_at = perf_counter()
+
+            async def compute() -> Trace[V]:
+                async with TracingContext[V](
+                    func.__name__, do_not_persist_traces=do_not_persist_traces
+                ) as t:
+                    if cache is not None:
+                        t.add_span(CACHE_LOOKUP_SPAN_NAME, lookup_started_at)
+                    with TracingContext.record_span(PREDICTION_SPAN_NAME):
+                        result = await cast(Callable[..., Awaitable], func)(
+                            *args, **kwargs
+                        )
+                    return t.finalise(output=result)
+
+            if cache is None:
+                return cast(T, await compute())
+
+            return cast(
+                T,
+                await cache.get_or_compute_async(
+                    get_cache_key(
+                        args, {**kwargs, "do_not_persist_traces": do_not_persist_traces}
+                    ),
+                    compute,
+                ),
+            )
 
         return cast(
             Callable[..., T],
@@ -289,8 +670,38 @@ class GreatAI(Generic[T, V]):
     ) -> None:
         route_config = get_context().route_config
 
+        executor = PredictionExecutor(
+            self._wrapped_func if self._batched_func is None else self._batched_func,
+            strategy=get_context().sync_execution_strategy,
+            max_workers=get_context().sync_execution_max_workers,
+        )
+        self.app.add_event_handler("shutdown", executor.shutdown)
+
+        micro_batcher = (
+            None
+            if self._batched_func is None
+            else MicroBatcher(
+                executor.run_without_blocking,
+                max_batch_size=cast(int, self._max_batch_size),
+                max_wait_ms=self._max_batch_wait_ms,
+            )
+        )
+
         if route_config.prediction_endpoint_enabled:
-            bootstrap_prediction_endpoint(self.app, self._wrapped_func)
+            bootstrap_prediction_endpoint(
+                self.app,
+                self._wrapped_func,
+                executor=executor,
+                micro_batcher=micro_batcher,
+            )
+
+        if route_config.batch_prediction_endpoint_enabled:
+            bootstrap_batch_prediction_endpoint(
+                self.app,
+                self._wrapped_func,
+                executor=executor,
+                micro_batcher=micro_batcher,
+            )
 
         if route_config.docs_endpoints_enabled:
             bootstrap_docs_endpoints(self.app)
@@ -308,10 +719,13 @@ class GreatAI(Generic[T, V]):
         if route_config.feedback_endpoints_enabled:
             bootstrap_feedback_endpoints(self.app)
 
+        if route_config.metrics_endpoint_enabled:
+            bootstrap_metrics_endpoint(self.app, self.__name__, self._cache)
+
         if route_config.meta_endpoints_enabled:
             bootstrap_meta_endpoints(
                 self.app,
-                self._cached_func,
+                self._cache,
                 ApiMetadata(
                     name=self.__name__,
                     version=self.version,
@@ -319,3 +733,39 @@ class GreatAI(Generic[T, V]):
                     configuration=get_context().to_flat_dict(),
                 ),
             )
+
+
+def _get_batch_outputs(inputs: Sequence[Any], outputs: Any) -> List[Any]:
+    if hasattr(outputs, "tolist"):
+        outputs = outputs.tolist()  # numpy arrays and the like
+
+    if not isinstance(outputs, Sequence) or len(outputs) != len(inputs):
+        raise ValueError(
+            "In batching mode, the function must return a list of outputs with the "
+            + "same length as its input"
+        )
+
+    return list(outputs)
+
+
+def _run_in_event_loop(
+    func: Callable[[Any], Awaitable[V]], values: Sequence[Any], concurrency: int
+) -> List[V]:
+    async def main() -> List[V]:
+        results: List[V] = []
+        with tqdm(total=len(values)) as progress:
+            async for result in async_parallel_map(
+                func, values, concurrency=concurrency
+            ):
+                results.append(result)
+                progress.update()
+        return results
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(main())
+
+    # the current thread's loop cannot be blocked, so a new one is started
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, main()).result()
@@ -0,0 +1,95 @@
+import asyncio
+import inspect
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar("T")
+V = TypeVar("V")
+
+
+class MicroBatcher(Generic[T, V]):
+    """Collect concurrent single-item requests into batches.
+
+    Items submitted from the same event loop are buffered until either
+    `max_batch_size` items are waiting or `max_wait_ms` has passed since the first
+    item of the batch arrived. Then, `process_batch` is called once with the list of
+    the buffered items and its results are distributed back to the awaiting callers.
+
+    `process_batch` should not block the event loop (for example, it can be
+    `PredictionExecutor.run_without_blocking`): while a batch is being processed, new
+    requests keep accumulating, therefore, the batch size adapts to the load.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Union[List[V], Awaitable[List[V]]]],
+        *,
+        max_batch_size: int,
+        max_wait_ms: float,
+    ) -> None:
+        assert max_batch_size >= 1, "Batches have to contain at least one element"
+        assert max_wait_ms >= 0, "The maximum waiting time cannot be negative"
+
+        self._process_batch = process_batch
+        self._max_batch_size = max_batch_size
+        self._max_wait_ms = max_wait_ms
+
+        self._pending: List[Tuple[T, "asyncio.Future[V]"]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # the event loop only keeps weak references to its tasks
+        self._tasks: Set["asyncio.Future[None]"] = set()
+
+    async def submit(self, value: T) -> V:
+        loop = asyncio.get_running_loop()
+        future: "asyncio.Future[V]" = loop.create_future()
+        self._pending.append((value, future))
+
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch = self._pending[: self._max_batch_size]
+        self._pending = self._pending[self._max_batch_size :]
+
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self._max_wait_ms / 1000, self._flush
+            )
+
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[T, "asyncio.Future[V]"]]) -> None:
+        try:
+            results: Any = self._process_batch([value for value, _ in batch])
+            if inspect.isawaitable(results):
+                results = await results
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
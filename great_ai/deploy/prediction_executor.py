@@ -0,0 +1,171 @@
+import asyncio
+import multiprocessing as mp
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from time import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+
+import dill
+
+from ..helper import get_function_metadata_store
+from ..tracing import TracingContext
+from ..views import Trace
+from ..views.execution_strategy import ExecutionStrategy
+
+T = TypeVar("T")
+
+QUEUE_WAIT_TIME_METRIC_NAME = "metric:queue_wait_time_ms"
+
+
+class PredictionExecutor:
+    """Run a prediction function without blocking the event loop.
+
+    `async` functions are simply awaited. Synchronous functions are either called
+    directly on the event loop (`inline`), or submitted to a bounded pool of threads
+    (`thread`) or processes (`process`). In the latter case, each process deserialises
+    its own copy of the function (and of the models it uses) when it is started.
+
+    When a pool is used, the time spent waiting for a free worker is logged into the
+    resulting trace under `metric:queue_wait_time_ms`; the execution time itself is
+    available as `original_execution_time_ms`. The traces created by the processes are
+    returned to and saved by the calling process.
+
+    Callers that must not block the event loop, for example, when running several
+    predictions concurrently, can use `run_without_blocking` which calls `inline`
+    functions in the default thread pool of the event loop.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Union[T, Awaitable[T]]],
+        *,
+        strategy: ExecutionStrategy = "inline",
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self._func = func
+        self._strategy = strategy
+        self._max_workers = max_workers
+        self._is_asynchronous = get_function_metadata_store(func).is_asynchronous
+
+        self._executor: Optional[Executor] = None
+        self._pid: Optional[int] = None
+
+    async def run(self, *args: Any, **kwargs: Any) -> Any:
+        if self._is_asynchronous:
+            return await cast(Callable[..., Awaitable], self._func)(*args, **kwargs)
+
+        if self._strategy == "inline":
+            return self._func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        if self._strategy == "thread":
+            return await loop.run_in_executor(
+                executor,
+                copy_context().run,
+                _execute,
+                self._func,
+                time(),
+                args,
+                kwargs,
+            )
+
+        result, exception, traces = await loop.run_in_executor(
+            executor, _execute_in_process, time(), args, kwargs
+        )
+        await TracingContext.save_traces(traces)
+
+        if exception is not None:
+            raise exception
+        return result
+
+    async def run_without_blocking(self, *args: Any, **kwargs: Any) -> Any:
+        if self._is_asynchronous or self._strategy != "inline":
+            return await self.run(*args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            None, copy_context().run, partial(self._func, *args, **kwargs)
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            if self._strategy == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix=f"great_ai_{_get_name(self._func)}",
+                )
+            else:
+                can_fork = "fork" in mp.get_all_start_methods()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._max_workers,
+                    mp_context=mp.get_context("fork" if can_fork else "spawn"),
+                    initializer=_set_process_function,
+                    # forked processes inherit the function, no need for serialisation
+                    initargs=(
+                        self._func
+                        if can_fork
+                        else dill.dumps(self._func, byref=True, recurse=False),
+                    ),
+                )
+
+        return self._executor
+
+
+def _execute(func: Callable[..., T], submitted_at: float, args: Any, kwargs: Any) -> T:
+    queue_wait_time_ms = round((time() - submitted_at) * 1000, 4)
+
+    with TracingContext.preset_values(
+        {QUEUE_WAIT_TIME_METRIC_NAME: queue_wait_time_ms}
+    ):
+        return func(*args, **kwargs)
+
+
+_process_function: Optional[Callable] = None
+
+
+def _set_process_function(func: Union[bytes, Callable]) -> None:
+    global _process_function
+    _process_function = dill.loads(func) if isinstance(func, bytes) else func
+
+
+def _execute_in_process(
+    submitted_at: float, args: Any, kwargs: Any
+) -> Tuple[Any, Optional[Exception], List[Trace]]:
+    """Return the result or the exception together with the traces to be saved.
+
+    The traces are saved by the parent process, so that they can be collected there
+    (see `TracingContext.collect_traces`).
+    """
+
+    assert _process_function is not None, "the worker has not been initialised"
+
+    with TracingContext.collect_traces(persist=False) as traces:
+        try:
+            result = _execute(_process_function, submitted_at, args, kwargs)
+        except Exception as e:
+            return None, e, traces
+
+    return result, None, traces
+
+
+def _get_name(func: Callable) -> str:
+    return func.__name__ if hasattr(func, "__name__") else "unknown"
@@ -1,6 +1,8 @@
+from .bootstrap_batch_prediction_endpoint import bootstrap_batch_prediction_endpoint
 from .bootstrap_dashboard import bootstrap_dashboard
 from .bootstrap_docs_endpoints import bootstrap_docs_endpoints
 from .bootstrap_feedback_endpoints import bootstrap_feedback_endpoints
 from .bootstrap_meta_endpoints import bootstrap_meta_endpoints
+from .bootstrap_metrics_endpoint import bootstrap_metrics_endpoint
 from .bootstrap_prediction_endpoint import bootstrap_prediction_endpoint
 from .bootstrap_trace_endpoints import bootstrap_trace_endpoints
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Union, cast
+
+from fastapi import APIRouter, FastAPI, HTTPException, status
+from pydantic import BaseModel
+
+from ...tracing import TracingContext
+from ...views import Trace
+from ..micro_batcher import MicroBatcher
+from ..prediction_executor import PredictionExecutor
+from .bootstrap_prediction_endpoint import get_schema
+
+
+def bootstrap_batch_prediction_endpoint(
+    app: FastAPI,
+    func: Callable[..., Union[Trace, Awaitable[Trace]]],
+    executor: PredictionExecutor,
+    micro_batcher: Optional[MicroBatcher[Any, Trace]] = None,
+) -> None:
+    router = APIRouter(
+        tags=["predictions"],
+    )
+
+    schema = get_schema(func)
+
+    @router.post(
+        "/predict_batch", status_code=status.HTTP_200_OK, response_model=List[Trace]
+    )
+    async def predict_batch(input_values: List[schema]) -> List[Trace]:  # type: ignore
+        arguments = [cast(BaseModel, v).dict() for v in input_values]
+
+        try:
+            if micro_batcher is not None:
+                # the batches are persisted by the batched function itself
+                results = await asyncio.gather(
+                    *[micro_batcher.submit(*a.values()) for a in arguments],
+                    return_exceptions=True,
+                )
+            else:
+                # every prediction has to finish before the collected traces are saved
+                with TracingContext.collect_traces():
+                    results = await asyncio.gather(
+                        *[executor.run_without_blocking(**a) for a in arguments],
+                        return_exceptions=True,
+                    )
+
+            traces: List[Trace] = []
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+                traces.append(result)
+            return traces
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"The following exception has occurred: {type(e).__name__}: {e}",
+            )
+
+    app.include_router(router)
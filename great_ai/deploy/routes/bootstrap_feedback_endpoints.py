@@ -13,32 +13,39 @@ def bootstrap_feedback_endpoints(app: FastAPI) -> None:
     )
 
     @router.put("/", status_code=status.HTTP_202_ACCEPTED)
-    def set_feedback(trace_id: str, input: EvaluationFeedbackRequest) -> Response:
-        trace = get_context().tracing_database.get(trace_id)
+    async def set_feedback(trace_id: str, input: EvaluationFeedbackRequest) -> Response:
+        await get_context().trace_writer.flush_async()
+        trace = await get_context().async_tracing_database.get(trace_id)
         if trace is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
+        difference = (input.feedback is not None) - (trace.feedback is not None)
         trace.feedback = input.feedback
 
-        get_context().tracing_database.update(trace_id, trace)
+        await get_context().async_tracing_database.update(trace_id, trace)
+        get_context().trace_aggregator.add_feedback(trace, difference)
         return Response(status_code=status.HTTP_202_ACCEPTED)
 
     @router.get("/", status_code=status.HTTP_200_OK)
-    def get_feedback(trace_id: str) -> Any:
-        trace = get_context().tracing_database.get(trace_id)
+    async def get_feedback(trace_id: str) -> Any:
+        await get_context().trace_writer.flush_async()
+        trace = await get_context().async_tracing_database.get(trace_id)
         if trace is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
         return trace.feedback
 
     @router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
-    def delete_feedback(trace_id: str) -> Any:
-        trace = get_context().tracing_database.get(trace_id)
+    async def delete_feedback(trace_id: str) -> Any:
+        await get_context().trace_writer.flush_async()
+        trace = await get_context().async_tracing_database.get(trace_id)
         if trace is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
 
+        difference = -(trace.feedback is not None)
         trace.feedback = None
 
-        get_context().tracing_database.update(trace_id, trace)
+        await get_context().async_tracing_database.update(trace_id, trace)
+        get_context().trace_aggregator.add_feedback(trace, difference)
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     app.include_router(router)
@@ -1,23 +1,35 @@
-from typing import Any
+from typing import Optional
 
 from fastapi import APIRouter, FastAPI, status
 
+from ...context import get_context
+from ...prediction_cache import PredictionCache
 from ...views import ApiMetadata, CacheStatistics, HealthCheckResponse
 
 
-def bootstrap_meta_endpoints(app: FastAPI, func: Any, metadata: ApiMetadata) -> None:
+def bootstrap_meta_endpoints(
+    app: FastAPI, cache: Optional[PredictionCache], metadata: ApiMetadata
+) -> None:
     router = APIRouter(
         tags=["meta"],
     )
 
     @router.get("/health", status_code=status.HTTP_200_OK)
     def check_health() -> HealthCheckResponse:
-        hits, misses, maxsize, cache_size = func.cache_info()
-        cache_statistics = CacheStatistics(
-            hits=hits, misses=misses, size=cache_size, max_size=maxsize
+        cache_statistics = (
+            CacheStatistics(backend="disabled", hits=0, misses=0, size=0, max_size=0)
+            if cache is None
+            else cache.statistics
         )
 
-        return HealthCheckResponse(is_healthy=True, cache_statistics=cache_statistics)
+        return HealthCheckResponse(
+            is_healthy=True,
+            cache_statistics=cache_statistics,
+            persistence_statistics=get_context().trace_writer.statistics,
+            connection_pool_statistics=(
+                get_context().tracing_database.connection_pool_statistics
+            ),
+        )
 
     @router.get("/version", response_model=ApiMetadata, status_code=status.HTTP_200_OK)
     def get_version() -> ApiMetadata:
@@ -0,0 +1,86 @@
+from typing import Optional
+
+from fastapi import APIRouter, FastAPI, status
+from fastapi.responses import PlainTextResponse
+
+from ...context import get_context
+from ...prediction_cache import PredictionCache
+from ...tracing.metrics_registry import metrics_registry
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def bootstrap_metrics_endpoint(
+    app: FastAPI, function_name: str, cache: Optional[PredictionCache]
+) -> None:
+    router = APIRouter(
+        tags=["meta"],
+    )
+
+    @router.get(
+        "/metrics",
+        status_code=status.HTTP_200_OK,
+        response_class=PlainTextResponse,
+    )
+    def get_metrics() -> PlainTextResponse:
+        """Latency histograms and counters in the Prometheus text format.
+
+        The metrics are aggregated separately by each worker process.
+        """
+
+        return PlainTextResponse(
+            _get_current_values(function_name, cache)
+            + metrics_registry.to_prometheus_text(),
+            media_type=PROMETHEUS_CONTENT_TYPE,
+        )
+
+    app.include_router(router)
+
+
+def _get_current_values(function_name: str, cache: Optional[PredictionCache]) -> str:
+    values = []
+
+    if cache is not None:
+        statistics = cache.statistics
+        labels = f'{{function="{function_name}"}}'
+        values += [
+            ("great_ai_cache_hits_total", "counter", labels, statistics.hits),
+            ("great_ai_cache_misses_total", "counter", labels, statistics.misses),
+            ("great_ai_cache_coalesced_total", "counter", labels, statistics.coalesced),
+            ("great_ai_cache_size", "gauge", labels, statistics.size),
+        ]
+
+    persistence = get_context().trace_writer.statistics
+    values += [
+        ("great_ai_persistence_queued", "gauge", "", persistence.queued),
+        ("great_ai_persistence_saved_total", "counter", "", persistence.saved),
+        ("great_ai_persistence_dropped_total", "counter", "", persistence.dropped),
+        ("great_ai_persistence_failed_total", "counter", "", persistence.failed),
+        (
+            "great_ai_persistence_sampled_out_total",
+            "counter",
+            "",
+            persistence.sampled_out,
+        ),
+        ("great_ai_persistence_pruned_total", "counter", "", persistence.pruned),
+    ]
+
+    pool = get_context().tracing_database.connection_pool_statistics
+    if pool is not None:
+        values += [
+            ("great_ai_db_pool_open_connections", "gauge", "", pool.open_connections),
+            ("great_ai_db_pool_in_use", "gauge", "", pool.in_use),
+            ("great_ai_db_pool_max_size", "gauge", "", pool.max_pool_size),
+            ("great_ai_db_pool_checkouts_total", "counter", "", pool.checkouts),
+            (
+                "great_ai_db_pool_failed_checkouts_total",
+                "counter",
+                "",
+                pool.failed_checkouts,
+            ),
+        ]
+
+    return "".join(
+        f"# TYPE {name} {type}\n{name}{labels} {value}\n"
+        for name, type, labels, value in values
+    )
@@ -1,32 +1,36 @@
+import collections.abc
 import inspect
-from typing import Any, Awaitable, Callable, Type, Union, cast
+from typing import Any, Awaitable, Callable, Optional, Type, Union, cast
 
 from fastapi import APIRouter, FastAPI, HTTPException, status
 from pydantic import BaseModel, create_model
+from typing_extensions import get_args, get_origin  # <= Python 3.7
 
 from ...helper import get_function_metadata_store
 from ...views import Trace
+from ..micro_batcher import MicroBatcher
+from ..prediction_executor import PredictionExecutor
 
 
 def bootstrap_prediction_endpoint(
-    app: FastAPI, func: Callable[..., Union[Trace, Awaitable[Trace]]]
+    app: FastAPI,
+    func: Callable[..., Union[Trace, Awaitable[Trace]]],
+    executor: PredictionExecutor,
+    micro_batcher: Optional[MicroBatcher[Any, Trace]] = None,
 ) -> None:
     router = APIRouter(
         tags=["predictions"],
     )
 
-    schema = _get_schema(func)
+    schema = get_schema(func)
 
     @router.post("/predict", status_code=status.HTTP_200_OK, response_model=Trace)
     async def predict(input_value: schema) -> Trace:  # type: ignore
         try:
-            if inspect.iscoroutinefunction(func):
-                return await cast(Callable[..., Awaitable[Trace]], func)(
-                    **cast(BaseModel, input_value).dict()
-                )
-            return cast(Callable[..., Trace], func)(
-                **cast(BaseModel, input_value).dict()
-            )
+            if micro_batcher is not None:
+                (value,) = cast(BaseModel, input_value).dict().values()
+                return await micro_batcher.submit(value)
+            return await executor.run(**cast(BaseModel, input_value).dict())
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -36,16 +40,34 @@ def bootstrap_prediction_endpoint(
     app.include_router(router)
 
 
-def _get_schema(func: Callable) -> Type[BaseModel]:
+def get_schema(func: Callable) -> Type[BaseModel]:
+    """Return the model of the request body of a single prediction of `func`.
+
+    The parameters of batched functions are replaced by the type of their items.
+    """
+
     signature = inspect.signature(func)
+    store = get_function_metadata_store(func)
     parameters = {
         p.name: (
-            p.annotation if p.annotation != inspect._empty else Any,
+            (_get_item_type(p.annotation) if store.is_batched else p.annotation)
+            if p.annotation != inspect._empty
+            else Any,
             p.default if p.default != inspect._empty else ...,
         )
         for p in signature.parameters.values()
-        if p.name in get_function_metadata_store(func).input_parameter_names
+        if p.name in store.input_parameter_names
     }
 
     schema: Type[BaseModel] = create_model("InputModel", **parameters)  # type: ignore
     return schema
+
+
+def _get_item_type(annotation: Any) -> Any:
+    """Return the type of a single item given the annotation of a batch of items."""
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin in (list, collections.abc.Sequence, collections.abc.Iterable) and args:
+        return args[0]
+    return Any
@@ -1,9 +1,14 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, FastAPI, HTTPException, Response, status
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi import Query as QueryParameter
+from fastapi import Response, status
 
 from ...context import get_context
-from ...views import Query, Trace
+from ...tracing.query_trace_statistics import query_trace_statistics
+from ...views import Query, QueryPlan, Trace, TraceStatistics
+from ...views.count_mode import CountMode
 
 
 def bootstrap_trace_endpoints(app: FastAPI) -> None:
@@ -13,32 +18,109 @@ def bootstrap_trace_endpoints(app: FastAPI) -> None:
     )
 
     @router.post("", status_code=status.HTTP_200_OK, response_model=List[Trace])
-    def query_traces(
+    async def query_traces(
         query: Query,
+        response: Response,
         skip: int = 0,
         take: int = 100,
+        continuation_token: Optional[str] = None,
+        count: CountMode = "none",
     ) -> List[Trace]:
-        return get_context().tracing_database.query(
-            conjunctive_filters=query.filter,
-            conjunctive_tags=query.conjunctive_tags,
-            since=query.since,
-            until=query.until,
-            has_feedback=query.has_feedback,
-            sort_by=query.sort,
-            skip=skip,
-            take=take,
-        )[0]
+        """Return a page of the matching traces.
+
+        If the traces are sorted and the page is full, the `X-Continuation-Token`
+        header can be used as the `continuation_token` of the next page. The number of
+        matching traces is returned in the `X-Total-Count` header unless `count` is
+        `none`.
+        """
+
+        try:
+            traces, total = await get_context().async_tracing_database.query(
+                conjunctive_filters=query.filter,
+                conjunctive_tags=query.conjunctive_tags,
+                since=query.since,
+                until=query.until,
+                has_feedback=query.has_feedback,
+                sort_by=query.sort,
+                skip=skip,
+                take=take,
+                continuation_token=continuation_token,
+                count=count,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        if count != "none" and total is not None:
+            response.headers["X-Total-Count"] = str(total)
+
+        if query.sort and traces and len(traces) == take:
+            token = get_context().tracing_database.create_continuation_token(
+                traces[-1], query.sort
+            )
+            response.headers["X-Continuation-Token"] = token
+
+        return traces
+
+    @router.post("/explain", status_code=status.HTTP_200_OK, response_model=QueryPlan)
+    def explain_query(query: Query) -> QueryPlan:
+        """Report whether the database uses an index for finding the matching traces.
+
+        Secondary indexes can be requested using `configure(indexed_fields=...)`.
+        """
+
+        try:
+            return get_context().tracing_database.explain(
+                conjunctive_filters=query.filter,
+                conjunctive_tags=query.conjunctive_tags,
+                since=query.since,
+                until=query.until,
+                has_feedback=query.has_feedback,
+                sort_by=query.sort,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    @router.get(
+        "/stats",
+        status_code=status.HTTP_200_OK,
+        response_model=List[TraceStatistics],
+    )
+    def get_trace_statistics(
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        bucket_minutes: Optional[int] = None,
+        quantiles: List[float] = QueryParameter([0.5, 0.9, 0.99]),
+    ) -> List[TraceStatistics]:
+        """Return the statistics of the traces created in the given interval.
+
+        The statistics are maintained when the traces are saved, so the traces
+        themselves are not read, and deleting traces does not change them. If
+        `bucket_minutes` is given, the statistics of each interval of that length are
+        returned separately.
+        """
+
+        try:
+            return query_trace_statistics(
+                since=since,
+                until=until,
+                bucket_minutes=bucket_minutes,
+                quantiles=quantiles,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
     @router.get("/{trace_id}", status_code=status.HTTP_200_OK, response_model=Trace)
-    def get_trace(trace_id: str) -> Trace:
-        result = get_context().tracing_database.get(trace_id)
+    async def get_trace(trace_id: str) -> Trace:
+        await get_context().trace_writer.flush_async()
+        result = await get_context().async_tracing_database.get(trace_id)
         if result is None:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
         return result
 
     @router.delete("/{trace_id}", status_code=status.HTTP_204_NO_CONTENT)
-    def delete_trace(trace_id: str) -> Response:
-        get_context().tracing_database.delete(trace_id)
+    async def delete_trace(trace_id: str) -> Response:
+        await get_context().trace_writer.flush_async()
+        await get_context().async_tracing_database.delete_batch([trace_id])
         return Response(status_code=status.HTTP_204_NO_CONTENT)
 
     app.include_router(router)
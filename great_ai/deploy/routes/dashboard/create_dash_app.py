@@ -154,17 +154,22 @@ def create_dash_app(function_name: str, version: str, function_docs: str) -> Fla
         )
         non_null_conjunctive_filters = [f for f in conjunctive_filters if f is not None]
 
+        # the approximate count may only be a lower bound, so one more trace is
+        # requested to find out whether there is a next page
         elements, count = get_context().tracing_database.query(
             skip=page_current * page_size,
-            take=page_size,
+            take=page_size + 1,
             conjunctive_filters=non_null_conjunctive_filters,
             conjunctive_tags=[ONLINE_TAG_NAME],
             sort_by=[SortBy.parse_obj(s) for s in sort_by],
+            count="approximate",
         )
+        has_next_page = len(elements) > page_size
+        elements = elements[:page_size]
 
         if non_null_conjunctive_filters:
             all_elements, _ = get_context().tracing_database.query(
-                take=1, conjunctive_tags=[ONLINE_TAG_NAME]
+                take=1, conjunctive_tags=[ONLINE_TAG_NAME], count="none"
             )
         else:
             all_elements = elements
@@ -179,7 +184,10 @@ def create_dash_app(function_name: str, version: str, function_docs: str) -> Fla
                 {k: str(v) for k, v in e.to_flat_dict(include_original=False).items()}
                 for e in elements
             ],
-            max(1, ceil(count / page_size)),
+            max(
+                ceil((count or 0) / page_size),
+                page_current + (2 if has_next_page else 1),
+            ),
             columns,
             style,
             execution_time_histogram,
@@ -1,6 +1,10 @@
-from .freeze_arguments import freeze, freeze_arguments
+from .contains_pattern import contains_pattern
+from .freeze import freeze
 from .get_arguments import get_arguments
+from .get_cache_key import get_cache_key
 from .get_function_metadata_store import get_function_metadata_store
+from .get_unix_milliseconds import get_unix_milliseconds
 from .snake_case_to_text import snake_case_to_text
 from .strip_lines import strip_lines
 from .text_to_hex_color import text_to_hex_color
+from .tokenize import tokenize
@@ -0,0 +1,25 @@
+import re
+from functools import lru_cache
+from typing import Any, Pattern
+
+
+def contains_pattern(value: Any, pattern: str) -> bool:
+    """Check whether the string representation of `value` matches a regex anywhere.
+
+    The matching is case-insensitive, `None` never matches.
+
+    Examples:
+        >>> contains_pattern('Hello World', 'wor')
+        True
+        >>> contains_pattern(1234, '^23')
+        False
+        >>> contains_pattern(None, '')
+        False
+    """
+
+    return value is not None and _compile(pattern).search(str(value)) is not None
+
+
+@lru_cache(maxsize=128)
+def _compile(pattern: str) -> Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE)
@@ -1,11 +1,8 @@
-import inspect
-from functools import wraps
-from typing import Any, Callable, Mapping, Sequence, Set, TypeVar, Union, cast
+from functools import lru_cache
+from typing import Any, Mapping, Sequence, Set, Type, Union
 
 from pydantic import BaseModel
 
-F = TypeVar("F", bound=Callable)
-
 
 class FrozenDict(dict):
     def __hash__(self) -> int:  # type: ignore
@@ -22,20 +19,6 @@ class FrozenSet(set):
         return hash(frozenset(freeze(i) for i in self))
 
 
-def freeze_arguments(func: F) -> F:
-    @wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        args = tuple(freeze(arg) for arg in args)
-        kwargs = {k: freeze(v) for k, v in kwargs.items()}
-        return func(*args, **kwargs)
-
-    @wraps(func)
-    async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
-        return await wrapper(*args, **kwargs)
-
-    return cast(F, async_wrapper if inspect.iscoroutinefunction(func) else wrapper)
-
-
 def freeze(value: Union[Sequence[Any], Mapping[str, Any], Set[Any], BaseModel]) -> Any:
     """
     >>> class MyClass(BaseModel):
@@ -44,6 +27,8 @@ def freeze(value: Union[Sequence[Any], Mapping[str, Any], Set[Any], BaseModel])
     >>> my_other_object = MyClass(a=4)
     >>> freeze(my_object) == freeze(my_other_object), freeze(my_object) == freeze(my_object)
     (False, True)
+    >>> type(freeze(my_object)) is type(freeze(my_other_object))
+    True
     """
     if isinstance(value, dict):
         return FrozenDict(value)
@@ -55,11 +40,15 @@ def freeze(value: Union[Sequence[Any], Mapping[str, Any], Set[Any], BaseModel])
         return FrozenSet(value)
 
     if isinstance(value, BaseModel):
+        return _get_hashable_type(type(value))(**value.dict())
+
+    return value
 
-        class HashableValue(type(value)):  # type: ignore
-            def __hash__(self) -> int:
-                return hash(frozenset((k, freeze(v)) for k, v in self.dict().items()))
 
-        return HashableValue(**value.dict())
+@lru_cache(maxsize=None)
+def _get_hashable_type(model_type: Type[BaseModel]) -> Type[BaseModel]:
+    class HashableValue(model_type):  # type: ignore
+        def __hash__(self) -> int:
+            return hash(frozenset((k, freeze(v)) for k, v in self.dict().items()))
 
-    return value
+    return HashableValue
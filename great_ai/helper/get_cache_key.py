@@ -0,0 +1,109 @@
+import json
+import pickle
+from hashlib import blake2b
+from typing import Any, Mapping, Sequence
+
+from pydantic import BaseModel
+
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+_encode = json.JSONEncoder(separators=(",", ":"), check_circular=False).encode
+
+
+def get_cache_key(args: Sequence[Any], kwargs: Mapping[str, Any]) -> str:
+    """Return a key identifying the arguments which is stable across processes.
+
+    The arguments are serialised canonically (the order of dictionary keys and set
+    elements does not matter) before hashing them. The containers are tagged with
+    their types, so equal-looking values of different types (for example, a tuple and
+    a list) get different keys. Values that cannot be represented in JSON are pickled
+    instead.
+
+    >>> get_cache_key([{'a': 1, 'b': [1, 2]}], {}) == get_cache_key(
+    ...     [{'b': [1, 2], 'a': 1}], {}
+    ... )
+    True
+    >>> get_cache_key([1], {}) == get_cache_key([], {'a': 1})
+    False
+    >>> get_cache_key([1], {}) == get_cache_key(['1'], {})
+    False
+    >>> get_cache_key([{1: 'a'}], {}) == get_cache_key([{'1': 'a'}], {})
+    False
+    >>> get_cache_key([(1, 2)], {}) == get_cache_key([[1, 2]], {})
+    False
+    >>> get_cache_key([{1, 2}], {}) == get_cache_key([[1, 2]], {})
+    False
+    """
+
+    if all(type(v) in _SCALAR_TYPES for v in (*args, *kwargs.values())):
+        # the repr of scalars is unambiguous and much cheaper than serialisation
+        serialised = repr(
+            (tuple(args), sorted(kwargs.items())) if kwargs else tuple(args)
+        ).encode()
+    else:
+        try:
+            serialised = _encode(
+                [_to_serialisable(list(args)), _to_serialisable(dict(kwargs))]
+            ).encode()
+        except (TypeError, ValueError, RecursionError):
+            serialised = pickle.dumps((args, kwargs))
+
+    # a fast digest; 128 bits make accidental collisions practically impossible
+    return blake2b(serialised, digest_size=16).hexdigest()
+
+
+def _to_serialisable(value: Any) -> Any:
+    """Convert `value` to a canonical JSON value in which each container is tagged.
+
+    Each container becomes a list starting with its tag, thus, no two values of
+    different types have the same representation.
+    """
+
+    value_type = type(value)
+    if value_type in _SCALAR_TYPES:
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return [value_type.__name__] + [
+            v if type(v) in _SCALAR_TYPES else _to_serialisable(v) for v in value
+        ]
+
+    if isinstance(value, dict):
+        if all(type(k) is str for k in value):
+            return [value_type.__name__] + [
+                [k, v if type(v) in _SCALAR_TYPES else _to_serialisable(v)]
+                for k, v in sorted(value.items())
+            ]
+
+        # the keys may be of any type, the items are sorted by their serialised keys
+        return [
+            value_type.__name__,
+            *sorted(
+                ([_to_serialisable(k), _to_serialisable(v)] for k, v in value.items()),
+                key=lambda item: _encode(item[0]),
+            ),
+        ]
+
+    if isinstance(value, (set, frozenset)):
+        return [
+            value_type.__name__,
+            *sorted((_to_serialisable(v) for v in value), key=_encode),
+        ]
+
+    if isinstance(value, BaseModel):
+        return [
+            "model",
+            f"{value_type.__module__}.{value_type.__qualname__}",
+            _to_serialisable(value.dict()),
+        ]
+
+    if hasattr(value, "tolist"):
+        # numpy arrays and the like: their dtype and shape are also part of the key
+        return [
+            value_type.__name__,
+            str(getattr(value, "dtype", "")),
+            _to_serialisable(list(getattr(value, "shape", ()))),
+            _to_serialisable(value.tolist()),
+        ]
+
+    raise TypeError(f"Object of type {value_type.__name__} is not JSON serializable")
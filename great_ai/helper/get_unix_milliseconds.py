@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta, timezone
+
+
+def get_unix_milliseconds(timestamp: datetime) -> int:
+    """Return the number of whole milliseconds elapsed since the Unix epoch.
+
+    Naive timestamps are interpreted as UTC, like the `created` field of the traces.
+
+    Examples:
+        >>> get_unix_milliseconds(datetime(1970, 1, 1, 0, 0, 1, 999))
+        1000
+        >>> get_unix_milliseconds(datetime(2022, 7, 11, 14, 31, 46, tzinfo=timezone.utc))
+        1657549906000
+    """
+
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return (timestamp - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
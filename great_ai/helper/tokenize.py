@@ -0,0 +1,19 @@
+import re
+from typing import Set
+
+_word = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> Set[str]:
+    """Return the distinct, lowercase words of the text.
+
+    The words are the runs of Unicode word characters, whitespace and punctuation
+    separate them. Unlike `great_ai.utilities.clean`, the text is not normalised, so
+    that every substring of a word of the raw text can be looked up.
+
+    Examples:
+        >>> sorted(tokenize('Björn is happy: <3, Happy!'))
+        ['3', 'björn', 'happy', 'is']
+    """
+
+    return set(_word.findall(text.lower()))
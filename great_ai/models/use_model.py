@@ -62,14 +62,26 @@ def use_model(
         store = get_function_metadata_store(func)
         store.model_parameter_names.append(model_kwarg_name)
 
-        @wraps(func)
-        def wrapper(*args: List[Any], **kwargs: Dict[str, Any]) -> Any:
+        span_name = f"model:{key}:v{actual_version}"
+
+        def log_model() -> None:
             tracing_context = TracingContext.get_current_tracing_context()
             if tracing_context:
                 tracing_context.log_model(Model(key=key, version=actual_version))
-            return func(*args, **kwargs, **{model_kwarg_name: model})
 
-        return cast(F, wrapper)
+        @wraps(func)
+        def wrapper(*args: List[Any], **kwargs: Dict[str, Any]) -> Any:
+            log_model()
+            with TracingContext.record_span(span_name):
+                return func(*args, **kwargs, **{model_kwarg_name: model})
+
+        @wraps(func)
+        async def async_wrapper(*args: List[Any], **kwargs: Dict[str, Any]) -> Any:
+            log_model()
+            with TracingContext.record_span(span_name):
+                return await func(*args, **kwargs, **{model_kwarg_name: model})
+
+        return cast(F, async_wrapper if store.is_asynchronous else wrapper)
 
     return decorator
 
@@ -59,26 +59,29 @@ def parameter(
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Dict[str, Any]) -> Any:
-            arguments = get_arguments(func, args, kwargs)
-            argument = arguments.get(parameter_name)
-
-            expected_type = func.__annotations__.get(parameter_name)
-
-            if expected_type is not None:
-                check_type(parameter_name, argument, expected_type)
-
-            if not validate(argument):
-                raise ArgumentValidationError(
-                    f"""Argument {parameter_name} in {
-                        func.__name__
-                    } did not pass validation"""
-                )
-
-            context = TracingContext.get_current_tracing_context()
-            if context and not disable_logging:
-                context.log_value(name=f"{actual_name}:value", value=argument)
-                if isinstance(argument, str):
-                    context.log_value(name=f"{actual_name}:length", value=len(argument))
+            with TracingContext.record_span(f"parameter:{parameter_name}"):
+                arguments = get_arguments(func, args, kwargs)
+                argument = arguments.get(parameter_name)
+
+                expected_type = func.__annotations__.get(parameter_name)
+
+                if expected_type is not None:
+                    check_type(parameter_name, argument, expected_type)
+
+                if not validate(argument):
+                    raise ArgumentValidationError(
+                        f"""Argument {parameter_name} in {
+                            func.__name__
+                        } did not pass validation"""
+                    )
+
+                context = TracingContext.get_current_tracing_context()
+                if context and not disable_logging:
+                    context.log_value(name=f"{actual_name}:value", value=argument)
+                    if isinstance(argument, str):
+                        context.log_value(
+                            name=f"{actual_name}:length", value=len(argument)
+                        )
 
             return func(*args, **kwargs)
 
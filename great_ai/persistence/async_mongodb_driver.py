@@ -0,0 +1,211 @@
+import asyncio
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+from weakref import WeakKeyDictionary, finalize
+
+from ..utilities import chunk
+from ..views import Filter, SortBy, Trace
+from ..views.count_mode import CountMode
+from .async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .query_documents import get_document_limit
+from .trace_compressor import TraceCompressor
+
+if TYPE_CHECKING:
+    from .mongodb_driver import MongoDbDriver
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # optional dependency
+    AsyncIOMotorClient = None
+
+
+class AsyncMongoDbDriver(AsyncTracingDatabaseDriver):
+    """AsyncTracingDatabaseDriver implementation using Motor, the asyncio MongoDB driver.
+
+    Requires the `motor` package. The documents, filters, and sorting are the same as
+    those of the wrapped MongoDbDriver. A Motor client is bound to the event loop it
+    is first used in, therefore, a separate client (with its own connection pool of
+    `max_pool_size`) is created for each process and event loop. The client of an
+    event loop is closed when the loop is garbage collected.
+
+    Filters on compressed values cannot be evaluated by MongoDB (see
+    `MongoDbDriver.query`), so the documents selected by the rest of the query are
+    streamed and matched in memory until the page and the count are complete. With
+    `count="exact"`, every candidate document is downloaded, and when a continuation
+    token is also given, the candidates are streamed once more for the count.
+    """
+
+    def __init__(self, driver: "MongoDbDriver") -> None:
+        if AsyncIOMotorClient is None:
+            raise ImportError("Install `motor` to use AsyncMongoDbDriver")
+
+        self.driver = driver
+        self._clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = (
+            WeakKeyDictionary()
+        )
+        self._clients_pid: Optional[int] = None
+
+    async def save(self, document: Trace) -> str:
+        result = await self._get_collection().insert_one(
+            self.driver._serialize(document)
+        )
+        return result.inserted_id
+
+    async def save_batch(self, documents: List[Trace]) -> List[str]:
+        result = await self._get_collection().insert_many(
+            [self.driver._serialize(d) for d in documents], ordered=False
+        )
+        return result.inserted_ids
+
+    async def get(self, id: str) -> Optional[Trace]:
+        value = await self._get_collection().find_one(id)
+        return (
+            None
+            if value is None
+            else Trace.parse_obj(TraceCompressor.decompress(value))
+        )
+
+    async def query(
+        self,
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        collection = self._get_collection()
+        count_filter, query = self.driver._get_query(
+            skip=skip,
+            take=take,
+            conjunctive_filters=conjunctive_filters,
+            conjunctive_tags=conjunctive_tags,
+            since=since,
+            until=until,
+            has_feedback=has_feedback,
+            sort_by=sort_by,
+            continuation_token=continuation_token,
+        )
+
+        compressed_filters = self.driver._get_compressed_filters(conjunctive_filters)
+        if compressed_filters:
+            # the compressed values are matched in memory (see `MongoDbDriver.query`)
+            find_args = {k: v for k, v in query.items() if k not in ("skip", "limit")}
+            documents, total = await self._page_compressed(
+                collection.find(**find_args),
+                compressed_filters,
+                skip=skip,
+                take=take,
+                count="none" if continuation_token else count,
+            )
+            if continuation_token and count != "none":
+                # the count does not depend on the continuation token
+                _, total = await self._page_compressed(
+                    collection.find(count_filter),
+                    compressed_filters,
+                    take=0,
+                    count=count,
+                )
+            return [
+                Trace[Any].parse_obj(TraceCompressor.decompress(d)) for d in documents
+            ], total
+
+        total = None
+        if count == "exact":
+            total = await collection.count_documents(count_filter)
+        elif count == "approximate":
+            total = (
+                await collection.estimated_document_count()
+                if count_filter == {"$and": [{}]}
+                else await collection.count_documents(
+                    count_filter, limit=self.driver.approximate_count_limit
+                )
+            )
+
+        documents = await collection.find(**query).to_list(length=None)
+        return [
+            Trace[Any].parse_obj(TraceCompressor.decompress(d)) for d in documents
+        ], total
+
+    async def update(self, id: str, new_version: Trace) -> None:
+        await self._get_collection().replace_one(
+            {"_id": id}, self.driver._serialize(new_version)
+        )
+
+    async def delete_batch(self, ids: List[str]) -> None:
+        collection = self._get_collection()
+        for c in chunk(ids, chunk_size=10000):
+            await collection.delete_many({"_id": {"$in": c}})
+
+    async def _page_compressed(
+        self,
+        cursor: Any,
+        compressed_filters: Sequence[Filter],
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Page and count the documents of `cursor` also matching the compressed values.
+
+        Like `page_documents`, the cursor is only iterated until the page and the
+        `count` are complete.
+        """
+
+        end = None if take is None else skip + take
+        limit = get_document_limit(
+            skip=skip,
+            take=take,
+            count=count,
+            approximate_count_limit=self.driver.approximate_count_limit,
+        )
+
+        page: List[Dict[str, Any]] = []
+        matched = 0
+        try:
+            async for document in cursor:
+                if not TraceCompressor.does_match(document, compressed_filters):
+                    continue
+                if skip <= matched and (end is None or matched < end):
+                    page.append(document)
+                matched += 1
+                if matched == limit:
+                    break
+        finally:
+            await cursor.close()
+
+        return page, None if count == "none" else matched
+
+    def _get_collection(self) -> Any:
+        pid = os.getpid()
+        if self._clients_pid != pid:
+            # the clients of the parent process must not be used (or closed) after a
+            # fork
+            self._clients = WeakKeyDictionary()
+            self._clients_pid = pid
+
+        # the clients of the other event loops (which may still be running in other
+        # threads) are kept open
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = AsyncIOMotorClient(
+                self.driver.mongo_connection_string,
+                maxPoolSize=self.driver.max_pool_size,
+                minPoolSize=self.driver.min_pool_size,
+            )
+            self._clients[loop] = client
+            finalize(loop, _close_client, client, pid)
+
+        return client[self.driver.mongo_database].traces
+
+
+def _close_client(client: Any, pid: int) -> None:
+    if os.getpid() == pid:  # the clients of the parent process are not closed
+        client.close()
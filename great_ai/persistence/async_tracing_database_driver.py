@@ -0,0 +1,52 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from ..views import Filter, SortBy, Trace
+from ..views.count_mode import CountMode
+
+
+class AsyncTracingDatabaseDriver(ABC):
+    """Interface of a tracing database that can be used without blocking the event loop.
+
+    The methods have the same semantics as their counterparts in
+    `TracingDatabaseDriver`. An instance for the configured database is returned by
+    `TracingDatabaseDriver.as_async`.
+    """
+
+    @abstractmethod
+    async def save(self, document: Trace) -> str:
+        pass
+
+    @abstractmethod
+    async def save_batch(self, documents: List[Trace]) -> List[str]:
+        pass
+
+    @abstractmethod
+    async def get(self, id: str) -> Optional[Trace]:
+        pass
+
+    @abstractmethod
+    async def query(
+        self,
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        pass
+
+    @abstractmethod
+    async def update(self, id: str, new_version: Trace) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_batch(self, ids: List[str]) -> None:
+        pass
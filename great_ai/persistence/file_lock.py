@@ -0,0 +1,81 @@
+import os
+import sys
+from pathlib import Path
+from types import TracebackType
+from typing import Optional, Type
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """Exclusive lock shared by every process (and thread) locking the same file.
+
+    Unlike a `multiprocessing.Lock`, it also synchronises independently started
+    processes, for example, the workers of a deployment. The lock is held on an open
+    file descriptor, so it is released by the operating system even if the process
+    crashes. The lock file itself is never deleted.
+
+    Examples:
+        >>> import tempfile
+        >>> path = Path(tempfile.mkdtemp()) / 'db.lock'
+        >>> with FileLock(path):
+        ...     FileLock(path).acquire(blocking=False)
+        False
+        >>> lock = FileLock(path)
+        >>> lock.acquire(blocking=False)
+        True
+        >>> lock.release()
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """Acquire the lock and return whether it has succeeded.
+
+        If not `blocking`, False is returned if the lock is held by someone else.
+        """
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(fd, msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except OSError:
+            os.close(fd)
+            if blocking:
+                raise
+            return False
+
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held by this instance."""
+
+        if self._fd is None:
+            return
+
+        if sys.platform == "win32":
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(
+        self,
+        type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.release()
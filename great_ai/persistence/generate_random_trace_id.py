@@ -0,0 +1,13 @@
+from datetime import datetime
+from uuid import uuid4
+
+
+def generate_random_trace_id(created: datetime) -> str:
+    """Return a random (version 4) UUID as the trace_id, `created` is ignored.
+
+    Examples:
+        >>> len(generate_random_trace_id(datetime.utcnow()))
+        36
+    """
+
+    return str(uuid4())
@@ -0,0 +1,40 @@
+import os
+from datetime import datetime
+from uuid import UUID
+
+from ..helper import get_unix_milliseconds
+
+
+def generate_time_ordered_trace_id(created: datetime) -> str:
+    """Return a version 7 UUID starting with the millisecond timestamp of `created`.
+
+    The first 48 bits encode the creation time, the remaining ones (apart from the
+    version and variant bits) are random. Hence, the string representations of the
+    IDs sort by time: consecutive traces are inserted next to each other into the
+    B-tree indexes of the databases, and the drivers can use ID ranges in place of
+    `since` and `until` if `TracingDatabaseDriver.time_ordered_ids` is set.
+
+    Examples:
+        >>> trace_id = generate_time_ordered_trace_id(datetime(2022, 7, 11, 14, 31, 46))
+        >>> trace_id[:13], UUID(trace_id).version
+        ('0181edac-6050', 7)
+
+        >>> generate_time_ordered_trace_id(
+        ...     datetime(2022, 7, 11, 14, 31, 45)
+        ... ) < trace_id < generate_time_ordered_trace_id(
+        ...     datetime(2022, 7, 11, 14, 31, 47)
+        ... )
+        True
+    """
+
+    random = int.from_bytes(os.urandom(10), "big")
+
+    return str(
+        UUID(
+            int=get_unix_milliseconds(created) << 80
+            | 0x7 << 76  # version
+            | (random >> 62 & 0xFFF) << 64
+            | 0b10 << 62  # variant
+            | random & (1 << 62) - 1
+        )
+    )
@@ -0,0 +1,97 @@
+from typing import Any, Dict, List
+
+from ..views import Trace
+from .query_documents import get_flat_value
+
+flat_properties = {
+    "exception_flat": "exception",
+    "tags_flat": "tags",
+}
+
+# the display fields of values which may be subdocuments (which cannot be searched)
+stored_flat_properties = ["models_flat", "output_flat", "feedback_flat"]
+
+
+def get_document_path(property: str) -> List[str]:
+    """Return the location of a column of `Trace.to_flat_dict` in a stored trace.
+
+    The traces are stored without most of their flattened fields. Instead, the display
+    fields of strings (for example, `exception_flat`) are mapped to the original
+    values. The display fields of the models, the output, the feedback, and the logged
+    values are stored in `_flat` (see `get_flat_fields`) because the original values
+    may be subdocuments, and because filters are matched against their display
+    strings (for example, `'text'` instead of `text`) by every driver.
+
+    Examples:
+        >>> get_document_path('created')
+        ['created']
+        >>> get_document_path('exception_flat')
+        ['exception']
+        >>> get_document_path('output_flat')
+        ['_flat', 'output_flat']
+        >>> get_document_path('arg:text:value')
+        ['_flat', 'arg:text:value']
+    """
+
+    if property in stored_flat_properties or is_logged_value(property):
+        return ["_flat", property]
+    return [flat_properties.get(property, property)]
+
+
+def is_logged_value(property: str) -> bool:
+    """Decide whether a column of `Trace.to_flat_dict` is a logged value.
+
+    Examples:
+        >>> is_logged_value('arg:text:value'), is_logged_value('tags_flat')
+        (True, False)
+    """
+
+    return (
+        property not in stored_flat_properties
+        and flat_properties.get(property, property) not in Trace.__fields__
+    )
+
+
+def get_document_value(document: Dict[str, Any], property: str) -> Any:
+    """Return the value of a column of `Trace.to_flat_dict` from `Trace.dict`.
+
+    The stored display fields are computed if `document` does not contain them.
+
+    Examples:
+        >>> get_document_value({'logged_values': {'arg:x:value': 3}}, 'arg:x:value')
+        3
+        >>> get_document_value({'logged_values': {'arg:x:value': 'a'}}, 'arg:x:value')
+        "'a'"
+        >>> get_document_value({'output': {'label': 'a'}}, 'output_flat')
+        "{'label': 'a'}"
+    """
+
+    path = get_document_path(property)
+    if path[0] == "_flat" and property not in document.get("_flat", {}):
+        return get_flat_value(document, property)
+
+    value: Any = document
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def get_flat_fields(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the display fields of a serialised trace which are stored in `_flat`.
+
+    The numeric logged values are their own display fields.
+
+    Examples:
+        >>> get_flat_fields({'models': [], 'output': {'label': 'a'}, 'feedback': None,
+        ...     'logged_values': {'arg:n:value': 3, 'arg:text:value': 'a'}})
+        ... # doctest: +NORMALIZE_WHITESPACE
+        {'models_flat': '', 'output_flat': "{'label': 'a'}", 'feedback_flat': 'null',
+         'arg:n:value': 3, 'arg:text:value': "'a'"}
+    """
+
+    return {
+        p: get_flat_value(document, p)
+        for p in [*stored_flat_properties, *document.get("logged_values", {})]
+    }
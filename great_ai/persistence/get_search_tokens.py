@@ -0,0 +1,100 @@
+import re
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+from ..helper import tokenize
+from ..views import Filter
+from .get_document_path import is_logged_value
+from .query_documents import get_flat_value
+
+_regex_metacharacters = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+
+def get_search_tokens(filters: Sequence[Filter]) -> List[Tuple[str, Set[str]]]:
+    """Return the tokens that the values matching the `contains` filters have to contain.
+
+    For each filter that can be narrowed down, a `(property, tokens)` pair is returned:
+    each token occurs inside one of the words (see `tokenize`) of every value matching
+    the filter. Therefore, the text index of the drivers can narrow down the candidates
+    of the filters; the filters themselves still have to be applied to them. Only the
+    literal (non-regex) filters of the logged values and `output_flat` can be narrowed
+    down.
+
+    Examples:
+        >>> get_search_tokens([
+        ...     Filter(property='arg:text:value', operator='contains', value='Hi, hi'),
+        ...     Filter(property='arg:text:value', operator='contains', value='^Hi'),
+        ...     Filter(property='exception_flat', operator='contains', value='Error'),
+        ...     Filter(property='output_flat', operator='=', value='Hi'),
+        ... ])
+        [('arg:text:value', {'hi'})]
+    """
+
+    result: List[Tuple[str, Set[str]]] = []
+    for f in filters:
+        if (
+            f.operator.lower() == "contains"
+            and isinstance(f.value, str)
+            and is_text_indexed(f.property)
+            and not _regex_metacharacters.search(f.value)
+        ):
+            tokens = tokenize(f.value)
+            if tokens:
+                result.append((f.property, tokens))
+
+    return result
+
+
+def is_text_indexed(property: str) -> bool:
+    """Decide whether a column of `Trace.to_flat_dict` is part of the text index.
+
+    Examples:
+        >>> is_text_indexed('output_flat'), is_text_indexed('arg:text:value')
+        (True, True)
+        >>> is_text_indexed('created')
+        False
+    """
+
+    return property == "output_flat" or is_logged_value(property)
+
+
+def get_indexed_tokens(document: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """Return the (property, token) pairs of a serialised trace for the text index.
+
+    The display strings of the values, which are matched by the filters, are
+    tokenized.
+
+    Examples:
+        >>> sorted(get_indexed_tokens({'output': [1], 'logged_values': {'a': 'Hi!',
+        ...     'b': {'c': 2}}}))
+        [('a', 'hi'), ('b', '2'), ('b', 'c'), ('output_flat', '1')]
+    """
+
+    properties = ["output_flat", *document.get("logged_values", {})]
+    result: Set[Tuple[str, str]] = set()
+
+    for property in properties:
+        value = get_flat_value(document, property)
+        if value is not None:
+            result.update((property, t) for t in tokenize(str(value)))
+
+    return result
+
+
+def get_trigrams(token: str) -> Set[str]:
+    """Return the substrings of length 3 of a token or the token itself if shorter.
+
+    A word containing a search token of at least 3 characters also contains each
+    trigram of the token, therefore, the candidate words of the text index can be
+    looked up by one of these trigrams instead of scanning every word. Shorter search
+    tokens are contained by one of the trigrams of the words containing them.
+
+    Examples:
+        >>> sorted(get_trigrams('hello'))
+        ['ell', 'hel', 'llo']
+        >>> get_trigrams('hi')
+        {'hi'}
+    """
+
+    if len(token) <= 3:
+        return {token}
+    return {token[i : i + 3] for i in range(len(token) - 2)}
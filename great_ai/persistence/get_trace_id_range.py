@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from ..helper import get_unix_milliseconds
+
+
+def get_trace_id_range(
+    *, since: Optional[datetime], until: Optional[datetime]
+) -> Tuple[Optional[str], Optional[str]]:
+    """Return the range of the time-ordered trace_ids created in the interval.
+
+    The lower bound is inclusive, the upper one is exclusive; `None` means unbounded.
+    Only valid for the IDs of `generate_time_ordered_trace_id`.
+
+    Examples:
+        >>> get_trace_id_range(since=datetime(2022, 7, 11, 14, 31, 46), until=None)
+        ('0181edac-6050', None)
+        >>> get_trace_id_range(since=None, until=datetime(2022, 7, 11, 14, 31, 46))
+        (None, '0181edac-6051')
+    """
+
+    def get_prefix(timestamp: datetime) -> str:
+        digits = f"{get_unix_milliseconds(timestamp):012x}"
+        return f"{digits[:8]}-{digits[8:]}"
+
+    return (
+        None if since is None else get_prefix(since),
+        None if until is None else get_prefix(until + timedelta(milliseconds=1)),
+    )
@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from .get_search_tokens import get_trigrams
+
+
+class InvertedIndex:
+    """In-memory mapping from the tokens of each property to the ids containing them.
+
+    The indexed tokens (words) of each property are also indexed by their trigrams
+    (see `get_trigrams`), so that the words containing a search token are found
+    without scanning the whole vocabulary.
+
+    Examples:
+        >>> index = InvertedIndex()
+        >>> index.put('a', [('output_flat', 'hello'), ('output_flat', 'world')])
+        >>> index.put('b', [('output_flat', 'word')])
+        >>> sorted(index.get_candidates('output_flat', {'wor'}))
+        ['a', 'b']
+        >>> sorted(index.get_candidates('output_flat', {'wor', 'hel'}))
+        ['a']
+        >>> sorted(index.get_candidates('output_flat', {'rl'}))
+        ['a']
+        >>> index.remove('a')
+        >>> sorted(index.get_candidates('output_flat', {'hel'}))
+        []
+    """
+
+    def __init__(self) -> None:
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+        self._trigrams: Dict[str, Dict[str, Set[str]]] = {}
+        self._entries: Dict[str, Set[Tuple[str, str]]] = {}
+
+    def put(self, id: str, entries: Iterable[Tuple[str, str]]) -> None:
+        """Index the (property, token) pairs of `id` replacing its previous ones."""
+
+        self.remove(id)
+        entries = set(entries)
+        if not entries:
+            return
+
+        self._entries[id] = entries
+        for property, token in entries:
+            tokens = self._postings.setdefault(property, {})
+            if token not in tokens:
+                trigrams = self._trigrams.setdefault(property, {})
+                for trigram in get_trigrams(token):
+                    trigrams.setdefault(trigram, set()).add(token)
+            tokens.setdefault(token, set()).add(id)
+
+    def remove(self, id: str) -> None:
+        for property, token in self._entries.pop(id, ()):
+            tokens = self._postings[property]
+            tokens[token].discard(id)
+            if tokens[token]:
+                continue
+
+            del tokens[token]
+            trigrams = self._trigrams[property]
+            for trigram in get_trigrams(token):
+                trigrams[trigram].discard(token)
+                if not trigrams[trigram]:
+                    del trigrams[trigram]
+            if not tokens:
+                del self._postings[property]
+                del self._trigrams[property]
+
+    def get_candidates(self, property: str, tokens: Iterable[str]) -> Set[str]:
+        """Return the ids having a token containing each of `tokens` in `property`."""
+
+        postings = self._postings.get(property, {})
+        candidates: Optional[Set[str]] = None
+        for token in tokens:
+            ids = set().union(
+                *(postings[word] for word in self._get_words(property, token))
+            )
+            candidates = ids if candidates is None else candidates & ids
+
+        return set() if candidates is None else candidates
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._trigrams.clear()
+        self._entries.clear()
+
+    def _get_words(self, property: str, token: str) -> Set[str]:
+        trigrams = self._trigrams.get(property, {})
+        if len(token) >= 3:
+            # the rarest trigram of the token has the fewest words to check
+            words = min((trigrams.get(t, set()) for t in get_trigrams(token)), key=len)
+        else:
+            words = set().union(*(w for t, w in trigrams.items() if token in t))
+
+        return {word for word in words if token in word}
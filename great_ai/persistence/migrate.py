@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""Convert the traces saved by earlier versions of GreatAI into the lean format.
+
+Usage:
+    python -m great_ai.persistence.migrate --backend mongodb --secrets mongo.ini
+"""
+
+from argparse import ArgumentParser
+from typing import Dict, Type
+
+from ..utilities import get_logger
+from .mongodb_driver import MongoDbDriver
+from .sqlite_driver import SqliteDriver
+from .tracing_database_driver import TracingDatabaseDriver
+
+logger = get_logger("migrate")
+
+drivers: Dict[str, Type[TracingDatabaseDriver]] = {
+    "mongodb": MongoDbDriver,
+    "sqlite": SqliteDriver,
+}
+
+
+def main() -> None:
+    parser = ArgumentParser(
+        description="Remove the redundant, flattened fields of the stored traces."
+    )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        choices=list(drivers),
+        help="the tracing database to migrate",
+        required=True,
+    )
+    parser.add_argument(
+        "-s",
+        "--secrets",
+        type=str,
+        help="path to the .ini configuration file of the tracing database",
+        required=True,
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=1000,
+        help="number of traces rewritten at once",
+    )
+    args = parser.parse_args()
+
+    driver = drivers[args.backend]
+    driver.configure_credentials_from_file(args.secrets)
+
+    try:
+        report = driver().migrate(batch_size=args.batch_size)
+    except KeyboardInterrupt:
+        logger.warning("Exiting, the migration can be safely resumed")
+        exit()
+
+    logger.info(
+        f"Migrated {report.migrated_count} of {report.document_count} traces: "
+        f"{report.size_before_in_bytes} -> {report.size_after_in_bytes} bytes "
+        f"({report.size_reduction:.1%} smaller)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,94 @@
+import json
 from datetime import datetime
 from multiprocessing import Lock
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-import pandas as pd
-from tinydb import TinyDB
+from tinydb import Query, TinyDB
+from tinydb.table import Table
 
-from ..views import Filter, SortBy, Trace
+from ..views import (
+    ContinuationToken,
+    Filter,
+    QueryPlan,
+    SortBy,
+    Trace,
+    TraceStatisticsBucket,
+)
+from ..views.count_mode import CountMode
+from ..views.storage_mode import StorageMode
+from .get_search_tokens import get_search_tokens
+from .query_documents import does_match, iter_documents, query_documents
+from .trace_log import TraceLog
 from .tracing_database_driver import TracingDatabaseDriver
 
 DEFAULT_TRACING_DB_FILENAME = "tracing_database.json"
+STATISTICS_TABLE = "statistics"
 lock = Lock()
 
 
-operator_mapping = {"=": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
-
-
 class ParallelTinyDbDriver(TracingDatabaseDriver):
     """TracingDatabaseDriver with TinyDB as a backend.
 
     Saves the database as a JSON into a single file. Highly inefficient on inserting,
     not advised for production use.
 
+    Setting `storage_mode` to `jsonl` stores the traces in an append-only JSON Lines
+    file next to `path_to_db` instead (see `TraceLog`). Thus, inserting, updating, and
+    deleting traces no longer rewrites the whole database, and the tags, creation time,
+    and feedback-state of the traces (and optionally, the words of their values, see
+    `text_index`) are indexed in memory.
+
+    The statistics buckets (see `merge_statistics`) are stored in the `statistics`
+    table of `path_to_db` in both storage modes.
+
     A multiprocessing lock protects the database file to avoid parallelisation issues.
+
+    Attributes:
+        path_to_db: Location of the database file.
+        storage_mode: `json` for a TinyDB file or `jsonl` for an append-only log.
     """
 
     is_production_ready = False
     path_to_db = Path(DEFAULT_TRACING_DB_FILENAME)
+    storage_mode: StorageMode = "json"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._logs: Dict[Path, TraceLog] = {}
 
     def save(self, trace: Trace) -> str:
+        if self.storage_mode == "jsonl":
+            self._get_log().append([trace])
+            return trace.trace_id
+
         return self._safe_execute(lambda db: db.insert(trace.dict()))
 
     def save_batch(self, documents: List[Trace]) -> List[str]:
+        if self.storage_mode == "jsonl":
+            self._get_log().append(documents)
+            return [d.trace_id for d in documents]
+
         traces = [d.dict() for d in documents]
         return self._safe_execute(lambda db: db.insert_multiple(traces))
 
     def get(self, id: str) -> Optional[Trace]:
-        value = self._safe_execute(lambda db: db.get(lambda d: d["trace_id"] == id))
-        if value:
-            value = Trace.parse_obj(value)
-        return value
+        value: Optional[Dict[str, Any]] = (
+            self._get_log().get(id)
+            if self.storage_mode == "jsonl"
+            else self._safe_execute(lambda db: db.get(lambda d: d["trace_id"] == id))
+        )
+        return Trace.parse_obj(value) if value else None
 
     def query(
         self,
@@ -51,62 +100,234 @@ class ParallelTinyDbDriver(TracingDatabaseDriver):
         since: Optional[datetime] = None,
         until: Optional[datetime] = None,
         has_feedback: Optional[bool] = None,
-        sort_by: Sequence[SortBy] = []
-    ) -> Tuple[List[Trace], int]:
-        def does_match(d: Dict[str, Any]) -> bool:
-            return (
-                not set(conjunctive_tags) - set(d["tags"])
-                and (since is None or datetime.fromisoformat(d["created"]) >= since)
-                and (until is None or datetime.fromisoformat(d["created"]) <= until)
-                and (
-                    has_feedback is None or has_feedback == (d["feedback"] is not None)
-                )
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        # counting is free, `count` is ignored
+        token = (
+            None
+            if continuation_token is None
+            else ContinuationToken.parse(continuation_token, sort_by)
+        )
+
+        if self.storage_mode != "jsonl":
+            matcher = self._get_matcher(
+                conjunctive_tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+            )
+            documents = self._safe_execute(lambda db: db.search(matcher))
+        elif conjunctive_filters or sort_by:
+            documents, _ = self._get_log().select(
+                tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=get_search_tokens(conjunctive_filters),
+            )
+        else:
+            # paging can be done by the log without reading the other traces; there is
+            # no continuation token to respect since `ContinuationToken.parse` rejects
+            # the tokens of unsorted queries
+            documents, total = self._get_log().select(
+                tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                skip=skip,
+                take=take,
             )
+            return [Trace.parse_obj(d) for d in documents], total
 
-        documents = self._safe_execute(lambda db: db.search(does_match))
-        if not documents:
-            return [], 0
-
-        df = pd.DataFrame([Trace.parse_obj(d).to_flat_dict() for d in documents])
-
-        for f in conjunctive_filters:
-            operator = f.operator.lower()
-            if operator in operator_mapping:
-                df = df.loc[
-                    getattr(df[f.property], operator_mapping[f.operator])(f.value)
-                ]
-            elif operator == "contains":
-                df = df.loc[
-                    df[f.property].str.contains(
-                        str(int(f.value)) if isinstance(f.value, float) else f.value,
-                        case=False,
-                    )
-                ]
-
-        if sort_by:
-            df.sort_values(
-                [col.column_id for col in sort_by],
-                ascending=[col.direction == "asc" for col in sort_by],
-                inplace=True,
+        return query_documents(
+            documents,
+            skip=skip,
+            take=take,
+            conjunctive_filters=conjunctive_filters,
+            sort_by=sort_by,
+            continuation_token=token,
+        )
+
+    def iter_query(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        batch_size: int = 1000,
+    ) -> Iterator[Trace]:
+        documents: Iterable[Dict[str, Any]]
+        if self.storage_mode == "jsonl":
+            documents = self._get_log().iter_select(
+                tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=get_search_tokens(conjunctive_filters),
+                batch_size=batch_size,
+            )
+        else:
+            # TinyDB always parses the whole file, only the parsing of the Traces is
+            # deferred
+            matcher = self._get_matcher(
+                conjunctive_tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
             )
+            documents = self._safe_execute(lambda db: db.search(matcher))
+
+        return iter_documents(
+            documents, conjunctive_filters=conjunctive_filters, sort_by=sort_by
+        )
+
+    def explain(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+    ) -> QueryPlan:
+        """Report which in-memory indexes of the `jsonl` storage mode are used.
+
+        The `json` storage mode always scans every trace. The filters of the logged
+        values are evaluated (and the traces are sorted) in memory.
+        """
+
+        if self.storage_mode != "jsonl":
+            return QueryPlan(uses_index=False)
 
-        count = len(df)
-        result = df.iloc[skip:] if take is None else df.iloc[skip : skip + take]
-        return [Trace.parse_obj(trace) for _, trace in result.iterrows()], count
+        indexes = [
+            name
+            for name, is_used in [
+                ("tags", bool(conjunctive_tags)),
+                ("created", since is not None or until is not None),
+                ("feedback", has_feedback is not None),
+                (
+                    "text_index",
+                    self.text_index and bool(get_search_tokens(conjunctive_filters)),
+                ),
+            ]
+            if is_used
+        ]
+        return QueryPlan(uses_index=bool(indexes), indexes=indexes)
 
     def update(self, id: str, new_version: Trace) -> None:
+        if self.storage_mode == "jsonl":
+            log = self._get_log()
+            if id != new_version.trace_id:
+                log.delete([id])
+            log.append([new_version])
+            return
+
         self._safe_execute(
             lambda db: db.update(new_version.dict(), lambda d: d["trace_id"] == id)
         )
 
     def delete(self, id: str) -> None:
-        self._safe_execute(lambda db: db.remove(lambda d: d["trace_id"] == id))
+        self.delete_batch([id])
 
     def delete_batch(self, ids: List[str]) -> None:
-        with lock:
-            with TinyDB(self.path_to_db) as db:
-                for id in ids:
-                    db.remove(lambda d: d["trace_id"] == id)
+        if self.storage_mode == "jsonl":
+            self._get_log().delete(ids)
+            return
+
+        id_set = set(ids)
+        self._safe_execute(lambda db: db.remove(lambda d: d["trace_id"] in id_set))
+
+    def delete_where(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+    ) -> int:
+        def does_match_filters(d: Dict[str, Any]) -> bool:
+            return all(does_match(d, f) for f in conjunctive_filters)
+
+        if self.storage_mode == "jsonl":
+            return self._get_log().delete_where(
+                tags=conjunctive_tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=get_search_tokens(conjunctive_filters),
+                predicate=does_match_filters if conjunctive_filters else None,
+            )
+
+        matcher = self._get_matcher(
+            conjunctive_tags=conjunctive_tags,
+            since=since,
+            until=until,
+            has_feedback=has_feedback,
+        )
+        return len(
+            self._safe_execute(
+                lambda db: db.remove(lambda d: matcher(d) and does_match_filters(d))
+            )
+        )
+
+    def merge_statistics(self, buckets: Sequence[TraceStatisticsBucket]) -> None:
+        def merge(table: Table) -> None:
+            for bucket in buckets:
+                stored = table.get(Query().start == bucket.start)
+                if stored is not None:
+                    merged = TraceStatisticsBucket.parse_obj(stored)
+                    merged.merge(bucket)
+                    bucket = merged
+                table.upsert(json.loads(bucket.json()), Query().start == bucket.start)
+
+        self._safe_execute(lambda db: merge(db.table(STATISTICS_TABLE)))
+
+    def get_statistics(
+        self, *, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[TraceStatisticsBucket]:
+        documents = self._safe_execute(
+            lambda db: db.table(STATISTICS_TABLE).search(
+                lambda d: (since is None or d["start"] >= since.isoformat())
+                and (until is None or d["start"] < until.isoformat())
+            )
+        )
+        return sorted(
+            (TraceStatisticsBucket.parse_obj(d) for d in documents),
+            key=lambda b: b.start,
+        )
+
+    @staticmethod
+    def _get_matcher(
+        *,
+        conjunctive_tags: Sequence[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        has_feedback: Optional[bool],
+    ) -> Callable[[Dict[str, Any]], bool]:
+        def matcher(d: Dict[str, Any]) -> bool:
+            return (
+                not set(conjunctive_tags) - set(d["tags"])
+                and (since is None or datetime.fromisoformat(d["created"]) >= since)
+                and (until is None or datetime.fromisoformat(d["created"]) <= until)
+                and (
+                    has_feedback is None or has_feedback == (d["feedback"] is not None)
+                )
+            )
+
+        return matcher
+
+    def _get_log(self) -> TraceLog:
+        path = self.path_to_db.with_suffix(".jsonl")
+        if path not in self._logs:
+            self._logs[path] = TraceLog(path, lock, text_index=self.text_index)
+        return self._logs[path]
 
     def _safe_execute(self, func: Callable[[TinyDB], Any]) -> Any:
         with lock:
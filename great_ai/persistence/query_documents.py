@@ -0,0 +1,342 @@
+import heapq
+from functools import cmp_to_key
+from pprint import pformat
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from ..helper import contains_pattern
+from ..views import ContinuationToken, Filter, SortBy, Trace
+from ..views.count_mode import CountMode
+
+T = TypeVar("T")
+
+operator_mapping: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+}
+
+
+def query_documents(
+    documents: Sequence[Dict[str, Any]],
+    *,
+    skip: int = 0,
+    take: Optional[int] = None,
+    conjunctive_filters: Sequence[Filter] = [],
+    sort_by: Sequence[SortBy] = [],
+    continuation_token: Optional[ContinuationToken] = None,
+) -> Tuple[List[Trace], int]:
+    """Filter, sort, and page serialised traces in memory.
+
+    The properties of the filters and sorting refer to the columns of
+    `Trace.to_flat_dict`. They are computed on demand from the raw documents, only the
+    returned page is parsed into Traces. When paging, only the first `skip + take`
+    documents are sorted using a heap. Ties are broken by the `trace_id`s, the page
+    starts after `continuation_token` if it is given.
+
+    Examples:
+        >>> documents = [
+        ...     {'trace_id': str(i), 'created': '', 'original_execution_time_ms': i,
+        ...      'logged_values': {'arg:x:value': i % 3}, 'models': [],
+        ...      'exception': None, 'output': i, 'tags': []}
+        ...     for i in range(10)
+        ... ]
+        >>> traces, count = query_documents(
+        ...     documents,
+        ...     take=2,
+        ...     conjunctive_filters=[
+        ...         Filter(property='arg:x:value', operator='=', value=1)
+        ...     ],
+        ...     sort_by=[SortBy(column_id='output', direction='desc')]
+        ... )
+        >>> [t.output for t in traces], count
+        ([7, 4], 3)
+    """
+
+    if conjunctive_filters:
+        documents = [
+            d for d in documents if all(does_match(d, f) for f in conjunctive_filters)
+        ]
+
+    count = len(documents)
+    end = None if take is None else skip + take
+
+    if sort_by:
+        documents = _sort_documents(documents, sort_by, end, continuation_token)
+
+    return [Trace.parse_obj(d) for d in documents[skip:end]], count
+
+
+def iter_documents(
+    documents: Iterable[Dict[str, Any]],
+    *,
+    conjunctive_filters: Sequence[Filter] = [],
+    sort_by: Sequence[SortBy] = [],
+) -> Iterator[Trace]:
+    """Lazily filter, sort, and parse serialised traces.
+
+    Without sorting, `documents` is consumed lazily. Otherwise, the matching documents
+    have to be sorted upfront, but they are still only parsed into Traces one by one.
+
+    Examples:
+        >>> documents = [
+        ...     {'trace_id': str(i), 'created': '', 'original_execution_time_ms': i,
+        ...      'logged_values': {}, 'models': [], 'exception': None, 'output': i,
+        ...      'tags': []}
+        ...     for i in range(10)
+        ... ]
+        >>> traces = iter_documents(
+        ...     documents,
+        ...     conjunctive_filters=[Filter(property='output', operator='<', value=3)]
+        ... )
+        >>> [t.output for t in traces]
+        [0, 1, 2]
+    """
+
+    matching: Iterable[Dict[str, Any]] = (
+        (d for d in documents if all(does_match(d, f) for f in conjunctive_filters))
+        if conjunctive_filters
+        else documents
+    )
+
+    if sort_by:
+        matching = _sort_documents(list(matching), sort_by, None, None)
+
+    for document in matching:
+        yield Trace.parse_obj(document)
+
+
+def page_documents(
+    documents: Iterable[T],
+    *,
+    skip: int = 0,
+    take: Optional[int] = None,
+    count: CountMode = "exact",
+    approximate_count_limit: int = 10000,
+) -> Tuple[List[T], Optional[int]]:
+    """Return a page of the (already filtered and sorted) documents and their count.
+
+    `documents` is consumed lazily: only as far as the page and the `count` mode
+    require. With `count="approximate"`, at most `approximate_count_limit` documents
+    are counted.
+
+    Examples:
+        >>> page_documents(iter(range(100)), skip=2, take=3, count='approximate',
+        ...     approximate_count_limit=10)
+        ([2, 3, 4], 10)
+        >>> page_documents(iter(range(100)), take=3, count='none')
+        ([0, 1, 2], None)
+    """
+
+    end = None if take is None else skip + take
+    limit = get_document_limit(
+        skip=skip,
+        take=take,
+        count=count,
+        approximate_count_limit=approximate_count_limit,
+    )
+
+    page: List[T] = []
+    matched = 0
+    for document in documents:
+        if skip <= matched and (end is None or matched < end):
+            page.append(document)
+        matched += 1
+        if matched == limit:
+            break
+
+    return page, None if count == "none" else matched
+
+
+def get_document_limit(
+    *,
+    skip: int = 0,
+    take: Optional[int] = None,
+    count: CountMode = "exact",
+    approximate_count_limit: int = 10000,
+) -> Optional[int]:
+    """Return the number of documents that `page_documents` consumes at most.
+
+    Examples:
+        >>> get_document_limit(skip=2, take=3, count='none')
+        5
+        >>> get_document_limit(take=3, count='approximate', approximate_count_limit=10)
+        10
+        >>> get_document_limit(take=3) is None
+        True
+    """
+
+    end = None if take is None else skip + take
+    return (
+        None
+        if count == "exact" or end is None
+        else end
+        if count == "none"
+        else max(end, approximate_count_limit)
+    )
+
+
+def does_match(document: Dict[str, Any], filter: Filter) -> bool:
+    """Decide whether a serialised trace matches a filter of `Trace.to_flat_dict`.
+
+    Examples:
+        >>> does_match({'logged_values': {'arg:n:value': 3}},
+        ...     Filter(property='arg:n:value', operator='>', value=2))
+        True
+    """
+
+    return does_match_value(get_flat_value(document, filter.property), filter)
+
+
+def does_match_value(value: Any, filter: Filter) -> bool:
+    """Decide whether a value of `Trace.to_flat_dict` matches a filter.
+
+    Values that cannot be compared with the value of the filter do not match it.
+
+    Examples:
+        >>> does_match_value('hello', Filter(property='', operator='contains',
+        ...     value='^h'))
+        True
+        >>> does_match_value(None, Filter(property='', operator='<', value=3))
+        False
+    """
+
+    operator = filter.operator.lower()
+
+    if operator == "contains":
+        return contains_pattern(
+            value,
+            str(int(filter.value)) if isinstance(filter.value, float) else filter.value,
+        )
+
+    try:
+        return operator_mapping[operator](value, filter.value)
+    except TypeError:  # for example, comparing None or a string with a number
+        return False
+
+
+def get_flat_value(document: Dict[str, Any], property: str) -> Any:
+    """Return the value of a column of `Trace.to_flat_dict` from a serialised trace.
+
+    Examples:
+        >>> get_flat_value({'logged_values': {'arg:text:value': 'hi'}},
+        ...     'arg:text:value')
+        "'hi'"
+    """
+
+    # keep in sync with Trace.to_flat_dict
+    if property == "models_flat":
+        return ", ".join(f"{m['key']}:{m['version']}" for m in document["models"])
+    if property in ("exception_flat", "output_flat", "feedback_flat"):
+        value = document.get(property[: -len("_flat")])
+        return (
+            "null" if value is None and property != "output_flat" else _pformat(value)
+        )
+    if property == "tags_flat":
+        return ",\n".join(document["tags"])
+
+    logged_values = document.get("logged_values", {})
+    if property in logged_values:
+        value = logged_values[property]
+        return (
+            value
+            if isinstance(value, float) or isinstance(value, int)
+            else _pformat(value)
+        )
+
+    return document.get(property)
+
+
+def _sort_documents(
+    documents: Sequence[Dict[str, Any]],
+    sort_by: Sequence[SortBy],
+    end: Optional[int],
+    continuation_token: Optional[ContinuationToken],
+) -> List[Dict[str, Any]]:
+    columns = [col.column_id for col in sort_by] + ["trace_id"]
+    ascending = [col.direction == "asc" for col in sort_by] + [True]
+    decorated = [
+        ([get_flat_value(d, column) for column in columns], d) for d in documents
+    ]
+
+    if continuation_token is not None:
+        last = [*continuation_token.values, continuation_token.trace_id]
+        decorated = [
+            item for item in decorated if _compare(item[0], last, ascending) > 0
+        ]
+
+    try:
+        # fast path: numbers can be negated for descending order
+        return _sort(decorated, end, lambda item: _get_numeric_key(item[0], ascending))
+    except TypeError:
+
+        def compare(a: List[Any], b: List[Any]) -> int:
+            return _compare(a, b, ascending)
+
+        compare_values = cmp_to_key(compare)
+        return _sort(decorated, end, lambda item: compare_values(item[0]))
+
+
+def _sort(
+    decorated: List[Tuple[List[Any], Dict[str, Any]]],
+    end: Optional[int],
+    key: Callable[[Tuple[List[Any], Dict[str, Any]]], Any],
+) -> List[Dict[str, Any]]:
+    return [
+        d
+        for _, d in (
+            sorted(decorated, key=key)
+            if end is None
+            else heapq.nsmallest(end, decorated, key=key)
+        )
+    ]
+
+
+def _get_numeric_key(values: List[Any], ascending: List[bool]) -> Tuple[Any, ...]:
+    # missing values come last in both directions
+    return tuple(
+        (True, 0)
+        if v is None
+        else (False, v if is_ascending else -v)  # raises TypeError for strings
+        for v, is_ascending in zip(values, ascending)
+    )
+
+
+def _compare(a: List[Any], b: List[Any], ascending: List[bool]) -> int:
+    for x, y, is_ascending in zip(a, b, ascending):
+        if x == y:
+            continue
+        if x is None:
+            return 1  # missing values come last in both directions
+        if y is None:
+            return -1
+
+        try:
+            result = -1 if x < y else 1
+        except TypeError:
+            result = -1 if str(x) < str(y) else 1
+
+        return result if is_ascending else -result
+    return 0
+
+
+def _pformat(value: Any) -> str:
+    if isinstance(value, str):
+        representation = repr(value)
+        if len(representation) <= 80:  # pformat only wraps longer strings
+            return representation
+
+    return pformat(value, indent=2, compact=True)
@@ -0,0 +1,836 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from pydantic.json import pydantic_encoder
+
+from ..helper import contains_pattern
+from ..utilities import unique
+from ..views import (
+    ContinuationToken,
+    Filter,
+    MigrationReport,
+    QueryPlan,
+    SortBy,
+    Trace,
+    TraceStatisticsBucket,
+)
+from ..views.count_mode import CountMode
+from .async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .get_document_path import get_document_path, get_document_value, get_flat_fields
+from .get_search_tokens import get_indexed_tokens, get_search_tokens, get_trigrams
+from .query_documents import page_documents
+from .threaded_async_tracing_database_driver import ThreadedAsyncTracingDatabaseDriver
+from .trace_compressor import COMPRESSED_KEY, TraceCompressor
+from .tracing_database_driver import TracingDatabaseDriver
+
+DEFAULT_SQLITE_TRACING_DB_FILENAME = "tracing_database.sqlite"
+
+operator_mapping = {"=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+indexed_columns = {"trace_id", "created"}
+
+
+class SqliteDriver(TracingDatabaseDriver):
+    """TracingDatabaseDriver implementation using SQLite as a backend.
+
+    A production-ready database driver for single-node deployments. The traces are
+    stored as JSON documents in a single file opened in WAL mode so that readers do not
+    block the writer. The creation time and the tags of the traces are indexed, and
+    the filters are evaluated by SQLite using JSON expressions. If `text_index` is set,
+    the words of the logged values and the outputs are stored in a separate table,
+    which narrows down the rows that `contains` filters have to be evaluated on. The
+    words are looked up by their trigrams (see `get_trigrams`); the trigrams of the
+    words that no longer occur are kept. Each process uses its own connection.
+
+    The traces are stored as returned by `Trace.dict` along with the display fields of
+    their models, output, and feedback (in `_flat`). The columns of
+    `Trace.to_flat_dict` used for filtering and sorting are mapped to their stored
+    fields (see `get_document_path`). Traces saved by earlier versions can be
+    converted by calling `migrate`.
+
+    Attributes:
+        path_to_db: Location of the SQLite file.
+    """
+
+    is_production_ready = True
+    approximate_count_limit = 10000
+    path_to_db = Path(DEFAULT_SQLITE_TRACING_DB_FILENAME)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    @classmethod
+    def configure_credentials(  # type: ignore
+        cls,
+        *,
+        sqlite_path: Union[Path, str] = DEFAULT_SQLITE_TRACING_DB_FILENAME,
+        **_: Any,
+    ) -> None:
+        """Configure the location of the database.
+
+        Args:
+            sqlite_path: Path of the SQLite file. If doesn't exist, it is created and
+                initialised.
+        """
+        cls.path_to_db = Path(sqlite_path)
+        super().configure_credentials()
+
+    def as_async(self) -> AsyncTracingDatabaseDriver:
+        """Return an interface of the database that does not block the event loop.
+
+        Like `aiosqlite`, the connection is used from a single, dedicated thread: the
+        driver's connection is guarded by a lock anyway, so more threads would only
+        wait for each other.
+        """
+
+        return ThreadedAsyncTracingDatabaseDriver(self, max_workers=1)
+
+    def save(self, trace: Trace) -> str:
+        return self.save_batch([trace])[0]
+
+    def save_batch(self, documents: List[Trace]) -> List[str]:
+        rows = [self._serialize(d) for d in documents]
+        tags = [(tag, d.trace_id) for d in documents for tag in set(d.tags)]
+        tokens = self._get_tokens(documents)
+
+        self._execute_in_transaction(
+            lambda connection: (
+                connection.executemany(
+                    "INSERT INTO traces (trace_id, created, document) VALUES (?, ?, ?)",
+                    rows,
+                ),
+                connection.executemany(
+                    "INSERT OR IGNORE INTO trace_tags (tag, trace_id) VALUES (?, ?)",
+                    tags,
+                ),
+                self._insert_tokens(connection, tokens),
+            )
+        )
+
+        return [d.trace_id for d in documents]
+
+    def get(self, id: str) -> Optional[Trace]:
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute("SELECT document FROM traces WHERE trace_id = ?", (id,))
+                .fetchone()
+            )
+
+        return None if row is None else self._deserialize(row[0])
+
+    def query(
+        self,
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        token = (
+            None
+            if continuation_token is None
+            else ContinuationToken.parse(continuation_token, sort_by)
+        )
+
+        conditions, parameters = self._get_conditions(
+            conjunctive_filters=conjunctive_filters,
+            conjunctive_tags=conjunctive_tags,
+            since=since,
+            until=until,
+            has_feedback=has_feedback,
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        page_conditions = list(conditions)
+        page_parameters = list(parameters)
+        if token is not None:
+            keyset_condition, keyset_parameters = self._get_keyset_condition(
+                sort_by, token
+            )
+            page_conditions.append(keyset_condition)
+            page_parameters.extend(keyset_parameters)
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+
+        order_by, order_by_parameters = self._get_order_by(sort_by)
+
+        compressed_filters = self._get_compressed_filters(conjunctive_filters)
+        with self._lock:
+            connection = self._get_connection()
+            if compressed_filters:
+                documents, total = self._page_compressed(
+                    connection.execute(
+                        f"SELECT document FROM traces {page_where} "
+                        + f"ORDER BY {', '.join(order_by)}",
+                        [*page_parameters, *order_by_parameters],
+                    ),
+                    compressed_filters,
+                    skip=skip,
+                    take=take,
+                    count="none" if token else count,
+                )
+                if token is not None and count != "none":
+                    # the count does not depend on the continuation token
+                    _, total = self._page_compressed(
+                        connection.execute(
+                            f"SELECT document FROM traces {where}", parameters
+                        ),
+                        compressed_filters,
+                        take=0,
+                        count=count,
+                    )
+                return [
+                    Trace.parse_obj(TraceCompressor.decompress(d)) for d in documents
+                ], total
+
+            total = None
+            if count == "exact":
+                total = connection.execute(
+                    f"SELECT COUNT(*) FROM traces {where}", parameters
+                ).fetchone()[0]
+            elif count == "approximate":
+                total = connection.execute(
+                    f"SELECT COUNT(*) FROM (SELECT 1 FROM traces {where} LIMIT ?)",
+                    [*parameters, self.approximate_count_limit],
+                ).fetchone()[0]
+
+            rows = connection.execute(
+                f"SELECT document FROM traces {page_where} "
+                + f"ORDER BY {', '.join(order_by)} LIMIT ? OFFSET ?",
+                [
+                    *page_parameters,
+                    *order_by_parameters,
+                    -1 if take is None else take,
+                    skip,
+                ],
+            ).fetchall()
+
+        return [self._deserialize(document) for (document,) in rows], total
+
+    def _page_compressed(
+        self,
+        rows: Iterable[Tuple[str]],
+        compressed_filters: Sequence[Filter],
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Page and count the stored documents also matching the compressed values.
+
+        SQLite cannot look into the compressed values, hence, the conditions of
+        `compressed_filters` also select every row whose filtered value is compressed
+        (see `_get_conditions`). These are filtered after decompression.
+        """
+
+        return page_documents(
+            (
+                d
+                for d in (json.loads(document) for (document,) in rows)
+                if TraceCompressor.does_match(d, compressed_filters)
+            ),
+            skip=skip,
+            take=take,
+            count=count,
+            approximate_count_limit=self.approximate_count_limit,
+        )
+
+    def explain(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+    ) -> QueryPlan:
+        """Return the result of `EXPLAIN QUERY PLAN` for selecting the page."""
+
+        conditions, parameters = self._get_conditions(
+            conjunctive_filters=conjunctive_filters,
+            conjunctive_tags=conjunctive_tags,
+            since=since,
+            until=until,
+            has_feedback=has_feedback,
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        order_by, order_by_parameters = self._get_order_by(sort_by)
+
+        with self._lock:
+            rows = (
+                self._get_connection()
+                .execute(
+                    f"EXPLAIN QUERY PLAN SELECT document FROM traces {where} "
+                    + f"ORDER BY {', '.join(order_by)}",
+                    [*parameters, *order_by_parameters],
+                )
+                .fetchall()
+            )
+
+        details = [detail for *_, detail in rows]
+        return QueryPlan(
+            uses_index=not any(
+                re.fullmatch(r"SCAN (?:TABLE )?traces", d) for d in details
+            ),
+            indexes=unique(
+                match[1]
+                for match in (
+                    re.search(r"USING (?:COVERING )?INDEX (\w+)", d) for d in details
+                )
+                if match
+            ),
+            details=details,
+        )
+
+    def create_indexes(self, properties: Sequence[str]) -> None:
+        """Create an expression index for each property (and the `trace_id`).
+
+        The same expressions are used by the queries, so SQLite can use the indexes
+        for filtering by and sorting by the properties.
+        """
+
+        with self._lock:
+            connection = self._get_connection()
+            for property in properties:
+                if property in indexed_columns:
+                    continue
+                column, _ = self._get_column(property)
+                name = (
+                    "traces_" + hashlib.sha1(property.encode("utf-8")).hexdigest()[:16]
+                )
+                connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON traces ({column}, trace_id)"
+                )
+
+    def update(self, id: str, new_version: Trace) -> None:
+        trace_id, created, document = self._serialize(new_version)
+
+        def update(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "UPDATE traces SET trace_id = ?, created = ?, document = ? "
+                + "WHERE trace_id = ?",
+                (trace_id, created, document, id),
+            )
+            connection.execute("DELETE FROM trace_tags WHERE trace_id = ?", (id,))
+            connection.executemany(
+                "INSERT OR IGNORE INTO trace_tags (tag, trace_id) VALUES (?, ?)",
+                [(tag, trace_id) for tag in set(new_version.tags)],
+            )
+            connection.execute("DELETE FROM trace_tokens WHERE trace_id = ?", (id,))
+            self._insert_tokens(connection, self._get_tokens([new_version]))
+
+        self._execute_in_transaction(update)
+
+    def delete(self, id: str) -> None:
+        self.delete_batch([id])
+
+    def delete_batch(self, ids: List[str]) -> None:
+        parameters = [(id,) for id in ids]
+        self._execute_in_transaction(
+            lambda connection: (
+                connection.executemany(
+                    "DELETE FROM traces WHERE trace_id = ?", parameters
+                ),
+                connection.executemany(
+                    "DELETE FROM trace_tags WHERE trace_id = ?", parameters
+                ),
+                connection.executemany(
+                    "DELETE FROM trace_tokens WHERE trace_id = ?", parameters
+                ),
+            )
+        )
+
+    def delete_where(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+    ) -> int:
+        if self._get_compressed_filters(conjunctive_filters):
+            # the compressed values have to be matched in memory
+            return super().delete_where(
+                conjunctive_filters=conjunctive_filters,
+                conjunctive_tags=conjunctive_tags,
+                until=until,
+                since=since,
+                has_feedback=has_feedback,
+            )
+
+        conditions, parameters = self._get_conditions(
+            conjunctive_filters=conjunctive_filters,
+            conjunctive_tags=conjunctive_tags,
+            since=since,
+            until=until,
+            has_feedback=has_feedback,
+        )
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        deleted: List[int] = []
+
+        def delete(connection: sqlite3.Connection) -> None:
+            # the conditions may refer to the tags, so the ids are collected first
+            ids = connection.execute(
+                f"SELECT trace_id FROM traces {where}", parameters
+            ).fetchall()
+            for table in ["traces", "trace_tags", "trace_tokens"]:
+                connection.executemany(f"DELETE FROM {table} WHERE trace_id = ?", ids)
+            deleted.append(len(ids))
+
+        self._execute_in_transaction(delete, immediate=True)
+        return deleted[0]
+
+    def prune(self, older_than: datetime, *, keep_with_feedback: bool = True) -> int:
+        condition = "created < ?" + (
+            " AND json_extract(document, '$.feedback') IS NULL"
+            if keep_with_feedback
+            else ""
+        )
+        deleted: List[int] = []
+
+        def prune(connection: sqlite3.Connection) -> None:
+            for table in ["trace_tags", "trace_tokens"]:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE trace_id IN "
+                    + f"(SELECT trace_id FROM traces WHERE {condition})",
+                    (older_than.isoformat(),),
+                )
+            deleted.append(
+                connection.execute(
+                    f"DELETE FROM traces WHERE {condition}", (older_than.isoformat(),)
+                ).rowcount
+            )
+
+        self._execute_in_transaction(prune)
+        return deleted[0]
+
+    def merge_statistics(self, buckets: Sequence[TraceStatisticsBucket]) -> None:
+        def merge(connection: sqlite3.Connection) -> None:
+            rows = []
+            for bucket in buckets:
+                row = connection.execute(
+                    "SELECT document FROM trace_statistics WHERE start = ?",
+                    (bucket.start,),
+                ).fetchone()
+                if row is not None:
+                    stored = TraceStatisticsBucket.parse_raw(row[0])
+                    stored.merge(bucket)
+                    bucket = stored
+                rows.append((bucket.start, bucket.json()))
+
+            connection.executemany(
+                "INSERT OR REPLACE INTO trace_statistics (start, document) "
+                + "VALUES (?, ?)",
+                rows,
+            )
+
+        self._execute_in_transaction(merge, immediate=True)
+
+    def get_statistics(
+        self, *, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[TraceStatisticsBucket]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+        if since is not None:
+            conditions.append("start >= ?")
+            parameters.append(since.isoformat())
+        if until is not None:
+            conditions.append("start < ?")
+            parameters.append(until.isoformat())
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._lock:
+            rows = (
+                self._get_connection()
+                .execute(
+                    f"SELECT document FROM trace_statistics {where} ORDER BY start",
+                    parameters,
+                )
+                .fetchall()
+            )
+
+        return [TraceStatisticsBucket.parse_raw(document) for (document,) in rows]
+
+    def create_continuation_token(self, trace: Trace, sort_by: Sequence[SortBy]) -> str:
+        document = trace.dict()
+        document = json.loads(
+            json.dumps(
+                {**document, "_flat": get_flat_fields(document)},
+                default=pydantic_encoder,
+            )
+        )
+        return ContinuationToken.create(
+            trace,
+            sort_by,
+            values=[get_document_value(document, col.column_id) for col in sort_by],
+        )
+
+    def migrate(self, batch_size: int = 1000) -> MigrationReport:
+        """Rewrite the traces saved by earlier versions in the current format.
+
+        Previously, the result of `Trace.to_flat_dict` was stored, which duplicates the
+        logged values and the display fields of the traces. The traces are rewritten
+        batch by batch, then the file is vacuumed to reclaim the freed space. The
+        current compression settings are also applied, and if `text_index` is set, the
+        words of the traces saved before enabling it are indexed.
+        """
+
+        report = MigrationReport()
+        last_rowid = 0
+
+        while True:
+            with self._lock:
+                rows = (
+                    self._get_connection()
+                    .execute(
+                        "SELECT rowid, document FROM traces WHERE rowid > ? "
+                        + "ORDER BY rowid LIMIT ?",
+                        (last_rowid, batch_size),
+                    )
+                    .fetchall()
+                )
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+
+            updates = []
+            traces = []
+            for rowid, document in rows:
+                trace = self._deserialize(document)
+                traces.append(trace)
+                lean = self._serialize(trace)[2]
+                report.document_count += 1
+                report.size_before_in_bytes += len(document.encode("utf-8"))
+                report.size_after_in_bytes += len(lean.encode("utf-8"))
+                if lean != document:
+                    updates.append((lean, rowid))
+
+            report.migrated_count += len(updates)
+            tokens = self._get_tokens(traces)
+            self._execute_in_transaction(
+                lambda connection: (
+                    connection.executemany(
+                        "UPDATE traces SET document = ? WHERE rowid = ?", updates
+                    ),
+                    self._insert_tokens(connection, tokens),
+                )
+            )
+
+        if report.migrated_count:
+            with self._lock:
+                self._get_connection().execute("VACUUM")
+
+        return report
+
+    def _serialize(self, trace: Trace) -> Tuple[str, str, str]:
+        compressor = TraceCompressor(
+            self.compression_threshold_in_bytes,
+            self.compression_algorithm,
+            binary=False,
+        )
+        document = trace.dict()
+        return (
+            trace.trace_id,
+            trace.created,
+            json.dumps(
+                compressor.compress({**document, "_flat": get_flat_fields(document)}),
+                default=pydantic_encoder,
+            ),
+        )
+
+    def _get_tokens(self, traces: Sequence[Trace]) -> List[Tuple[str, str, str]]:
+        if not self.text_index:
+            return []
+
+        return [
+            (property, token, trace.trace_id)
+            for trace in traces
+            for property, token in get_indexed_tokens(json.loads(trace.json()))
+        ]
+
+    @classmethod
+    def _insert_tokens(
+        cls, connection: sqlite3.Connection, tokens: Sequence[Tuple[str, str, str]]
+    ) -> None:
+        connection.executemany(
+            "INSERT OR IGNORE INTO trace_tokens (property, token, trace_id) "
+            + "VALUES (?, ?, ?)",
+            tokens,
+        )
+        cls._insert_trigrams(
+            connection, {(property, token) for property, token, _ in tokens}
+        )
+
+    @staticmethod
+    def _insert_trigrams(
+        connection: sqlite3.Connection, tokens: Iterable[Tuple[str, str]]
+    ) -> None:
+        connection.executemany(
+            "INSERT OR IGNORE INTO trace_trigrams (property, trigram, token) "
+            + "VALUES (?, ?, ?)",
+            [
+                (property, trigram, token)
+                for property, token in tokens
+                for trigram in get_trigrams(token)
+            ],
+        )
+
+    @staticmethod
+    def _deserialize(document: str) -> Trace:
+        return Trace.parse_obj(TraceCompressor.decompress(json.loads(document)))
+
+    def _get_conditions(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter],
+        conjunctive_tags: Sequence[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        has_feedback: Optional[bool],
+    ) -> Tuple[List[str], List[Any]]:
+        conditions: List[str] = []
+        parameters: List[Any] = []
+
+        for tag in conjunctive_tags:
+            conditions.append(
+                "trace_id IN (SELECT trace_id FROM trace_tags WHERE tag = ?)"
+            )
+            parameters.append(tag)
+
+        if since is not None:
+            conditions.append("created >= ?")
+            parameters.append(since.isoformat())
+
+        if until is not None:
+            conditions.append("created <= ?")
+            parameters.append(until.isoformat())
+
+        if has_feedback is not None:
+            conditions.append(
+                "json_extract(document, '$.feedback') IS "
+                + ("NOT NULL" if has_feedback else "NULL")
+            )
+
+        for f in conjunctive_filters:
+            column, column_parameters = self._get_column(f.property)
+            operator = f.operator.lower()
+            if operator in operator_mapping:
+                condition = f"{column} {operator_mapping[operator]} ?"
+                parameters.extend([*column_parameters, f.value])
+            elif operator == "contains":
+                condition = f"{column} REGEXP ?"
+                parameters.extend(
+                    [
+                        *column_parameters,
+                        str(int(f.value)) if isinstance(f.value, float) else f.value,
+                    ]
+                )
+            else:
+                continue
+
+            if self._get_compressed_filters([f]):
+                # the compressed values are matched in memory (see `_page_compressed`)
+                compressed = _get_json_column(
+                    [*get_document_path(f.property), COMPRESSED_KEY]
+                )
+                condition = f"({condition} OR {compressed} IS NOT NULL)"
+            conditions.append(condition)
+
+        if self.text_index:
+            for property, words in get_search_tokens(conjunctive_filters):
+                for word in words:
+                    # the words containing `word` are looked up by trigram
+                    trigram = (
+                        "trigram = ?" if len(word) >= 3 else "instr(trigram, ?) > 0"
+                    )
+                    conditions.append(
+                        "trace_id IN (SELECT trace_id FROM trace_tokens "
+                        + "WHERE property = ? AND token IN (SELECT token "
+                        + f"FROM trace_trigrams WHERE property = ? AND {trigram} "
+                        + "AND instr(token, ?) > 0))"
+                    )
+                    parameters.extend([property, property, word[:3], word])
+
+        return conditions, parameters
+
+    @classmethod
+    def _get_order_by(cls, sort_by: Sequence[SortBy]) -> Tuple[List[str], List[Any]]:
+        order_by = []
+        parameters: List[Any] = []
+        for col in sort_by:
+            column, column_parameters = cls._get_column(col.column_id)
+            order_by.append(f"{column} {'ASC' if col.direction == 'asc' else 'DESC'}")
+            parameters.extend(column_parameters)
+        order_by.append("trace_id ASC" if sort_by else "rowid ASC")
+        return order_by, parameters
+
+    @classmethod
+    def _get_keyset_condition(
+        cls, sort_by: Sequence[SortBy], token: ContinuationToken
+    ) -> Tuple[str, List[Any]]:
+        """Match the rows coming after the token in the order of `sort_by`.
+
+        SQLite considers NULL to be smaller than any other value.
+        """
+
+        columns = [
+            (*cls._get_column(col.column_id), col.direction == "asc") for col in sort_by
+        ]
+        columns.append(("trace_id", [], True))
+        values = [*token.values, token.trace_id]
+
+        alternatives: List[str] = []
+        parameters: List[Any] = []
+        for i, ((column, column_parameters, ascending), value) in enumerate(
+            zip(columns, values)
+        ):
+            if value is None:
+                if not ascending:
+                    continue
+                after = f"{column} IS NOT NULL"
+                after_parameters = column_parameters
+            elif ascending:
+                after = f"{column} > ?"
+                after_parameters = [*column_parameters, value]
+            else:
+                after = f"({column} < ? OR {column} IS NULL)"
+                after_parameters = [*column_parameters, value, *column_parameters]
+
+            equalities = [f"{c} IS ?" for c, _, _ in columns[:i]]
+            alternatives.append(f"({' AND '.join([*equalities, after])})")
+            for (_, c_parameters, _), v in zip(columns[:i], values[:i]):
+                parameters.extend([*c_parameters, v])
+            parameters.extend(after_parameters)
+
+        return f"({' OR '.join(alternatives) or '0'})", parameters
+
+    @staticmethod
+    def _get_column(property: str) -> Tuple[str, List[Any]]:
+        if property in indexed_columns:
+            return property, []
+        return _get_json_column(get_document_path(property)), []
+
+    def _execute_in_transaction(
+        self, func: Callable[[sqlite3.Connection], Any], *, immediate: bool = False
+    ) -> None:
+        """Run `func` in a transaction.
+
+        Transactions that read before writing should be `immediate`, so that other
+        processes cannot write in the meantime.
+        """
+
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                func(connection)
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            # connections must not be shared with forked processes
+            self._pid = os.getpid()
+            self._connection = sqlite3.connect(
+                self.path_to_db,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.create_function(
+                "REGEXP", 2, lambda pattern, value: contains_pattern(value, pattern)
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS traces (
+                    trace_id TEXT PRIMARY KEY,
+                    created TEXT NOT NULL,
+                    document TEXT NOT NULL
+                )"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS traces_created ON traces (created)"
+            )
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS trace_tags (
+                    tag TEXT NOT NULL,
+                    trace_id TEXT NOT NULL,
+                    PRIMARY KEY (tag, trace_id)
+                ) WITHOUT ROWID"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS trace_tags_trace_id "
+                + "ON trace_tags (trace_id)"
+            )
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS trace_tokens (
+                    property TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    trace_id TEXT NOT NULL,
+                    PRIMARY KEY (property, token, trace_id)
+                ) WITHOUT ROWID"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS trace_tokens_trace_id "
+                + "ON trace_tokens (trace_id)"
+            )
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS trace_trigrams (
+                    property TEXT NOT NULL,
+                    trigram TEXT NOT NULL,
+                    token TEXT NOT NULL,
+                    PRIMARY KEY (property, trigram, token)
+                ) WITHOUT ROWID"""
+            )
+            if not self._connection.execute(
+                "SELECT EXISTS (SELECT 1 FROM trace_trigrams)"
+            ).fetchone()[0]:
+                # the text index of databases created by earlier versions
+                self._insert_trigrams(
+                    self._connection,
+                    self._connection.execute(
+                        "SELECT DISTINCT property, token FROM trace_tokens"
+                    ).fetchall(),
+                )
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS trace_statistics (
+                    start TEXT PRIMARY KEY,
+                    document TEXT NOT NULL
+                ) WITHOUT ROWID"""
+            )
+
+        return self._connection
+
+
+def _get_json_column(path: Sequence[str]) -> str:
+    json_path = "".join('."' + p.replace('"', "") + '"' for p in path)
+    # the path is inlined so that the expression indexes (see `create_indexes`)
+    # match the expressions of the queries
+    return "json_extract(document, '$" + json_path.replace("'", "''") + "')"
@@ -0,0 +1,107 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from ..views import Filter, SortBy, Trace
+from ..views.count_mode import CountMode
+from .async_tracing_database_driver import AsyncTracingDatabaseDriver
+
+if TYPE_CHECKING:
+    from .tracing_database_driver import TracingDatabaseDriver
+
+T = TypeVar("T")
+
+
+class ThreadedAsyncTracingDatabaseDriver(AsyncTracingDatabaseDriver):
+    """Run the methods of a synchronous TracingDatabaseDriver in a pool of threads.
+
+    The pool is separate from the default executor of the event loop (which is used by
+    the synchronous FastAPI routes), so that slow database calls cannot starve them.
+    It is created lazily and recreated in forked processes.
+
+    Examples:
+        >>> import asyncio
+        >>> from great_ai import ParallelTinyDbDriver
+        >>> driver = ThreadedAsyncTracingDatabaseDriver(ParallelTinyDbDriver())
+        >>> asyncio.run(driver.get('missing-id')) is None
+        True
+    """
+
+    def __init__(
+        self, driver: "TracingDatabaseDriver", *, max_workers: Optional[int] = None
+    ) -> None:
+        self.driver = driver
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+
+    async def save(self, document: Trace) -> str:
+        return await self._run(self.driver.save, document)
+
+    async def save_batch(self, documents: List[Trace]) -> List[str]:
+        return await self._run(self.driver.save_batch, documents)
+
+    async def get(self, id: str) -> Optional[Trace]:
+        return await self._run(self.driver.get, id)
+
+    async def query(
+        self,
+        *,
+        skip: int = 0,
+        take: Optional[int] = None,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        return await self._run(
+            partial(
+                self.driver.query,
+                skip=skip,
+                take=take,
+                conjunctive_filters=conjunctive_filters,
+                conjunctive_tags=conjunctive_tags,
+                until=until,
+                since=since,
+                has_feedback=has_feedback,
+                sort_by=sort_by,
+                continuation_token=continuation_token,
+                count=count,
+            )
+        )
+
+    async def update(self, id: str, new_version: Trace) -> None:
+        await self._run(self.driver.update, id, new_version)
+
+    async def delete_batch(self, ids: List[str]) -> None:
+        await self._run(self.driver.delete_batch, ids)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(), func, *args
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix=f"great_ai_{type(self.driver).__name__}",
+            )
+        return self._executor
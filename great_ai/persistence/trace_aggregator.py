@@ -0,0 +1,164 @@
+import atexit
+import os
+import threading
+from datetime import datetime, timedelta
+from logging import Logger
+from time import monotonic
+from typing import Dict, List, Sequence
+
+from ..views import Trace, TraceStatisticsBucket
+from .tracing_database_driver import TracingDatabaseDriver
+
+
+class TraceAggregator:
+    """Maintain the statistics buckets of the traces as they are saved.
+
+    The traces are added to in-memory buckets of `bucket_seconds` (based on their
+    creation time), which are merged into the database (see
+    `TracingDatabaseDriver.merge_statistics`) from a background thread at most once
+    every `flush_interval_seconds`, and when the process exits. Hence, statistics can
+    be served in O(buckets) instead of scanning every trace.
+
+    In forked child processes (for example, in `process_batch`), the pending buckets
+    of the parent are discarded (they are flushed by the parent), and the buckets are
+    merged into the database synchronously.
+
+    Examples:
+        >>> TraceAggregator.get_bucket_start('2022-07-11T14:31:46.123', 300)
+        '2022-07-11T14:30:00'
+    """
+
+    def __init__(
+        self,
+        database: TracingDatabaseDriver,
+        logger: Logger,
+        *,
+        bucket_seconds: int = 300,
+        flush_interval_seconds: float = 10,
+    ) -> None:
+        self._database = database
+        self._logger = logger
+        self.bucket_seconds = bucket_seconds
+        self._flush_interval_seconds = flush_interval_seconds
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Dict[str, TraceStatisticsBucket] = {}
+        self._owner_pid = self._pid = os.getpid()
+        self._last_flushed_at = monotonic()
+        self._is_flushing = False
+        self._is_registered = False
+
+    @staticmethod
+    def get_bucket_start(created: str, bucket_seconds: int) -> str:
+        """Return the start of the bucket containing `created`.
+
+        The buckets are aligned to midnight, so `bucket_seconds` should divide a day.
+        """
+
+        timestamp = datetime.fromisoformat(created)
+        midnight = timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+        seconds = (timestamp - midnight).total_seconds()
+        return (
+            midnight + timedelta(seconds=seconds // bucket_seconds * bucket_seconds)
+        ).isoformat()
+
+    def add(self, traces: Sequence[Trace]) -> None:
+        with self._lock:
+            self._reset_after_fork()
+            for trace in traces:
+                self._get_bucket(trace).add(trace)
+
+        self._flush_if_due()
+
+    def add_feedback(self, trace: Trace, difference: int) -> None:
+        """Count a feedback given (`difference=1`) or removed (`-1`) after saving."""
+
+        if not difference:
+            return
+
+        with self._lock:
+            self._reset_after_fork()
+            self._get_bucket(trace).add_feedback(trace, difference)
+
+        self._flush_if_due()
+
+    def flush(self) -> None:
+        """Merge the pending buckets into the database."""
+
+        with self._flush_lock:
+            with self._lock:
+                self._reset_after_fork()
+                buckets: List[TraceStatisticsBucket] = list(self._pending.values())
+                self._pending = {}
+                self._last_flushed_at = monotonic()
+
+            if not buckets:
+                return
+
+            try:
+                self._database.merge_statistics(buckets)
+            except Exception:
+                with self._lock:
+                    for bucket in buckets:
+                        self._pending.setdefault(
+                            bucket.start, TraceStatisticsBucket(start=bucket.start)
+                        ).merge(bucket)
+                raise
+
+    def _get_bucket(self, trace: Trace) -> TraceStatisticsBucket:
+        start = self.get_bucket_start(trace.created, self.bucket_seconds)
+        bucket = self._pending.get(start)
+        if bucket is None:
+            bucket = self._pending[start] = TraceStatisticsBucket(start=start)
+
+        if not self._is_registered:
+            self._is_registered = True
+            atexit.register(self.close)
+
+        return bucket
+
+    def _reset_after_fork(self) -> None:
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._pending = {}
+            self._is_flushing = False
+
+    def _flush_if_due(self) -> None:
+        if self._owner_pid != os.getpid():
+            self.flush()
+            return
+
+        with self._lock:
+            if (
+                self._is_flushing
+                or monotonic() - self._last_flushed_at < self._flush_interval_seconds
+            ):
+                return
+            self._is_flushing = True
+
+        threading.Thread(
+            name="great_ai_trace_aggregator",
+            target=self._flush_in_background,
+            daemon=True,
+        ).start()
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            self._logger.exception("Could not save the statistics of the traces")
+        finally:
+            with self._lock:
+                self._is_flushing = False
+
+    def close(self) -> None:
+        """Flush the pending buckets, only logging the errors."""
+
+        if self._pid != os.getpid():
+            return
+
+        try:
+            self.flush()
+        except Exception:
+            self._logger.exception("Could not save the statistics of the traces")
@@ -0,0 +1,212 @@
+import base64
+import json
+import zlib
+from typing import Any, Dict, Optional, Sequence
+
+from pydantic.json import pydantic_encoder
+
+from ..views import Filter
+from ..views.compression_algorithm import CompressionAlgorithm
+from .get_document_path import get_document_path
+from .query_documents import does_match_value
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+COMPRESSED_KEY = "__compressed__"
+
+# the top-level fields of the serialised traces which may contain compressed values
+compressed_fields = ["logged_values", "output", "feedback", "_flat"]
+
+
+class TraceCompressor:
+    """Compress the large payloads of serialised traces.
+
+    The non-numeric logged values, the output, the feedback, and the stored display
+    fields (`_flat`) are replaced by `{"__compressed__": algorithm, "data": ...}` if
+    their JSON representation is longer than `threshold_in_bytes`. The other fields
+    and the numeric logged values are kept as is, so that they can still be filtered
+    and sorted by.
+
+    zstd requires the `zstandard` package, zlib is used instead if it is not installed.
+    The data is stored as bytes if `binary`, otherwise, as base64 text.
+
+    The databases cannot look into the compressed values, therefore, `contains` filters
+    and comparisons with strings (see `may_be_compressed`) would not match them. The
+    drivers also select the traces whose filtered value is compressed, and evaluate the
+    filters on the decompressed values in memory (see `does_match`). Such queries are
+    paged and counted in memory, which is slower if there are many candidates.
+
+    Examples:
+        >>> compressor = TraceCompressor(threshold_in_bytes=100, algorithm='zlib')
+        >>> document = {'logged_values': {'arg:n:value': 3, 'arg:text:value': 'a' * 200},
+        ...     'output': 'short', 'feedback': None}
+        >>> compressed = compressor.compress(document)
+        >>> compressed['logged_values']['arg:text:value'][COMPRESSED_KEY]
+        'zlib'
+        >>> compressed['logged_values']['arg:n:value'], compressed['output']
+        (3, 'short')
+        >>> TraceCompressor.decompress(compressed) == document
+        True
+    """
+
+    def __init__(
+        self,
+        threshold_in_bytes: Optional[int],
+        algorithm: CompressionAlgorithm = "zstd",
+        *,
+        binary: bool = True,
+    ) -> None:
+        self.threshold_in_bytes = threshold_in_bytes
+        self.algorithm: CompressionAlgorithm = (
+            "zlib" if algorithm == "zstd" and zstandard is None else algorithm
+        )
+        self.binary = binary
+
+    def compress(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a shallow copy of `document` with its large payloads compressed."""
+
+        if self.threshold_in_bytes is None:
+            return document
+
+        document = {
+            **document,
+            "logged_values": {
+                k: v
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+                else self._compress_value(v)
+                for k, v in document.get("logged_values", {}).items()
+            },
+        }
+        for key in ("output", "feedback"):
+            if key in document:
+                document[key] = self._compress_value(document[key])
+        if "_flat" in document:
+            document["_flat"] = {
+                k: v
+                if isinstance(v, (int, float)) and not isinstance(v, bool)
+                else self._compress_value(v)
+                for k, v in document["_flat"].items()
+            }
+
+        return document
+
+    @staticmethod
+    def decompress(document: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a shallow copy of `document` with its compressed payloads restored."""
+
+        document = {
+            **document,
+            "logged_values": {
+                k: TraceCompressor._decompress_value(v)
+                for k, v in document.get("logged_values", {}).items()
+            },
+        }
+        for key in ("output", "feedback"):
+            if key in document:
+                document[key] = TraceCompressor._decompress_value(document[key])
+        if "_flat" in document:
+            document["_flat"] = {
+                k: TraceCompressor._decompress_value(v)
+                for k, v in document["_flat"].items()
+            }
+
+        return document
+
+    @staticmethod
+    def may_be_compressed(filter: Filter) -> bool:
+        """Decide whether a filter may refer to compressed values.
+
+        Numbers are never compressed, so only the `contains` filters and the
+        comparisons with strings of the logged values, the output, the feedback, and
+        their display fields are affected.
+
+        Examples:
+            >>> TraceCompressor.may_be_compressed(
+            ...     Filter(property='output_flat', operator='contains', value='a'))
+            True
+            >>> TraceCompressor.may_be_compressed(
+            ...     Filter(property='arg:n:value', operator='>', value=3))
+            False
+            >>> TraceCompressor.may_be_compressed(
+            ...     Filter(property='exception_flat', operator='contains', value='a'))
+            False
+        """
+
+        return (
+            filter.operator.lower() == "contains" or isinstance(filter.value, str)
+        ) and get_document_path(filter.property)[0] in compressed_fields
+
+    @staticmethod
+    def does_match(document: Dict[str, Any], filters: Sequence[Filter]) -> bool:
+        """Evaluate the filters on the compressed values of a stored document.
+
+        The values that are not compressed are assumed to have been matched by the
+        database already.
+
+        Examples:
+            >>> compressor = TraceCompressor(threshold_in_bytes=10, algorithm='zlib')
+            >>> document = compressor.compress({'output': 'a long output'})
+            >>> TraceCompressor.does_match(document, [
+            ...     Filter(property='output', operator='contains', value='LONG')])
+            True
+            >>> TraceCompressor.does_match(document, [
+            ...     Filter(property='output', operator='=', value='long')])
+            False
+        """
+
+        for f in filters:
+            value: Any = document
+            for key in get_document_path(f.property):
+                value = value.get(key) if isinstance(value, dict) else None
+
+            if (
+                isinstance(value, dict)
+                and COMPRESSED_KEY in value
+                and not does_match_value(TraceCompressor._decompress_value(value), f)
+            ):
+                return False
+
+        return True
+
+    def _compress_value(self, value: Any) -> Any:
+        if value is None:
+            return value
+
+        serialised = json.dumps(value, default=pydantic_encoder).encode("utf-8")
+        if len(serialised) <= self.threshold_in_bytes:  # type: ignore
+            return value
+
+        data: bytes = (
+            zstandard.ZstdCompressor().compress(serialised)
+            if self.algorithm == "zstd"
+            else zlib.compress(serialised)
+        )
+
+        return {
+            COMPRESSED_KEY: self.algorithm,
+            "data": data if self.binary else base64.b64encode(data).decode("ascii"),
+        }
+
+    @staticmethod
+    def _decompress_value(value: Any) -> Any:
+        if not isinstance(value, dict) or COMPRESSED_KEY not in value:
+            return value
+
+        data = value["data"]
+        if isinstance(data, str):
+            data = base64.b64decode(data)
+
+        if value[COMPRESSED_KEY] == "zstd":
+            if zstandard is None:
+                raise ImportError(
+                    "The trace has been compressed using zstd, install `zstandard` to "
+                    "read it"
+                )
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = zlib.decompress(data)
+
+        return json.loads(data)
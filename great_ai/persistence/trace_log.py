@@ -0,0 +1,486 @@
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from multiprocessing.synchronize import Lock
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from ..views import Trace
+from .file_lock import FileLock
+from .get_search_tokens import get_indexed_tokens
+from .inverted_index import InvertedIndex
+
+
+class _Entry(NamedTuple):
+    offset: int
+    created: str
+    tags: List[str]
+    has_feedback: bool
+
+
+class TraceLog:
+    """Append-only JSON Lines file of traces with in-memory indexes.
+
+    Each line of the file is either a serialised trace or a deletion marker
+    (`{"deleted": "<trace_id>"}`), the last line referring to a trace_id wins. Thus,
+    inserting, updating, and deleting traces only appends to the end of the file.
+
+    The offset, creation time, tags, and feedback-state of each live trace are kept in
+    memory. If `text_index` is set, the words of the logged values and the outputs are
+    also indexed (see `InvertedIndex`). Before each operation, the lines appended by
+    other processes are read incrementally. Once most of the lines are obsolete, the
+    file is compacted by a background thread.
+
+    `lock` only synchronises the processes sharing it (for example, the forks of a
+    process). Every write and the replacement of the file by `compact` also hold an
+    exclusive `FileLock` (`<path>.lock`), so that independently started processes can
+    share the file as well.
+    """
+
+    min_obsolete_lines_before_compaction = 1000
+
+    def __init__(self, path: Path, lock: Lock, *, text_index: bool = False) -> None:
+        self.path = path
+        self._lock = lock
+        self._file_lock = FileLock(path.with_name(path.name + ".lock"))
+        self._text_index = InvertedIndex() if text_index else None
+
+        self._index: Dict[str, _Entry] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._by_created: List[Tuple[str, str]] = []
+        self._with_feedback: Set[str] = set()
+
+        self._line_count = 0
+        self._position = 0
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._reader: Optional[BinaryIO] = None
+        self._pid = os.getpid()
+        self._is_compacting = False
+
+    def append(self, traces: Sequence[Trace]) -> None:
+        lines = [trace.json().encode("utf-8") + b"\n" for trace in traces]
+
+        with self._lock, self._file_lock:
+            self._refresh()
+            offset = self._write(b"".join(lines))
+
+            for trace, line in zip(traces, lines):
+                self._put(
+                    trace.trace_id,
+                    _Entry(
+                        offset=offset,
+                        created=trace.created,
+                        tags=trace.tags,
+                        has_feedback=trace.feedback is not None,
+                    ),
+                    document=None if self._text_index is None else json.loads(line),
+                )
+                offset += len(line)
+            self._position = offset
+            self._line_count += len(lines)
+
+            should_compact = self._should_compact()
+
+        if should_compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._lock, self._file_lock:
+            self._refresh()
+            self._append_deletions(ids)
+            should_compact = self._should_compact()
+
+        if should_compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def delete_where(
+        self,
+        *,
+        tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        search: Sequence[Tuple[str, Set[str]]] = [],
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> int:
+        """Delete the traces matching every condition and return their number.
+
+        The conditions are the same as those of `select`. The lines of the candidates
+        are only read if `predicate` is given, the deletion markers are appended in a
+        single write.
+        """
+
+        with self._lock, self._file_lock:
+            self._refresh()
+            ids = self._select_ids(
+                tags=tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=search,
+            )
+            if predicate is not None:
+                ids = [
+                    id for id in ids if predicate(self._read(self._index[id].offset))
+                ]
+            self._append_deletions(ids)
+            should_compact = self._should_compact()
+
+        if should_compact:
+            threading.Thread(target=self.compact, daemon=True).start()
+
+        return len(ids)
+
+    def get(self, id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            entry = self._index.get(id)
+            return None if entry is None else self._read(entry.offset)
+
+    def select(
+        self,
+        *,
+        tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        search: Sequence[Tuple[str, Set[str]]] = [],
+        skip: int = 0,
+        take: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Return a page of the traces matching every condition and their count.
+
+        The traces are ordered by their insertion, only the lines of the returned page
+        are read from the file. If the text index is enabled, only the traces having
+        a word containing each token of each `(property, tokens)` pair of `search` are
+        returned; otherwise, `search` is ignored.
+        """
+
+        with self._lock:
+            self._refresh()
+            ids = self._select_ids(
+                tags=tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=search,
+            )
+            page = ids[skip:] if take is None else ids[skip : skip + take]
+            return [self._read(self._index[id].offset) for id in page], len(ids)
+
+    def iter_select(
+        self,
+        *,
+        tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        search: Sequence[Tuple[str, Set[str]]] = [],
+        batch_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the traces matching every condition.
+
+        The traces are ordered by their insertion. The matching trace_ids are selected
+        upfront, but their lines are only read `batch_size` at a time. Traces deleted
+        in the meantime are skipped.
+        """
+
+        with self._lock:
+            self._refresh()
+            ids = self._select_ids(
+                tags=tags,
+                since=since,
+                until=until,
+                has_feedback=has_feedback,
+                search=search,
+            )
+
+        for start in range(0, len(ids), batch_size):
+            with self._lock:
+                self._refresh()
+                batch = [
+                    self._read(self._index[id].offset)
+                    for id in ids[start : start + batch_size]
+                    if id in self._index
+                ]
+            yield from batch
+
+    def compact(self) -> None:
+        """Rewrite the file so that it only contains the latest version of each trace.
+
+        The live lines are copied without holding the locks, only the lines appended
+        in the meantime are copied while the writers are waiting. Only one process
+        compacts the file at a time (see `FileLock`), the others skip it.
+        """
+
+        compaction_lock = FileLock(
+            self.path.with_name(self.path.name + ".compaction.lock")
+        )
+        temporary_path: Optional[Path] = None
+
+        try:
+            if not compaction_lock.acquire(blocking=False):
+                return  # another process is compacting it
+
+            with self._lock:
+                self._refresh()
+                self._is_compacting = True
+                if self._file_id is None:
+                    return
+
+                file_id = self._file_id
+                end = self._position
+                line_count = self._line_count
+                snapshot = [(id, entry.offset) for id, entry in self._index.items()]
+                source = open(self.path, "rb")
+
+            with source, tempfile.NamedTemporaryFile(
+                dir=self.path.parent,
+                prefix=self.path.name + ".",
+                suffix=".compacting",
+                delete=False,
+            ) as target:
+                temporary_path = Path(target.name)
+                new_offsets: Dict[str, int] = {}
+                for id, offset in snapshot:
+                    source.seek(offset)
+                    new_offsets[id] = target.tell()
+                    target.write(source.readline())
+
+                with self._lock, self._file_lock:
+                    self._refresh()
+                    if self._file_id != file_id:
+                        return  # another process has already compacted it
+
+                    source.seek(end)
+                    tail = source.read(self._position - end)
+                    base = target.tell()
+                    target.write(tail)
+                    target.close()
+                    os.replace(temporary_path, self.path)
+
+                    for id, entry in self._index.items():
+                        self._index[id] = entry._replace(
+                            offset=new_offsets[id]
+                            if entry.offset < end
+                            else base + entry.offset - end
+                        )
+                    self._line_count = len(snapshot) + self._line_count - line_count
+                    self._position = base + len(tail)
+                    self._close_reader()
+                    stat = os.stat(self.path)
+                    self._file_id = (stat.st_dev, stat.st_ino)
+        finally:
+            self._is_compacting = False
+            compaction_lock.release()
+            if temporary_path is not None and temporary_path.exists():
+                temporary_path.unlink()
+
+    def _select_ids(
+        self,
+        *,
+        tags: Sequence[str],
+        since: Optional[datetime],
+        until: Optional[datetime],
+        has_feedback: Optional[bool],
+        search: Sequence[Tuple[str, Set[str]]],
+    ) -> List[str]:
+        candidates: Optional[Set[str]] = None
+        for tag in sorted(set(tags), key=lambda t: len(self._tags.get(t, ()))):
+            ids = self._tags.get(tag, set())
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        if self._text_index is not None:
+            for property, tokens in search:
+                ids = self._text_index.get_candidates(property, tokens)
+                candidates = ids if candidates is None else candidates & ids
+
+        if since is not None or until is not None:
+            start = (
+                0
+                if since is None
+                else bisect_left(self._by_created, (since.isoformat(), ""))
+            )
+            end = (
+                len(self._by_created)
+                if until is None
+                else bisect_right(self._by_created, (until.isoformat(), "\uffff"))
+            )
+            ids = {id for _, id in self._by_created[start:end]}
+            candidates = ids if candidates is None else candidates & ids
+
+        if has_feedback is not None:
+            if candidates is None:
+                candidates = set(self._index)
+            candidates = (
+                candidates & self._with_feedback
+                if has_feedback
+                else candidates - self._with_feedback
+            )
+
+        return (
+            list(self._index)
+            if candidates is None
+            else [id for id in self._index if id in candidates]
+        )
+
+    def _should_compact(self) -> bool:
+        obsolete_line_count = self._line_count - len(self._index)
+        if (
+            self._is_compacting
+            or obsolete_line_count < self.min_obsolete_lines_before_compaction
+            or obsolete_line_count < len(self._index)
+        ):
+            return False
+
+        self._is_compacting = True
+        return True
+
+    def _refresh(self) -> None:
+        if self._pid != os.getpid():
+            # file handles must not be shared with forked processes
+            self._pid = os.getpid()
+            self._reader = None
+            self._is_compacting = False
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._file_id is not None:
+                self._reset()
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._position:
+            self._reset()
+            self._file_id = file_id
+
+        if stat.st_size > self._position:
+            reader = self._get_reader()
+            reader.seek(self._position)
+            for line in reader:
+                if not line.endswith(b"\n"):
+                    break  # it is still being written
+
+                document = json.loads(line)
+                if "trace_id" in document:
+                    self._put(
+                        document["trace_id"],
+                        _Entry(
+                            offset=self._position,
+                            created=document["created"],
+                            tags=document["tags"],
+                            has_feedback=document.get("feedback") is not None,
+                        ),
+                        document=document,
+                    )
+                else:
+                    self._remove(document["deleted"])
+
+                self._position += len(line)
+                self._line_count += 1
+
+    def _write(self, lines: bytes) -> int:
+        """Append the lines to the file and return their offset.
+
+        The file lock has to be held.
+        """
+
+        with open(self.path, "ab") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(lines)
+
+        if self._file_id is None:
+            stat = os.stat(self.path)
+            self._file_id = (stat.st_dev, stat.st_ino)
+        return offset
+
+    def _read(self, offset: int) -> Dict[str, Any]:
+        reader = self._get_reader()
+        reader.seek(offset)
+        return json.loads(reader.readline())
+
+    def _put(self, id: str, entry: _Entry, document: Optional[Dict[str, Any]]) -> None:
+        if id in self._index:
+            self._unindex(id)
+
+        self._index[id] = entry  # updating keeps the original position
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(id)
+        insort(self._by_created, (entry.created, id))
+        if entry.has_feedback:
+            self._with_feedback.add(id)
+        if self._text_index is not None and document is not None:
+            self._text_index.put(id, get_indexed_tokens(document))
+
+    def _append_deletions(self, ids: Iterable[str]) -> None:
+        ids = [id for id in dict.fromkeys(ids) if id in self._index]
+        if not ids:
+            return
+
+        lines = b"".join(
+            json.dumps({"deleted": id}).encode("utf-8") + b"\n" for id in ids
+        )
+        offset = self._write(lines)
+
+        for id in ids:
+            self._remove(id)
+        self._position = offset + len(lines)
+        self._line_count += len(ids)
+
+    def _remove(self, id: str) -> None:
+        if id in self._index:
+            self._unindex(id)
+            del self._index[id]
+
+    def _unindex(self, id: str) -> None:
+        entry = self._index[id]
+        for tag in entry.tags:
+            self._tags[tag].discard(id)
+            if not self._tags[tag]:
+                del self._tags[tag]
+
+        position = bisect_left(self._by_created, (entry.created, id))
+        del self._by_created[position]
+        self._with_feedback.discard(id)
+        if self._text_index is not None:
+            self._text_index.remove(id)
+
+    def _reset(self) -> None:
+        self._index.clear()
+        self._tags.clear()
+        self._by_created.clear()
+        self._with_feedback.clear()
+        if self._text_index is not None:
+            self._text_index.clear()
+        self._line_count = 0
+        self._position = 0
+        self._file_id = None
+        self._close_reader()
+
+    def _get_reader(self) -> BinaryIO:
+        if self._reader is None:
+            self._reader = open(self.path, "rb")
+        return self._reader
+
+    def _close_reader(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
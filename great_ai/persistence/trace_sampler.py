@@ -0,0 +1,94 @@
+import random
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+from ..views import PersistencePolicy, Trace
+
+
+class TraceSampler:
+    """Decide which traces to persist according to a `PersistencePolicy`.
+
+    The execution time percentile of `keep_slow_percentile` is estimated from the last
+    `window_size` traces (including the ones that are not persisted). It is
+    recalculated after every `window_size // 10` traces, and slow traces are only
+    recognised once `min_observations` traces have been seen.
+
+    Examples:
+        >>> sampler = TraceSampler(PersistencePolicy(sample_rate=0, keep_exceptions=True))
+        >>> trace = Trace(trace_id='a', created='2022-07-11T14:31:46', models=[],
+        ...     original_execution_time_ms=3, logged_values={}, exception=None,
+        ...     output=1, tags=[])
+        >>> sampler.should_persist(trace)
+        False
+        >>> sampler.should_persist(trace.copy(update={'exception': 'ValueError'}))
+        True
+    """
+
+    def __init__(
+        self,
+        policy: PersistencePolicy,
+        *,
+        window_size: int = 1000,
+        min_observations: int = 100,
+    ) -> None:
+        if not 0 <= policy.sample_rate <= 1:
+            raise ValueError("`sample_rate` must be between 0 and 1")
+        if policy.keep_slow_percentile is not None and not (
+            0 <= policy.keep_slow_percentile <= 100
+        ):
+            raise ValueError("`keep_slow_percentile` must be between 0 and 100")
+
+        self._policy = policy
+        self._min_observations = min_observations
+        self._recalculation_interval = max(1, window_size // 10)
+
+        self._lock = threading.Lock()
+        self._execution_times: Deque[float] = deque(maxlen=window_size)
+        self._observations_since_recalculation = 0
+        self._slow_threshold_ms: Optional[float] = None
+
+    @property
+    def slow_threshold_ms(self) -> Optional[float]:
+        """The current estimate of the `keep_slow_percentile` percentile."""
+        return self._slow_threshold_ms
+
+    def should_persist(self, trace: Trace) -> bool:
+        policy = self._policy
+
+        if policy.keep_slow_percentile is not None:
+            self._observe(trace.original_execution_time_ms)
+
+        if policy.sample_rate >= 1:
+            return True
+
+        if policy.keep_exceptions and trace.exception is not None:
+            return True
+
+        if policy.keep_with_feedback and trace.feedback is not None:
+            return True
+
+        threshold = self._slow_threshold_ms
+        if threshold is not None and trace.original_execution_time_ms > threshold:
+            return True
+
+        return random.random() < policy.sample_rate
+
+    def _observe(self, execution_time_ms: float) -> None:
+        with self._lock:
+            self._execution_times.append(execution_time_ms)
+            self._observations_since_recalculation += 1
+
+            if (
+                len(self._execution_times) >= self._min_observations
+                and self._observations_since_recalculation
+                >= self._recalculation_interval
+            ):
+                self._observations_since_recalculation = 0
+                ordered = sorted(self._execution_times)
+                index = round(
+                    self._policy.keep_slow_percentile  # type: ignore
+                    / 100
+                    * (len(ordered) - 1)
+                )
+                self._slow_threshold_ms = ordered[index]
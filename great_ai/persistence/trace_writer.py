@@ -0,0 +1,337 @@
+import asyncio
+import atexit
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from logging import Logger
+from time import monotonic
+from typing import Deque, List, Optional, Sequence
+
+from ..views import (
+    PersistencePolicy,
+    PersistenceStatistics,
+    Trace,
+    WriteBehindConfig,
+)
+from .async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .trace_aggregator import TraceAggregator
+from .trace_sampler import TraceSampler
+from .tracing_database_driver import TracingDatabaseDriver
+
+
+class TraceWriter:
+    """Persist finished traces either synchronously or from a background thread.
+
+    Without a `config`, each call to `save` is directly forwarded to the database.
+    Otherwise, the traces are buffered in memory and written using `save_batch` once
+    `max_batch_size` traces are waiting or `flush_interval_ms` has elapsed. The
+    buffer is bounded by `max_queue_size`, the `overflow_policy` decides what happens
+    when it is full.
+
+    The background thread is started lazily in the process that created the
+    TraceWriter. In forked child processes (for example, in `process_batch`), traces are
+    saved synchronously.
+
+    The traces not selected by the `policy` are discarded before being buffered. If
+    the policy has a `retention_days`, the database is asked to expire the old traces
+    by itself; if it cannot, they are pruned from a background thread at most once
+    every `pruning_interval_seconds`, triggered by `save`.
+
+    Every trace passed to `save` (including the ones not selected by the policy) is
+    counted by the `aggregator` if there is one.
+
+    `save_async` and `flush_async` can be used from the event loop without blocking
+    it. The synchronous writes go through `async_database`, which defaults to
+    `database.as_async()`.
+    """
+
+    def __init__(
+        self,
+        database: TracingDatabaseDriver,
+        logger: Logger,
+        config: Optional[WriteBehindConfig] = None,
+        policy: PersistencePolicy = PersistencePolicy(),
+        async_database: Optional[AsyncTracingDatabaseDriver] = None,
+        aggregator: Optional[TraceAggregator] = None,
+    ) -> None:
+        self._database = database
+        self._aggregator = aggregator
+        self._async_database = (
+            database.as_async() if async_database is None else async_database
+        )
+        self._logger = logger
+        self._config = config
+        self._policy = policy
+        self._sampler = TraceSampler(policy)
+
+        self._retention = (
+            None
+            if policy.retention_days is None
+            else timedelta(days=policy.retention_days)
+        )
+        self._should_prune = self._retention is not None and not (
+            database.configure_retention(
+                self._retention, keep_with_feedback=policy.keep_with_feedback
+            )
+        )
+        self._last_pruned_at = -float("inf")
+        self._is_pruning = False
+
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self._buffer: Deque[Trace] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._should_flush = False
+        self._is_closing = False
+
+        self._saved = 0
+        self._dropped = 0
+        self._failed = 0
+        self._flushes = 0
+        self._sampled_out = 0
+        self._pruned = 0
+
+    @property
+    def statistics(self) -> PersistenceStatistics:
+        with self._condition:
+            return PersistenceStatistics(
+                is_write_behind=self._config is not None,
+                queued=len(self._buffer) + self._in_flight,
+                saved=self._saved,
+                dropped=self._dropped,
+                failed=self._failed,
+                flushes=self._flushes,
+                sampled_out=self._sampled_out,
+                pruned=self._pruned,
+            )
+
+    def save(self, traces: Sequence[Trace]) -> None:
+        traces = self._select(traces)
+
+        if self._config is None or self._pid != os.getpid():
+            self._write(traces, should_raise=True)
+            return
+
+        self._enqueue(traces)
+
+    async def save_async(self, traces: Sequence[Trace]) -> None:
+        """Save the traces like `save` but without blocking the event loop."""
+
+        traces = self._select(traces)
+
+        if self._config is None or self._pid != os.getpid():
+            await self._write_async(traces)
+        elif self._config.overflow_policy in ("drop_newest", "drop_oldest"):
+            self._enqueue(traces)  # cannot block
+        else:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._enqueue, traces
+            )
+
+    def _select(self, traces: Sequence[Trace]) -> List[Trace]:
+        if self._aggregator is not None:
+            self._aggregator.add(traces)
+
+        if self._should_prune:
+            self._prune_if_due()
+
+        kept = [t for t in traces if self._sampler.should_persist(t)]
+        if len(kept) < len(traces):
+            with self._condition:
+                self._sampled_out += len(traces) - len(kept)
+
+        return kept
+
+    def _enqueue(self, traces: List[Trace]) -> None:
+        config = self._config
+        assert config is not None
+        overflow: List[Trace] = []
+
+        with self._condition:
+            if self._thread is None:
+                self._start()
+
+            for trace in traces:
+                if len(self._buffer) >= config.max_queue_size:
+                    if config.overflow_policy == "block":
+                        self._condition.notify_all()
+                        self._condition.wait_for(
+                            lambda: len(self._buffer) < config.max_queue_size
+                        )
+                    elif config.overflow_policy == "drop_newest":
+                        self._dropped += 1
+                        continue
+                    elif config.overflow_policy == "drop_oldest":
+                        self._buffer.popleft()
+                        self._dropped += 1
+                    else:
+                        overflow.append(trace)
+                        continue
+
+                self._buffer.append(trace)
+
+            if len(self._buffer) >= config.max_batch_size:
+                self._condition.notify_all()
+
+        if overflow:
+            self._write(overflow, should_raise=True)
+
+    def flush(self) -> None:
+        """Block until every buffered trace has been written."""
+
+        with self._condition:
+            if self._thread is None or self._pid != os.getpid():
+                return
+
+            self._should_flush = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: not self._buffer and not self._in_flight)
+            self._should_flush = False
+
+    def prune(self) -> int:
+        """Delete the traces older than the `retention_days` of the policy.
+
+        Return the number of deleted traces.
+        """
+
+        if self._retention is None:
+            return 0
+
+        pruned = self._database.prune(
+            datetime.utcnow() - self._retention,
+            keep_with_feedback=self._policy.keep_with_feedback,
+        )
+        with self._condition:
+            self._pruned += pruned
+        return pruned
+
+    async def flush_async(self) -> None:
+        """Wait until every buffered trace has been written without blocking the loop."""
+
+        if self._thread is None or self._pid != os.getpid():
+            return
+
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def close(self) -> None:
+        """Flush the buffer and the aggregator, and stop the background thread."""
+
+        self.flush()
+        if self._aggregator is not None:
+            self._aggregator.close()
+
+        with self._condition:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._is_closing = True
+            self._condition.notify_all()
+
+        thread.join()
+
+        with self._condition:
+            self._thread = None
+            self._is_closing = False
+
+    def _start(self) -> None:
+        self._thread = threading.Thread(
+            name="great_ai_trace_writer", target=self._run, daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _prune_if_due(self) -> None:
+        with self._condition:
+            now = monotonic()
+            if (
+                self._is_pruning
+                or now - self._last_pruned_at < self._policy.pruning_interval_seconds
+            ):
+                return
+            self._is_pruning = True
+            self._last_pruned_at = now
+
+        threading.Thread(
+            name="great_ai_trace_pruner", target=self._prune_in_background, daemon=True
+        ).start()
+
+    def _prune_in_background(self) -> None:
+        try:
+            pruned = self.prune()
+            if pruned:
+                self._logger.info(f"Deleted {pruned} expired trace(s)")
+        except Exception:
+            self._logger.exception("Could not delete the expired traces")
+        finally:
+            with self._condition:
+                self._is_pruning = False
+
+    def _run(self) -> None:
+        config = self._config
+        assert config is not None
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._buffer) >= config.max_batch_size
+                    or (self._should_flush and bool(self._buffer))
+                    or self._is_closing,
+                    timeout=config.flush_interval_ms / 1000,
+                )
+
+                if self._is_closing and not self._buffer:
+                    return
+
+                batch = [
+                    self._buffer.popleft()
+                    for _ in range(min(len(self._buffer), config.max_batch_size))
+                ]
+                self._in_flight = len(batch)
+                self._condition.notify_all()  # wake up blocked producers
+
+            if batch:
+                self._write(batch, should_raise=False)
+
+            with self._condition:
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def _write(self, traces: List[Trace], should_raise: bool) -> None:
+        if not traces:
+            return
+
+        try:
+            if len(traces) == 1:
+                self._database.save(traces[0])
+            else:
+                self._database.save_batch(traces)
+        except Exception:
+            with self._condition:
+                self._failed += len(traces)
+            if should_raise:
+                raise
+            self._logger.exception(f"Could not save {len(traces)} trace(s)")
+        else:
+            with self._condition:
+                self._saved += len(traces)
+                self._flushes += 1
+
+    async def _write_async(self, traces: List[Trace]) -> None:
+        if not traces:
+            return
+
+        try:
+            if len(traces) == 1:
+                await self._async_database.save(traces[0])
+            else:
+                await self._async_database.save_batch(traces)
+        except Exception:
+            with self._condition:
+                self._failed += len(traces)
+            raise
+        else:
+            with self._condition:
+                self._saved += len(traces)
+                self._flushes += 1
@@ -1,17 +1,60 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Sequence, Tuple, Union
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from ..utilities import ConfigFile
-from ..views import Filter, SortBy, Trace
+from ..utilities import ConfigFile, chunk
+from ..views import (
+    ConnectionPoolStatistics,
+    ContinuationToken,
+    Filter,
+    MigrationReport,
+    QueryPlan,
+    SortBy,
+    Trace,
+    TraceStatisticsBucket,
+)
+from ..views.compression_algorithm import CompressionAlgorithm
+from ..views.count_mode import CountMode
+from .async_tracing_database_driver import AsyncTracingDatabaseDriver
+from .threaded_async_tracing_database_driver import ThreadedAsyncTracingDatabaseDriver
+from .trace_compressor import TraceCompressor
 
 
 class TracingDatabaseDriver(ABC):
-    """Interface expected from a database to be used for storing traces."""
+    """Interface expected from a database to be used for storing traces.
+
+    Attributes:
+        compression_threshold_in_bytes: Compress the non-numeric logged values, the
+            output, and the feedback of the traces if their JSON representation is
+            longer than this (see `TraceCompressor`). `None` disables compression.
+            Only supported by MongoDbDriver and SqliteDriver. The `contains` filters
+            and the comparisons with strings of these fields are evaluated in memory
+            for the compressed values, and so are the paging and the counting of
+            their results.
+        compression_algorithm: `zstd` (falls back to `zlib` if the `zstandard`
+            package is not installed) or `zlib`.
+        text_index: Maintain an inverted index of the words of the logged values and
+            the outputs, so that literal (non-regex) `contains` filters only have to
+            check the traces containing the searched words.
+            Not supported by ParallelTinyDbDriver in `json` storage mode.
+        time_ordered_ids: Every trace_id has been generated by
+            `generate_time_ordered_trace_id` (see the `trace_id_generator` of
+            `configure`), so the `since` and `until` filters can also be applied to
+            the (always indexed) IDs. Only used by MongoDbDriver, the other drivers
+            have an index on the creation time.
+    """
 
     is_production_ready: bool
     initialized: bool = False
+    compression_threshold_in_bytes: Optional[int] = None
+    compression_algorithm: CompressionAlgorithm = "zstd"
+    text_index: bool = False
+    time_ordered_ids: bool = False
+
+    def __init__(self) -> None:
+        # the buckets of `merge_statistics` if the driver does not store them
+        self._statistics: Dict[str, TraceStatisticsBucket] = {}
 
     @classmethod
     def configure_credentials_from_file(
@@ -28,6 +71,19 @@ class TracingDatabaseDriver(ABC):
     ) -> None:
         cls.initialized = True
 
+    @property
+    def connection_pool_statistics(self) -> Optional[ConnectionPoolStatistics]:
+        """Usage of the connection pool if the driver has one."""
+        return None
+
+    def as_async(self) -> AsyncTracingDatabaseDriver:
+        """Return an interface of the database that does not block the event loop.
+
+        By default, the methods of the driver are run in a pool of threads.
+        """
+
+        return ThreadedAsyncTracingDatabaseDriver(self)
+
     @abstractmethod
     def save(self, document: Trace) -> str:
         pass
@@ -54,9 +110,165 @@ class TracingDatabaseDriver(ABC):
         until: Optional[datetime] = None,
         since: Optional[datetime] = None,
         has_feedback: Optional[bool] = None,
-        sort_by: Sequence[SortBy] = []
-    ) -> Tuple[List[Trace], int]:
-        pass
+        sort_by: Sequence[SortBy] = [],
+        continuation_token: Optional[str] = None,
+        count: CountMode = "exact",
+    ) -> Tuple[List[Trace], Optional[int]]:
+        """Return a page of the matching traces and the number of all matches.
+
+        When `sort_by` is given, ties are broken by the `trace_id`s so that the order
+        is deterministic. In this case, instead of `skip`, the next page can be
+        requested by passing the token created by `create_continuation_token` from the
+        last trace of the current page (keyset pagination).
+
+        Counting every match can be costly. With `count="approximate"`, the driver may
+        return an estimate or a lower bound; with `count="none"`, it may return `None`.
+        Drivers for which counting is free always return the exact count.
+        """
+
+    def iter_query(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+        batch_size: int = 1000,
+    ) -> Iterator[Trace]:
+        """Lazily yield every matching trace.
+
+        Unlike `query`, the traces are fetched in batches of `batch_size`, so only a
+        single batch has to be kept in memory. The default implementation requests the
+        batches from `query` using keyset pagination; if `sort_by` is empty, the
+        traces are ordered by their creation time.
+        """
+
+        sort_by = list(sort_by) or [SortBy(column_id="created", direction="asc")]
+        continuation_token: Optional[str] = None
+
+        while True:
+            traces, _ = self.query(
+                take=batch_size,
+                conjunctive_filters=conjunctive_filters,
+                conjunctive_tags=conjunctive_tags,
+                until=until,
+                since=since,
+                has_feedback=has_feedback,
+                sort_by=sort_by,
+                continuation_token=continuation_token,
+                count="none",
+            )
+            yield from traces
+
+            if len(traces) < batch_size:
+                return
+            continuation_token = self.create_continuation_token(traces[-1], sort_by)
+
+    def create_continuation_token(self, trace: Trace, sort_by: Sequence[SortBy]) -> str:
+        """Return the `continuation_token` of the page starting after `trace`."""
+
+        return ContinuationToken.create(trace, sort_by)
+
+    def create_indexes(self, properties: Sequence[str]) -> None:
+        """Create secondary indexes for filtering and sorting by the given properties.
+
+        The properties are columns of `Trace.to_flat_dict`, for example,
+        `arg:text:value` or `metric:accuracy`. The indexes are maintained by the
+        database from then on. By default, nothing is indexed.
+        """
+
+    def explain(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+        sort_by: Sequence[SortBy] = [],
+    ) -> QueryPlan:
+        """Report how `query` finds the traces matching the arguments.
+
+        By default, every trace is scanned.
+        """
+
+        return QueryPlan(uses_index=False)
+
+    def migrate(self, batch_size: int = 1000) -> MigrationReport:
+        """Rewrite the traces saved by earlier versions into the current format.
+
+        By default, there is nothing to migrate.
+        """
+
+        return MigrationReport()
+
+    def merge_statistics(self, buckets: Sequence[TraceStatisticsBucket]) -> None:
+        """Add the `buckets` to the stored statistics buckets with the same `start`.
+
+        The statistics are cumulative: deleting, pruning, or expiring traces does not
+        change them. By default, the buckets are only kept in the memory of the
+        process.
+        """
+
+        for bucket in buckets:
+            self._statistics.setdefault(
+                bucket.start, TraceStatisticsBucket(start=bucket.start)
+            ).merge(bucket)
+
+    def get_statistics(
+        self, *, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> List[TraceStatisticsBucket]:
+        """Return the stored statistics buckets starting in [`since`, `until`).
+
+        The buckets are ordered by their `start`.
+        """
+
+        return [
+            bucket.copy(deep=True)
+            for start, bucket in sorted(self._statistics.items())
+            if (since is None or start >= since.isoformat())
+            and (until is None or start < until.isoformat())
+        ]
+
+    def configure_retention(
+        self, retention: timedelta, *, keep_with_feedback: bool = True
+    ) -> bool:
+        """Let the database delete the traces older than `retention` by itself.
+
+        Return `False` if the database has no built-in expiry; in this case, `prune`
+        has to be called periodically.
+        """
+
+        return False
+
+    def prune(self, older_than: datetime, *, keep_with_feedback: bool = True) -> int:
+        """Delete the traces created before `older_than` and return their number.
+
+        The default implementation collects the IDs of the matching traces using
+        `iter_query` and removes them with `delete_batch` in chunks.
+        """
+
+        ids = [
+            trace.trace_id
+            for trace in self.iter_query(
+                until=older_than, has_feedback=False if keep_with_feedback else None
+            )
+            if trace.created < older_than.isoformat()
+        ]
+
+        for ids_chunk in chunk(ids, chunk_size=10000):
+            self.delete_batch(ids_chunk)
+
+        return len(ids)
+
+    def _get_compressed_filters(self, filters: Sequence[Filter]) -> List[Filter]:
+        """Return the filters which the database cannot evaluate on compressed values."""
+
+        if self.compression_threshold_in_bytes is None:
+            return []
+        return [f for f in filters if TraceCompressor.may_be_compressed(f)]
 
     @abstractmethod
     def update(self, id: str, new_version: Trace) -> None:
@@ -72,3 +284,35 @@ class TracingDatabaseDriver(ABC):
         ids: List[str],
     ) -> None:
         pass
+
+    def delete_where(
+        self,
+        *,
+        conjunctive_filters: Sequence[Filter] = [],
+        conjunctive_tags: Sequence[str] = [],
+        until: Optional[datetime] = None,
+        since: Optional[datetime] = None,
+        has_feedback: Optional[bool] = None,
+    ) -> int:
+        """Delete every trace matched by the arguments (see `query`) and return their number.
+
+        The default implementation collects the IDs of the matching traces using
+        `iter_query` and removes them with `delete_batch` in chunks. The drivers
+        override it to delete the traces in a single pass without parsing them.
+        """
+
+        ids = [
+            trace.trace_id
+            for trace in self.iter_query(
+                conjunctive_filters=conjunctive_filters,
+                conjunctive_tags=conjunctive_tags,
+                until=until,
+                since=since,
+                has_feedback=has_feedback,
+            )
+        ]
+
+        for ids_chunk in chunk(ids, chunk_size=10000):
+            self.delete_batch(ids_chunk)
+
+        return len(ids)
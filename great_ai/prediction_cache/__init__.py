@@ -0,0 +1,3 @@
+from .in_memory_prediction_cache import InMemoryPredictionCache
+from .prediction_cache import PredictionCache
+from .sqlite_prediction_cache import SqlitePredictionCache
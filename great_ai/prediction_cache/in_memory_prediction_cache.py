@@ -0,0 +1,92 @@
+import pickle
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+from ..views import Trace
+from .prediction_cache import PredictionCache
+
+
+class _Entry(NamedTuple):
+    trace: Trace
+    expires_at: Optional[float]
+    size_in_bytes: int
+
+
+class InMemoryPredictionCache(PredictionCache):
+    """PredictionCache storing the traces in the memory of the current process.
+
+    The default backend. Each worker process has its own copy of the cache.
+
+    The size of the entries is only measured (by pickling them) if
+    `max_size_in_bytes` is set.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        max_size: int,
+        ttl_seconds: Optional[float] = None,
+        max_size_in_bytes: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            namespace,
+            max_size=max_size,
+            ttl_seconds=ttl_seconds,
+            max_size_in_bytes=max_size_in_bytes,
+        )
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._size_in_bytes = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_in_bytes = 0
+
+    def _get(self, key: str, now: float) -> Optional[Trace]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires_at is not None and entry.expires_at <= now:
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry.trace
+
+    def _set(
+        self, key: str, trace: Trace, now: float, expires_at: Optional[float]
+    ) -> None:
+        size_in_bytes = (
+            0 if self.max_size_in_bytes is None else len(pickle.dumps(trace))
+        )
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _Entry(trace, expires_at, size_in_bytes)
+            self._size_in_bytes += size_in_bytes
+
+            while self._entries and (
+                len(self._entries) > self.max_size
+                or (
+                    self.max_size_in_bytes is not None
+                    and self._size_in_bytes > self.max_size_in_bytes
+                )
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _get_size(self) -> Tuple[int, Optional[int]]:
+        with self._lock:
+            return len(self._entries), (
+                None if self.max_size_in_bytes is None else self._size_in_bytes
+            )
+
+    def _remove(self, key: str) -> None:
+        self._size_in_bytes -= self._entries.pop(key).size_in_bytes
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from time import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from ..views import CacheStatistics, Trace
+
+
+class PredictionCache(ABC):
+    """Interface expected from a backend storing the traces of previous predictions.
+
+    Each GreatAI instance creates its own cache, the `namespace` is derived from the
+    name and version of the wrapped function. Keys are stable across processes, thus,
+    a backend may share its entries among multiple workers.
+
+    Implementations must be thread-safe. Expired entries are never returned. When
+    the number (or overall size) of entries exceeds the limits, the least recently
+    used ones are evicted.
+
+    Concurrent misses for the same key are coalesced by `get_or_compute` and
+    `get_or_compute_async`: only the first caller computes the trace, the others wait
+    for its result.
+
+    Attributes:
+        namespace: Separates the entries of different functions and versions.
+        max_size: Maximum number of entries in the namespace.
+        ttl_seconds: Entries older than this are treated as missing. `None` means no
+            expiration.
+        max_size_in_bytes: Maximum overall size of the serialised entries in the
+            namespace. `None` means no limit.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        max_size: int,
+        ttl_seconds: Optional[float] = None,
+        max_size_in_bytes: Optional[int] = None,
+    ) -> None:
+        assert max_size >= 1, "The cache has to be able to contain at least one entry"
+        assert ttl_seconds is None or ttl_seconds > 0, "TTL must be positive"
+
+        self.namespace = namespace
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.max_size_in_bytes = max_size_in_bytes
+
+        self._statistics_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+        self._in_flight_lock = threading.Lock()
+        self._in_flight: Dict[str, "Future[Trace]"] = {}
+        self._in_flight_async: Dict[
+            Tuple[asyncio.AbstractEventLoop, str], "asyncio.Future[Trace]"
+        ] = {}
+
+    def get(self, key: str) -> Optional[Trace]:
+        """Return the trace stored under `key` if it exists and has not expired."""
+
+        value = self._get(key, now=time())
+
+        with self._statistics_lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+
+        return value
+
+    def set(self, key: str, trace: Trace) -> None:
+        """Store `trace` under `key`, evicting the least recently used entries."""
+
+        now = time()
+        self._set(
+            key,
+            trace,
+            now=now,
+            expires_at=None if self.ttl_seconds is None else now + self.ttl_seconds,
+        )
+
+    def get_or_compute(self, key: str, compute: Callable[[], Trace]) -> Trace:
+        """Return the cached trace or compute and store it.
+
+        If another thread is already computing the trace of `key`, wait for its
+        result (or exception) instead of computing it again.
+        """
+
+        trace = self.get(key)
+        if trace is not None:
+            return trace
+
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            is_computing = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+
+        if not is_computing:
+            self._record_coalesced()
+            return future.result()
+
+        try:
+            trace = compute()
+            self.set(key, trace)
+            future.set_result(trace)
+            return trace
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    async def get_or_compute_async(
+        self, key: str, compute: Callable[[], Awaitable[Trace]]
+    ) -> Trace:
+        """Return the cached trace or compute and store it.
+
+        If another task of the same event loop is already computing the trace of
+        `key`, wait for its result (or exception) instead of computing it again. The
+        computation is not cancelled if only some of the waiting tasks are cancelled.
+        """
+
+        trace = self.get(key)
+        if trace is not None:
+            return trace
+
+        async def compute_and_set() -> Trace:
+            trace = await compute()
+            self.set(key, trace)
+            return trace
+
+        in_flight_key = (asyncio.get_running_loop(), key)
+        task = self._in_flight_async.get(in_flight_key)
+        if task is None:
+            task = asyncio.ensure_future(compute_and_set())
+            self._in_flight_async[in_flight_key] = task
+            task.add_done_callback(lambda _: self._in_flight_async.pop(in_flight_key))
+        else:
+            self._record_coalesced()
+
+        return await asyncio.shield(task)
+
+    @property
+    def statistics(self) -> CacheStatistics:
+        with self._statistics_lock:
+            hits, misses, coalesced = self._hits, self._misses, self._coalesced
+
+        size, size_in_bytes = self._get_size()
+
+        return CacheStatistics(
+            backend=type(self).__name__,
+            hits=hits,
+            misses=misses,
+            coalesced=coalesced,
+            size=size,
+            max_size=self.max_size,
+            size_in_bytes=size_in_bytes,
+            max_size_in_bytes=self.max_size_in_bytes,
+        )
+
+    def _record_coalesced(self) -> None:
+        with self._statistics_lock:
+            self._coalesced += 1
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every entry of the namespace."""
+
+    @abstractmethod
+    def _get(self, key: str, now: float) -> Optional[Trace]:
+        pass
+
+    @abstractmethod
+    def _set(
+        self, key: str, trace: Trace, now: float, expires_at: Optional[float]
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def _get_size(self) -> Tuple[int, Optional[int]]:
+        pass
@@ -0,0 +1,182 @@
+import os
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from ..views import Trace
+from .prediction_cache import PredictionCache
+
+DEFAULT_PREDICTION_CACHE_FILENAME = "prediction_cache.sqlite"
+
+
+class SqlitePredictionCache(PredictionCache):
+    """PredictionCache shared by every local worker process through an SQLite file.
+
+    The traces are pickled into a single table which is opened in WAL mode so that
+    readers do not block each other. Each process uses its own connection. Suitable
+    for sharing the cache among the workers started by `great-ai --worker_count=N`.
+
+    Examples:
+        >>> SqlitePredictionCache.path_to_db = Path("prediction_cache.sqlite")
+
+    Attributes:
+        path_to_db: Location of the SQLite file.
+    """
+
+    path_to_db = Path(DEFAULT_PREDICTION_CACHE_FILENAME)
+
+    def __init__(
+        self,
+        namespace: str,
+        *,
+        max_size: int,
+        ttl_seconds: Optional[float] = None,
+        max_size_in_bytes: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            namespace,
+            max_size=max_size,
+            ttl_seconds=ttl_seconds,
+            max_size_in_bytes=max_size_in_bytes,
+        )
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._get_connection().execute(
+                "DELETE FROM prediction_cache WHERE namespace = ?", (self.namespace,)
+            )
+
+    def _get(self, key: str, now: float) -> Optional[Trace]:
+        with self._lock:
+            connection = self._get_connection()
+            row = connection.execute(
+                "SELECT value, expires_at FROM prediction_cache "
+                + "WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                connection.execute(
+                    "DELETE FROM prediction_cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                return None
+
+            connection.execute(
+                "UPDATE prediction_cache SET accessed_at = ? "
+                + "WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+
+        return pickle.loads(value)
+
+    def _set(
+        self, key: str, trace: Trace, now: float, expires_at: Optional[float]
+    ) -> None:
+        value = pickle.dumps(trace)
+
+        with self._lock:
+            connection = self._get_connection()
+            with connection:  # a single transaction
+                connection.execute(
+                    "INSERT OR REPLACE INTO prediction_cache "
+                    + "(namespace, key, value, size_in_bytes, expires_at, accessed_at) "
+                    + "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, value, len(value), expires_at, now),
+                )
+                self._evict(connection, now)
+
+    def _get_size(self) -> Tuple[int, Optional[int]]:
+        with self._lock:
+            count, size_in_bytes = (
+                self._get_connection()
+                .execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_in_bytes), 0) "
+                    + "FROM prediction_cache WHERE namespace = ?",
+                    (self.namespace,),
+                )
+                .fetchone()
+            )
+        return count, size_in_bytes
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        connection.execute(
+            "DELETE FROM prediction_cache WHERE namespace = ? AND expires_at <= ?",
+            (self.namespace, now),
+        )
+
+        count, size_in_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size_in_bytes), 0) "
+            + "FROM prediction_cache WHERE namespace = ?",
+            (self.namespace,),
+        ).fetchone()
+
+        if count > self.max_size:
+            connection.execute(
+                "DELETE FROM prediction_cache WHERE namespace = ? AND key IN ("
+                + "SELECT key FROM prediction_cache WHERE namespace = ? "
+                + "ORDER BY accessed_at ASC LIMIT ?)",
+                (self.namespace, self.namespace, count - self.max_size),
+            )
+
+        if (
+            self.max_size_in_bytes is not None
+            and size_in_bytes > self.max_size_in_bytes
+        ):
+            rows = connection.execute(
+                "SELECT key, size_in_bytes FROM prediction_cache WHERE namespace = ? "
+                + "ORDER BY accessed_at ASC",
+                (self.namespace,),
+            )
+
+            to_be_deleted = []
+            for key, size in rows:
+                if size_in_bytes <= self.max_size_in_bytes:
+                    break
+                to_be_deleted.append((self.namespace, key))
+                size_in_bytes -= size
+
+            connection.executemany(
+                "DELETE FROM prediction_cache WHERE namespace = ? AND key = ?",
+                to_be_deleted,
+            )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            # connections must not be shared with forked processes
+            self._pid = os.getpid()
+            self._connection = sqlite3.connect(
+                self.path_to_db,
+                timeout=30,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS prediction_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    size_in_bytes INTEGER NOT NULL,
+                    expires_at REAL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS prediction_cache_accessed_at "
+                + "ON prediction_cache (namespace, accessed_at)"
+            )
+
+        return self._connection
@@ -2,7 +2,6 @@ from datetime import datetime
 from math import ceil
 from random import shuffle
 from typing import Any, Iterable, List, TypeVar, Union, cast
-from uuid import uuid4
 
 from ..constants import (
     GROUND_TRUTH_TAG_NAME,
@@ -94,13 +93,14 @@ def add_ground_truth(
     )
     shuffle(split_tags)
 
-    created = datetime.utcnow().isoformat()
+    created = datetime.utcnow()
+    generate_trace_id = get_context().trace_id_generator
     traces = [
         cast(
             Trace[T],
             Trace(  # avoid ValueError: "Trace" object has no field "__orig_class__"
-                trace_id=str(uuid4()),
-                created=created,
+                trace_id=generate_trace_id(created),
+                created=created.isoformat(),
                 original_execution_time_ms=0,
                 logged_values=X if isinstance(X, dict) else {"input": X},
                 models=[],
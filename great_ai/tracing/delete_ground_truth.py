@@ -15,7 +15,7 @@ def delete_ground_truth(
     Takes the same arguments as `query_ground_truth` but instead of returning them,
     it simply deletes them.
 
-    You can rely on the efficiency of the delete's implementation.
+    The traces are deleted by the database in a single pass, without loading them.
 
     Examples:
         >>> delete_ground_truth(['train', 'test', 'validation'])
@@ -32,10 +32,6 @@ def delete_ground_truth(
     tags = (
         conjunctive_tags if isinstance(conjunctive_tags, list) else [conjunctive_tags]
     )
-    db = get_context().tracing_database
-
-    items, length = db.query(
+    get_context().tracing_database.delete_where(
         conjunctive_tags=tags, until=until, since=since, has_feedback=True
     )
-
-    db.delete_batch([i.trace_id for i in items])
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Iterator, List, Optional, Union
+
+from ..context import get_context
+from ..views import Trace
+
+
+def iter_ground_truth(
+    conjunctive_tags: Union[List[str], str] = [],
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = 1000
+) -> Iterator[Trace]:
+    """Lazily yield training samples.
+
+    Takes the same filters as `query_ground_truth` but instead of returning a list,
+    it yields the traces one by one while fetching them from the database in batches.
+    Hence, arbitrarily large training sets can be processed using constant memory.
+
+    Examples:
+        >>> for trace in iter_ground_truth('train', batch_size=100):
+        ...     pass
+
+    Args:
+        conjunctive_tags: Single tag or a list of tags which the returned traces have to
+            match. The relationship between the tags is conjunctive (AND).
+        since: Only return traces created after the given timestamp. `None` means no
+            filtering.
+        until: Only return traces created before the given timestamp. `None` means no
+            filtering.
+        batch_size: Number of traces fetched from the database at once.
+    """
+
+    tags = (
+        conjunctive_tags if isinstance(conjunctive_tags, list) else [conjunctive_tags]
+    )
+    db = get_context().tracing_database
+
+    return db.iter_query(
+        conjunctive_tags=tags,
+        since=since,
+        until=until,
+        has_feedback=True,
+        batch_size=batch_size,
+    )
@@ -0,0 +1,116 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+DURATION_BUCKETS_SECONDS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe aggregation of the latencies and outcomes of predictions.
+
+    Durations are collected into cumulative histograms labelled by function, the
+    versions of the used models, and stage. The values are rendered in the Prometheus
+    text exposition format. Each process has its own registry.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[_Labels, List[float]] = {}
+        self._counters: Dict[str, Dict[_Labels, float]] = {}
+
+    def observe_duration(
+        self, *, function: str, models: str, stage: str, duration_ms: float
+    ) -> None:
+        labels = (("function", function), ("models", models), ("stage", stage))
+        seconds = duration_ms / 1000
+        bucket_index = bisect_left(DURATION_BUCKETS_SECONDS, seconds)
+
+        with self._lock:
+            histogram = self._histograms.get(labels)
+            if histogram is None:
+                # bucket counts (the last one is +Inf), sum, count
+                histogram = self._histograms[labels] = [0.0] * (
+                    len(DURATION_BUCKETS_SECONDS) + 3
+                )
+            histogram[bucket_index] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def to_prometheus_text(self) -> str:
+        lines: List[str] = []
+
+        with self._lock:
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+            counters = {k: dict(v) for k, v in self._counters.items()}
+
+        if histograms:
+            lines += [
+                "# HELP great_ai_stage_duration_seconds Duration of the stages of "
+                + "the predictions.",
+                "# TYPE great_ai_stage_duration_seconds histogram",
+            ]
+        for labels, histogram in sorted(histograms.items()):
+            cumulative = 0.0
+            for bound, count in zip(
+                [*(str(b) for b in DURATION_BUCKETS_SECONDS), "+Inf"], histogram
+            ):
+                cumulative += count
+                lines.append(
+                    "great_ai_stage_duration_seconds_bucket"
+                    + f"{_format_labels((*labels, ('le', bound)))} {cumulative:g}"
+                )
+            lines.append(
+                f"great_ai_stage_duration_seconds_sum{_format_labels(labels)} "
+                + f"{histogram[-2]:g}"
+            )
+            lines.append(
+                f"great_ai_stage_duration_seconds_count{_format_labels(labels)} "
+                + f"{histogram[-1]:g}"
+            )
+
+        for name, values in sorted(counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    formatted = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{{{formatted}}}" if formatted else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics_registry = MetricsRegistry()
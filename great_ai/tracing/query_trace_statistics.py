@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from ..context import get_context
+from ..persistence.trace_aggregator import TraceAggregator
+from ..views import TraceStatistics, TraceStatisticsBucket
+
+
+def query_trace_statistics(
+    *,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bucket_minutes: Optional[int] = None,
+    quantiles: Sequence[float] = [0.5, 0.9, 0.99],
+) -> List[TraceStatistics]:
+    """Return the number of traces, their error rate, feedback coverage, and latency.
+
+    The statistics are maintained incrementally when the traces are saved, therefore,
+    the cost of the query is proportional to the number of time buckets (5 minutes
+    each) instead of the number of traces. The statistics also include the traces
+    that have been sampled out by the `PersistencePolicy`, and they are cumulative:
+    the traces that have been deleted, pruned, or expired are still counted.
+
+    Examples:
+        >>> query_trace_statistics()
+        [...]
+
+    Args:
+        since: Only include the buckets starting after the given timestamp. `None`
+            means no filtering.
+        until: Only include the buckets starting before the given timestamp. `None`
+            means no filtering.
+        bucket_minutes: Return the statistics of consecutive intervals of this length
+            (aligned to midnight) instead of a single interval. Must be a multiple of
+            5 and divide a day.
+        quantiles: The quantiles of the execution time to estimate (within 1%
+            relative error).
+    """
+
+    context = get_context()
+    bucket_seconds = context.trace_aggregator.bucket_seconds
+
+    if any(not 0 <= q <= 1 for q in quantiles):
+        raise ValueError("The quantiles must be between 0 and 1")
+
+    if bucket_minutes is not None and (
+        bucket_minutes <= 0
+        or bucket_minutes * 60 % bucket_seconds
+        or 24 * 60 % bucket_minutes
+    ):
+        raise ValueError(
+            f"`bucket_minutes` must be a multiple of {bucket_seconds // 60} and divide a day"
+        )
+
+    context.trace_aggregator.flush()
+    buckets = context.tracing_database.get_statistics(since=since, until=until)
+
+    def get_end(start: str, seconds: int) -> str:
+        return (datetime.fromisoformat(start) + timedelta(seconds=seconds)).isoformat()
+
+    if bucket_minutes is None:
+        if not buckets:
+            return []
+
+        merged = TraceStatisticsBucket(
+            start=since.isoformat() if since else buckets[0].start
+        )
+        for bucket in buckets:
+            merged.merge(bucket)
+
+        end = until.isoformat() if until else get_end(buckets[-1].start, bucket_seconds)
+        return [merged.summarize(end, quantiles)]
+
+    groups: Dict[str, TraceStatisticsBucket] = {}
+    for bucket in buckets:
+        start = TraceAggregator.get_bucket_start(bucket.start, bucket_minutes * 60)
+        groups.setdefault(start, TraceStatisticsBucket(start=start)).merge(bucket)
+
+    return [
+        group.summarize(get_end(start, bucket_minutes * 60), quantiles)
+        for start, group in groups.items()
+    ]
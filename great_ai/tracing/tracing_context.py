@@ -1,15 +1,33 @@
+from contextlib import contextmanager
 from contextvars import ContextVar
 from datetime import datetime
 from time import perf_counter
 from types import TracebackType
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, cast
-from uuid import uuid4
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    cast,
+)
 
 from typing_extensions import Literal  # <= Python 3.7
 
-from ..constants import DEVELOPMENT_TAG_NAME, ONLINE_TAG_NAME, PRODUCTION_TAG_NAME
+from ..constants import (
+    DEVELOPMENT_TAG_NAME,
+    ONLINE_TAG_NAME,
+    PERSISTENCE_STAGE_NAME,
+    PRODUCTION_TAG_NAME,
+    TOTAL_STAGE_NAME,
+)
 from ..context import get_context
-from ..views import Model, Trace
+from ..views import Model, Span, Trace
+from .metrics_registry import metrics_registry
 
 T = TypeVar("T")
 
@@ -23,8 +41,10 @@ class TracingContext(Generic[T]):
     def __init__(self, function_name: str, do_not_persist_traces: bool) -> None:
         self._do_not_persist_traces = do_not_persist_traces
         self._models: List[Model] = []
-        self._values: Dict[str, Any] = {}
-        self._trace: Optional[Trace[T]] = None
+        self._values: Dict[str, Any] = dict(_preset_values.get())
+        self._traces: List[Trace[T]] = []
+        self._spans: List[Span] = []
+        self._depth = 0
         self._start_datetime = datetime.utcnow()
         self._start_time = perf_counter()
         self._name = function_name
@@ -35,42 +55,187 @@ class TracingContext(Generic[T]):
     def log_model(self, model: Model) -> None:
         self._models.append(model)
 
+    def add_span(
+        self, name: str, started_at: float, ended_at: Optional[float] = None
+    ) -> None:
+        """Record a stage delimited by `perf_counter()` values.
+
+        `ended_at` defaults to the current time. The stage may have started before the
+        TracingContext was created.
+        """
+
+        if ended_at is None:
+            ended_at = perf_counter()
+
+        self._spans.append(
+            Span(
+                name=name,
+                start_ms=round((started_at - self._start_time) * 1000, 4),
+                duration_ms=round((ended_at - started_at) * 1000, 4),
+                depth=self._depth,
+            )
+        )
+
     def finalise(
         self, output: Optional[T] = None, exception: Optional[BaseException] = None
     ) -> Trace[T]:
-        assert self._trace is None, "has been already finalised"
+        assert not self._traces, "has been already finalised"
 
-        delta_time = round((perf_counter() - self._start_time) * 1000, 4)
-        self._trace = (
-            cast(  # avoid ValueError: "Trace" object has no field "__orig_class__"
-                Trace[T],
-                Trace(
-                    trace_id=str(uuid4()),
-                    created=self._start_datetime.isoformat(),
-                    original_execution_time_ms=delta_time,
-                    logged_values=self._values,
-                    models=self._models,
-                    output=output,
-                    exception=None
-                    if exception is None
-                    else f"{type(exception).__name__}: {exception}",
-                    tags=[
-                        self._name,
-                        ONLINE_TAG_NAME,
-                        PRODUCTION_TAG_NAME
-                        if get_context().is_production
-                        else DEVELOPMENT_TAG_NAME,
-                    ],
-                ),
+        self._traces = [
+            self._create_trace(
+                logged_values=self._values, output=output, exception=exception
             )
-        )
+        ]
+
+        return self._traces[0]
+
+    def finalise_batch(
+        self,
+        parameter_name: str,
+        inputs: Sequence[Any],
+        outputs: Optional[Sequence[T]] = None,
+        exception: Optional[BaseException] = None,
+    ) -> List[Trace[T]]:
+        """Create a separate trace for each item of a batch processed at once.
+
+        The values logged for the whole batch under `parameter_name` are replaced by
+        the input of each item, everything else (models, metrics) is shared.
+        """
 
-        return self._trace
+        assert not self._traces, "has been already finalised"
+        assert outputs is None or len(inputs) == len(
+            outputs
+        ), "The number of outputs must match the number of inputs"
+
+        prefix = f"arg:{parameter_name}:"
+        shared_values = {
+            k: v for k, v in self._values.items() if not k.startswith(prefix)
+        }
+        should_log_input = f"{prefix}value" in self._values
+
+        def get_item_values(value: Any) -> Dict[str, Any]:
+            if not should_log_input:
+                return shared_values
+
+            item_values = {**shared_values, f"{prefix}value": value}
+            if isinstance(value, str):
+                item_values[f"{prefix}length"] = len(value)
+            return item_values
+
+        self._traces = [
+            self._create_trace(
+                logged_values=get_item_values(value),
+                output=None if outputs is None else outputs[i],
+                exception=exception,
+            )
+            for i, value in enumerate(inputs)
+        ]
+
+        return self._traces
+
+    def _create_trace(
+        self,
+        logged_values: Dict[str, Any],
+        output: Optional[T],
+        exception: Optional[BaseException],
+    ) -> Trace[T]:
+        delta_time = round((perf_counter() - self._start_time) * 1000, 4)
+
+        return cast(  # avoid ValueError: "Trace" object has no field "__orig_class__"
+            Trace[T],
+            Trace(
+                trace_id=get_context().trace_id_generator(self._start_datetime),
+                created=self._start_datetime.isoformat(),
+                original_execution_time_ms=delta_time,
+                logged_values=logged_values,
+                models=self._models,
+                output=output,
+                exception=None
+                if exception is None
+                else f"{type(exception).__name__}: {exception}",
+                tags=[
+                    self._name,
+                    ONLINE_TAG_NAME,
+                    PRODUCTION_TAG_NAME
+                    if get_context().is_production
+                    else DEVELOPMENT_TAG_NAME,
+                ],
+                spans=sorted(self._spans, key=lambda s: s.start_ms),
+            ),
+        )
 
     @staticmethod
     def get_current_tracing_context() -> Optional["TracingContext"]:
         return _current_tracing_context.get()
 
+    @staticmethod
+    @contextmanager
+    def record_span(name: str) -> Iterator[None]:
+        """Record the duration of the block as a span of the current TracingContext.
+
+        Spans started inside the block are nested into it. Nothing is recorded if there
+        is no active TracingContext.
+        """
+
+        context = _current_tracing_context.get()
+        if context is None:
+            yield
+            return
+
+        started_at = perf_counter()
+        context._depth += 1
+        try:
+            yield
+        finally:
+            context._depth -= 1
+            context.add_span(name, started_at)
+
+    @staticmethod
+    @contextmanager
+    def preset_values(values: Dict[str, Any]) -> Iterator[None]:
+        """Log `values` into each TracingContext created inside the block."""
+
+        token = _preset_values.set({**_preset_values.get(), **values})
+        try:
+            yield
+        finally:
+            _preset_values.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def collect_traces(*, persist: bool = True) -> Iterator[List[Trace]]:
+        """Persist the traces finalised inside the block together (using `save_batch`).
+
+        Traces are saved when the block is exited, even if an exception occurred. If
+        not `persist`, the traces are only collected, for example, to pass them to
+        another process which saves them using `save_traces`.
+        """
+
+        traces: List[Trace] = []
+        token = _trace_collector.set(traces)
+        try:
+            yield traces
+        finally:
+            _trace_collector.reset(token)
+            if traces and persist:
+                get_context().trace_writer.save(traces)
+
+    @staticmethod
+    async def save_traces(traces: Sequence[Trace]) -> None:
+        """Save the traces finalised elsewhere, for example, in another process.
+
+        Inside `collect_traces`, they are collected like the traces finalised here.
+        """
+
+        if not traces:
+            return
+
+        collector = _trace_collector.get()
+        if collector is not None:
+            collector.extend(traces)
+        else:
+            await get_context().trace_writer.save_async(traces)
+
     def __enter__(self) -> "TracingContext":
         _current_tracing_context.set(self)
         return self
@@ -81,10 +246,41 @@ class TracingContext(Generic[T]):
         exception: Optional[BaseException],
         traceback: Optional[TracebackType],
     ) -> Literal[False]:
+        if self._close(type, exception):
+            started_at = perf_counter()
+            get_context().trace_writer.save(self._traces)
+            self._record_persistence(started_at)
+
+        return False
+
+    async def __aenter__(self) -> "TracingContext":
+        return self.__enter__()
+
+    async def __aexit__(
+        self,
+        type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> Literal[False]:
+        """Like `__exit__`, but the traces are saved without blocking the event loop."""
+
+        if self._close(type, exception):
+            started_at = perf_counter()
+            await get_context().trace_writer.save_async(self._traces)
+            self._record_persistence(started_at)
+
+        return False
+
+    def _close(
+        self, type: Optional[Type[BaseException]], exception: Optional[BaseException]
+    ) -> bool:
+        """Finalise the context and return whether its traces have to be saved."""
+
         _current_tracing_context.set(None)
 
         if exception is not None and type is not None:
-            self.finalise(exception=exception)
+            if not self._traces:
+                self.finalise(exception=exception)
             if get_context().should_log_exception_stack:
                 get_context().logger.exception("Could not finish operation")
             else:
@@ -92,13 +288,57 @@ class TracingContext(Generic[T]):
                     f"Could not finish operation because of {type.__name__}: {exception}"
                 )
 
-        assert self._trace is not None
-        if not self._do_not_persist_traces:
-            get_context().tracing_database.save(self._trace)
+        assert self._traces
+        self._record_metrics()
 
-        return False
+        if self._do_not_persist_traces:
+            return False
+
+        collector = _trace_collector.get()
+        if collector is not None:
+            collector.extend(self._traces)
+            return False
+
+        return True
+
+    def _record_persistence(self, started_at: float) -> None:
+        metrics_registry.observe_duration(
+            function=self._name,
+            models=self._traces[0].models_flat,
+            stage=PERSISTENCE_STAGE_NAME,
+            duration_ms=(perf_counter() - started_at) * 1000,
+        )
+
+    def _record_metrics(self) -> None:
+        trace = self._traces[0]  # the traces of a batch share their timings
+        models = trace.models_flat
+
+        metrics_registry.increment(
+            "great_ai_traces_total",
+            len(self._traces),
+            function=self._name,
+            models=models,
+            status="success" if trace.exception is None else "error",
+        )
+        metrics_registry.observe_duration(
+            function=self._name,
+            models=models,
+            stage=TOTAL_STAGE_NAME,
+            duration_ms=trace.original_execution_time_ms,
+        )
+        for span in trace.spans:
+            metrics_registry.observe_duration(
+                function=self._name,
+                models=models,
+                stage=span.name,
+                duration_ms=span.duration_ms,
+            )
 
 
 _current_tracing_context: ContextVar[Optional[TracingContext]] = ContextVar(
     "_current_tracing_context", default=None
 )
+_trace_collector: ContextVar[Optional[List[Trace]]] = ContextVar(
+    "_trace_collector", default=None
+)
+_preset_values: ContextVar[Dict[str, Any]] = ContextVar("_preset_values", default={})
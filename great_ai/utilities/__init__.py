@@ -8,6 +8,7 @@ from .language.english_name_of_language import english_name_of_language
 from .language.is_english import is_english
 from .language.predict_language import predict_language
 from .logger.get_logger import get_logger
+from .parallel_map.async_parallel_map import async_parallel_map
 from .parallel_map.parallel_map import parallel_map
 from .parallel_map.simple_parallel_map import simple_parallel_map
 from .parallel_map.threaded_parallel_map import threaded_parallel_map
@@ -0,0 +1,86 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, Iterable, TypeVar
+
+T = TypeVar("T")
+V = TypeVar("V")
+
+
+async def async_parallel_map(
+    func: Callable[[T], Awaitable[V]],
+    input_values: Iterable[T],
+    *,
+    concurrency: int = 16,
+    unordered: bool = False,
+) -> AsyncIterator[V]:
+    """Execute a map operation on an iterable stream using the current event loop.
+
+    Meant for IO-bound `async` functions (for example, ones calling remote services)
+    for which starting new processes would only add overhead. At most `concurrency`
+    calls of `func` run at the same time and at most twice as many inputs are read
+    from `input_values` in advance, hence, the memory usage is bounded even for
+    unbounded streams.
+
+    Examples:
+        >>> async def double(x):
+        ...     await asyncio.sleep(0.01)
+        ...     return 2 * x
+        >>> async def main():
+        ...     return [v async for v in async_parallel_map(double, range(5))]
+        >>> asyncio.run(main())
+        [0, 2, 4, 6, 8]
+
+    Args:
+        func: The `async` function that should be applied to each element of
+            `input_values`.
+        input_values: An iterable of items that `func` is applied to.
+        concurrency: Maximum number of concurrently running calls of `func`.
+        unordered: Do not preserve the order of the elements, yield them as soon as they
+            have been processed. This decreases the latency caused by
+            difficult-to-process items.
+
+    Yields:
+        The next result obtained from applying `func` to each input value. May have
+            different order than the input if `unordered=True`.
+
+    Raises:
+        Exception: The first exception raised by `func` is propagated after cancelling
+            the pending calls.
+    """
+
+    assert concurrency >= 1, "At least one call has to be allowed at once"
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(value: T) -> V:
+        async with semaphore:
+            return await func(value)
+
+    inputs = iter(input_values)
+    pending: "Deque[asyncio.Future[V]]" = deque()
+    is_iteration_over = False
+
+    try:
+        while True:
+            while not is_iteration_over and len(pending) < 2 * concurrency:
+                try:
+                    pending.append(asyncio.ensure_future(limited(next(inputs))))
+                except StopIteration:
+                    is_iteration_over = True
+
+            if not pending:
+                return
+
+            if unordered:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+            else:
+                yield await pending.popleft()
+    finally:
+        for future in pending:
+            if not future.cancel() and not future.cancelled():
+                future.exception()  # avoid warnings about unretrieved exceptions
@@ -177,6 +177,9 @@ def parallel_map(
     except WorkerException:
         should_stop.set()
         raise
+    except GeneratorExit:
+        should_stop.set()  # the consumer has stopped iterating early
+        raise
     except Exception:
         for p in processes:
             p.terminate()
@@ -1,12 +1,24 @@
 from .api_metadata import ApiMetadata
 from .cache_statistics import CacheStatistics
+from .connection_pool_statistics import ConnectionPoolStatistics
+from .continuation_token import ContinuationToken
 from .evaluation_feedback_request import EvaluationFeedbackRequest
 from .filter import Filter
 from .function_metadata import FunctionMetadata
 from .health_check_response import HealthCheckResponse
+from .migration_report import MigrationReport
 from .model import Model
 from .operators import operators
+from .persistence_policy import PersistencePolicy
+from .persistence_statistics import PersistenceStatistics
+from .quantile_sketch import QuantileSketch
 from .query import Query
+from .query_plan import QueryPlan
 from .route_config import RouteConfig
 from .sort_by import SortBy
+from .span import Span
 from .trace import Trace
+from .trace_aggregate import TraceAggregate
+from .trace_statistics import TraceStatistics
+from .trace_statistics_bucket import TraceStatisticsBucket
+from .write_behind_config import WriteBehindConfig
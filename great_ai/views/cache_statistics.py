@@ -1,8 +1,14 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
 class CacheStatistics(BaseModel):
+    backend: str
     hits: int
     misses: int
+    coalesced: int = 0
     size: int
     max_size: int
+    size_in_bytes: Optional[int] = None
+    max_size_in_bytes: Optional[int] = None
@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+
+
+class ConnectionPoolStatistics(BaseModel):
+    """Connection pool usage of the tracing database's client in the current process.
+
+    Attributes:
+        max_pool_size: Upper limit of simultaneously open connections per server.
+        min_pool_size: Number of connections kept open even when idle.
+        open_connections: Currently open connections.
+        in_use: Connections currently checked out by an operation.
+        checkouts: Number of times a connection has been checked out.
+        failed_checkouts: Number of times checking out a connection has failed (for
+            example, because of a timeout).
+        clients_created: Number of clients created by the process.
+    """
+
+    max_pool_size: int
+    min_pool_size: int
+    open_connections: int
+    in_use: int
+    checkouts: int
+    failed_checkouts: int
+    clients_created: int
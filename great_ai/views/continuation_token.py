@@ -0,0 +1,88 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence
+
+from pydantic import BaseModel, ValidationError
+
+from .sort_by import SortBy
+from .trace import Trace
+
+
+class ContinuationToken(BaseModel):
+    """Position after the last trace of a page used for keyset pagination.
+
+    The traces are ordered by `sort_by` and then by their `trace_id`. Instead of
+    skipping the previous pages, the next page starts right after the values of the
+    last trace. Thus, deep pages are just as fast as the first one and the pages do not
+    shift when traces are inserted meanwhile.
+
+    Examples:
+        >>> trace = Trace(trace_id='a', created='2022-07-11T14:31:46', models=[],
+        ...     original_execution_time_ms=3, logged_values={}, exception=None,
+        ...     output=None, tags=[])
+        >>> sort_by = [SortBy(column_id='original_execution_time_ms', direction='asc')]
+        >>> token = ContinuationToken.create(trace, sort_by)
+        >>> ContinuationToken.parse(token, sort_by).values
+        [3.0]
+
+        >>> ContinuationToken.parse(token, [])
+        Traceback (most recent call last):
+        ...
+        ValueError: The continuation token belongs to a different sort order
+
+    Attributes:
+        sort_by: The order of the pages.
+        values: Values of the `sort_by` columns of the last trace.
+        trace_id: ID of the last trace.
+    """
+
+    sort_by: List[SortBy]
+    values: List[Any]
+    trace_id: str
+
+    @classmethod
+    def create(
+        cls,
+        trace: Trace,
+        sort_by: Sequence[SortBy],
+        *,
+        values: Optional[Sequence[Any]] = None,
+    ) -> str:
+        """Return the opaque token of the page starting after `trace`.
+
+        By default, the `values` are taken from `Trace.to_flat_dict`; drivers that
+        compare different representations of the columns can provide them instead.
+        """
+
+        if not sort_by:
+            raise ValueError("Keyset pagination requires at least one sort column")
+
+        if values is None:
+            flat = trace.to_flat_dict()
+            values = [flat.get(col.column_id) for col in sort_by]
+
+        token = cls(
+            sort_by=list(sort_by),
+            values=list(values),
+            trace_id=trace.trace_id,
+        )
+        return base64.urlsafe_b64encode(
+            token.json(separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+
+    @classmethod
+    def parse(cls, token: str, sort_by: Sequence[SortBy]) -> "ContinuationToken":
+        """Decode a token and check that it belongs to the order of `sort_by`."""
+
+        try:
+            result = cls.parse_obj(json.loads(base64.urlsafe_b64decode(token)))
+        except (ValueError, ValidationError) as e:
+            raise ValueError("The continuation token is malformed") from e
+
+        if not result.sort_by:
+            raise ValueError("Keyset pagination requires at least one sort column")
+
+        if result.sort_by != list(sort_by) or len(result.values) != len(sort_by):
+            raise ValueError("The continuation token belongs to a different sort order")
+
+        return result
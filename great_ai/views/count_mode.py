@@ -0,0 +1,3 @@
+from typing_extensions import Literal  # <= Python 3.7
+
+CountMode = Literal["exact", "approximate", "none"]
@@ -8,3 +8,4 @@ class FunctionMetadata(BaseModel):
     input_parameter_names: List[str] = []
     model_parameter_names: List[str] = []
     is_finalised: bool = False
+    is_batched: bool = False
@@ -1,8 +1,14 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 from .cache_statistics import CacheStatistics
+from .connection_pool_statistics import ConnectionPoolStatistics
+from .persistence_statistics import PersistenceStatistics
 
 
 class HealthCheckResponse(BaseModel):
     is_healthy: bool
     cache_statistics: CacheStatistics
+    persistence_statistics: PersistenceStatistics
+    connection_pool_statistics: Optional[ConnectionPoolStatistics] = None
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class MigrationReport(BaseModel):
+    """Outcome of rewriting the stored traces into their lean format.
+
+    Attributes:
+        document_count: Number of stored traces.
+        migrated_count: Number of traces that had to be rewritten.
+        size_before_in_bytes: Total size of the serialised traces before the migration.
+        size_after_in_bytes: Total size of the serialised traces after the migration.
+    """
+
+    document_count: int = 0
+    migrated_count: int = 0
+    size_before_in_bytes: int = 0
+    size_after_in_bytes: int = 0
+
+    @property
+    def size_reduction(self) -> float:
+        return (
+            1 - self.size_after_in_bytes / self.size_before_in_bytes
+            if self.size_before_in_bytes
+            else 0
+        )
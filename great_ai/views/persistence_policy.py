@@ -0,0 +1,32 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class PersistencePolicy(BaseModel):
+    """Configuration of which traces are persisted and for how long.
+
+    The traces of exceptions, slow predictions, and those having feedback can be kept
+    regardless of the sampling. Ground-truth traces (see `add_ground_truth`) and
+    traces saved directly through the `TracingDatabaseDriver` are not sampled.
+
+    Attributes:
+        sample_rate: Probability (0-1) of persisting an ordinary trace.
+        keep_exceptions: Always persist the traces of failed predictions.
+        keep_slow_percentile: Always persist the traces whose execution time is above
+            this percentile (0-100) of the recently observed execution times. `None`
+            disables this rule.
+        keep_with_feedback: Always persist the traces that have a feedback, and never
+            delete them because of `retention_days`.
+        retention_days: Delete the traces older than this. `None` means keeping them
+            forever.
+        pruning_interval_seconds: How often the drivers without built-in expiry
+            (ParallelTinyDbDriver and SqliteDriver) delete the expired traces.
+    """
+
+    sample_rate: float = 1
+    keep_exceptions: bool = True
+    keep_slow_percentile: Optional[float] = None
+    keep_with_feedback: bool = True
+    retention_days: Optional[float] = None
+    pruning_interval_seconds: float = 3600
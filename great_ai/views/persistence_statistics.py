@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class PersistenceStatistics(BaseModel):
+    is_write_behind: bool
+    queued: int
+    saved: int
+    dropped: int
+    failed: int
+    flushes: int
+    sampled_out: int
+    pruned: int
@@ -0,0 +1,75 @@
+from math import ceil, log
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+RELATIVE_ACCURACY = 0.01
+MIN_VALUE = 1e-3
+
+_gamma = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_log_gamma = log(_gamma)
+
+
+class QuantileSketch(BaseModel):
+    """Mergeable summary of a distribution of non-negative values (DDSketch).
+
+    The values are counted in logarithmically sized bins, so that each quantile is
+    estimated within 1% relative error, while the size of the sketch only depends on
+    the range of the values. Values below `MIN_VALUE` are counted together. Sketches
+    are merged by adding up their bins, which makes them suitable for aggregating in
+    the database.
+
+    Examples:
+        >>> sketch = QuantileSketch()
+        >>> for i in range(1, 1001):
+        ...     sketch.add(i)
+        >>> abs(sketch.quantile(0.5) - 500) / 500 <= 0.01
+        True
+        >>> abs(sketch.quantile(0.99) - 990) / 990 <= 0.01
+        True
+        >>> QuantileSketch().quantile(0.5) is None
+        True
+
+    Attributes:
+        bins: Number of values in each bin, keyed by the index of the bin.
+        zero_count: Number of values below `MIN_VALUE`.
+    """
+
+    bins: Dict[int, int] = {}
+    zero_count: int = 0
+
+    @property
+    def count(self) -> int:
+        return self.zero_count + sum(self.bins.values())
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value < MIN_VALUE:
+            self.zero_count += count
+            return
+
+        index = ceil(log(value) / _log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> None:
+        self.zero_count += other.zero_count
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the `q`-quantile (0 <= q <= 1), `None` if the sketch is empty."""
+
+        count = self.count
+        if not count:
+            return None
+
+        rank = q * (count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0
+
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * _gamma**index / (_gamma + 1)
+
+        return 2 * _gamma ** max(self.bins) / (_gamma + 1)
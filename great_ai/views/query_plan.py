@@ -0,0 +1,18 @@
+from typing import Any, List
+
+from pydantic import BaseModel
+
+
+class QueryPlan(BaseModel):
+    """How the tracing database evaluates a query.
+
+    Attributes:
+        uses_index: Whether the matching traces are found without scanning every
+            trace.
+        indexes: Names of the indexes used for filtering or sorting.
+        details: The plan as reported by the database.
+    """
+
+    uses_index: bool
+    indexes: List[str] = []
+    details: Any = None
@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class Span(BaseModel):
+    """Timing of a single stage of a prediction.
+
+    Attributes:
+        name: Name of the stage, for example, `prediction`, `cache_lookup`,
+            `parameter:text`, or `model:my-model:v3`.
+        start_ms: Start of the stage relative to the start of the trace measured using
+            a monotonic clock. Stages preceding the trace (such as the cache lookup)
+            have a negative start.
+        duration_ms: Wall-time elapsed during the stage.
+        depth: Number of enclosing spans.
+    """
+
+    name: str
+    start_ms: float
+    duration_ms: float
+    depth: int
@@ -5,6 +5,7 @@ from pydantic import Extra
 
 from .hashable_base_model import HashableBaseModel
 from .model import Model
+from .span import Span
 
 T = TypeVar("T")
 
@@ -25,6 +26,8 @@ class Trace(Generic[T], HashableBaseModel):
         tags: Tags used for filtering traces. Contains the name of the original
             function, value of `ENVIRONMENT`, its split if has any, and either
             `ground_truth` or `online` depending on the origin of the Trace.
+        spans: Timings of the stages (parameter validation, model usage, cache
+            lookup, etc.) of the prediction ordered by their start.
     """
 
     trace_id: str
@@ -36,6 +39,7 @@ class Trace(Generic[T], HashableBaseModel):
     output: Optional[T]
     feedback: Any = None
     tags: List[str]
+    spans: List[Span] = []
 
     class Config:
         extra = Extra.ignore
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+
+from .quantile_sketch import QuantileSketch
+from .trace import Trace
+
+
+class TraceAggregate(BaseModel):
+    """Running totals of a group of traces.
+
+    Attributes:
+        count: Number of traces.
+        error_count: Number of traces with an exception.
+        feedback_count: Number of traces with feedback.
+        execution_time_ms: Sketch of the `original_execution_time_ms` of the traces.
+    """
+
+    count: int = 0
+    error_count: int = 0
+    feedback_count: int = 0
+    execution_time_ms: QuantileSketch = QuantileSketch()
+
+    def add(self, trace: Trace) -> None:
+        self.count += 1
+        self.error_count += trace.exception is not None
+        self.feedback_count += trace.feedback is not None
+        self.execution_time_ms.add(trace.original_execution_time_ms)
+
+    def merge(self, other: "TraceAggregate") -> None:
+        self.count += other.count
+        self.error_count += other.error_count
+        self.feedback_count += other.feedback_count
+        self.execution_time_ms.merge(other.execution_time_ms)
@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+
+class TraceStatistics(BaseModel):
+    """Summary of the traces created in a time interval.
+
+    Attributes:
+        start: Beginning of the interval (inclusive, ISO format, UTC).
+        end: End of the interval (exclusive, ISO format, UTC).
+        count: Number of traces.
+        error_rate: Ratio of the traces with an exception.
+        feedback_coverage: Ratio of the traces with feedback.
+        execution_time_ms: Estimated quantiles of the execution times keyed by their
+            name (for example, `p99`).
+        by_tag: The same statistics for the traces having each tag.
+        by_model: The same statistics for the traces using each model version
+            (`key:version`).
+    """
+
+    start: str
+    end: str
+    count: int
+    error_rate: float
+    feedback_coverage: float
+    execution_time_ms: Dict[str, Optional[float]]
+    by_tag: Dict[str, "TraceStatistics"] = {}
+    by_model: Dict[str, "TraceStatistics"] = {}
+
+
+TraceStatistics.update_forward_refs()
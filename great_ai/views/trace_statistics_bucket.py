@@ -0,0 +1,89 @@
+from typing import Dict, Sequence
+
+from pydantic import BaseModel
+
+from .trace import Trace
+from .trace_aggregate import TraceAggregate
+from .trace_statistics import TraceStatistics
+
+
+class TraceStatisticsBucket(BaseModel):
+    """Aggregates of the traces created in a time bucket.
+
+    The buckets are maintained when the traces are saved and merged in the database,
+    so that statistics can be computed without reading the traces themselves.
+
+    Examples:
+        >>> bucket = TraceStatisticsBucket(start='2022-07-11T14:00:00')
+        >>> bucket.add(Trace(trace_id='a', created='2022-07-11T14:31:46', models=[],
+        ...     original_execution_time_ms=3, logged_values={}, exception='Error',
+        ...     output=None, tags=['online']))
+        >>> statistics = bucket.summarize('2022-07-11T15:00:00', quantiles=[0.5])
+        >>> statistics.count, statistics.error_rate, statistics.by_tag['online'].count
+        (1, 1.0, 1)
+
+    Attributes:
+        start: Beginning of the bucket (ISO format, UTC).
+        overall: Aggregates of every trace in the bucket.
+        by_tag: Aggregates of the traces having each tag.
+        by_model: Aggregates of the traces using each model version (`key:version`).
+    """
+
+    start: str
+    overall: TraceAggregate = TraceAggregate()
+    by_tag: Dict[str, TraceAggregate] = {}
+    by_model: Dict[str, TraceAggregate] = {}
+
+    def add(self, trace: Trace) -> None:
+        self.overall.add(trace)
+        for group in self._get_groups(trace):
+            group.add(trace)
+
+    def add_feedback(self, trace: Trace, difference: int) -> None:
+        """Count a feedback given (`difference=1`) or removed (`-1`) after saving."""
+
+        for group in [self.overall, *self._get_groups(trace)]:
+            group.feedback_count += difference
+
+    def merge(self, other: "TraceStatisticsBucket") -> None:
+        self.overall.merge(other.overall)
+        for mine, theirs in [
+            (self.by_tag, other.by_tag),
+            (self.by_model, other.by_model),
+        ]:
+            for key, aggregate in theirs.items():
+                mine.setdefault(key, TraceAggregate()).merge(aggregate)
+
+    def summarize(self, end: str, quantiles: Sequence[float]) -> TraceStatistics:
+        def summarize(aggregate: TraceAggregate) -> TraceStatistics:
+            return TraceStatistics(
+                start=self.start,
+                end=end,
+                count=aggregate.count,
+                error_rate=aggregate.error_count / aggregate.count
+                if aggregate.count
+                else 0,
+                feedback_coverage=aggregate.feedback_count / aggregate.count
+                if aggregate.count
+                else 0,
+                execution_time_ms={
+                    f"p{q * 100:g}": aggregate.execution_time_ms.quantile(q)
+                    for q in quantiles
+                },
+            )
+
+        statistics = summarize(self.overall)
+        statistics.by_tag = {k: summarize(v) for k, v in sorted(self.by_tag.items())}
+        statistics.by_model = {
+            k: summarize(v) for k, v in sorted(self.by_model.items())
+        }
+        return statistics
+
+    def _get_groups(self, trace: Trace) -> Sequence[TraceAggregate]:
+        return [
+            *(self.by_tag.setdefault(t, TraceAggregate()) for t in set(trace.tags)),
+            *(
+                self.by_model.setdefault(f"{m.key}:{m.version}", TraceAggregate())
+                for m in trace.models
+            ),
+        ]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing_extensions import Literal  # <= Python 3.7
+
+OverflowPolicy = Literal["block", "drop_newest", "drop_oldest", "save_synchronously"]
+
+
+class WriteBehindConfig(BaseModel):
+    """Configuration of the background persistence of traces.
+
+    Attributes:
+        max_batch_size: Flush the buffered traces once this many are waiting.
+        flush_interval_ms: Flush the buffered traces at least this often.
+        max_queue_size: Upper bound on the number of buffered traces.
+        overflow_policy: What to do with new traces when the buffer is full. `block`
+            waits for the background writer to make space, `drop_newest` discards the
+            new traces, `drop_oldest` discards the oldest buffered traces, while
+            `save_synchronously` saves the new traces on the calling thread.
+    """
+
+    max_batch_size: int = 500
+    flush_interval_ms: float = 1000
+    max_queue_size: int = 10000
+    overflow_policy: OverflowPolicy = "block"
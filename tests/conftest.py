@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Type
+from uuid import uuid4
+
+import mongomock
+import pytest
+from great_ai import (
+    MongoDbDriver,
+    ParallelTinyDbDriver,
+    SqliteDriver,
+    Trace,
+    TracingDatabaseDriver,
+)
+from great_ai.persistence import mongodb_driver
+
+mongo_connection_string = "mongodb://localhost:27017"
+first_created = datetime(2022, 7, 11, 14)
+
+
+def create_trace(i: int, **fields: Any) -> Trace:
+    """Return the `i`-th test trace, created `i` minutes after `first_created`.
+
+    The keyword arguments override the fields of the trace.
+    """
+
+    return Trace(
+        **{
+            "trace_id": f"{i:02}",
+            "created": (first_created + timedelta(minutes=i)).isoformat(),
+            "original_execution_time_ms": 1,
+            "logged_values": {"arg:n:value": i},
+            "models": [],
+            "exception": None,
+            "output": i,
+            "tags": [],
+            **fields,
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def work_in_tmp_path(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run each test in `tmp_path`.
+
+    Thus, the files created at relative paths (for example, by the default tracing
+    database or the local model cache) are not left in the repository.
+    """
+
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def mongo_clients(monkeypatch: pytest.MonkeyPatch) -> Iterator[List[Dict[str, Any]]]:
+    """Back MongoDbDriver by an empty mongomock database.
+
+    Yields the keyword arguments of the created MongoClients. The class attributes of
+    MongoDbDriver are restored and the database is dropped after the test.
+    """
+
+    clients: List[Dict[str, Any]] = []
+
+    def create_client(*args: Any, **kwargs: Any) -> Any:
+        clients.append(kwargs)
+        return mongomock.MongoClient(*args, **kwargs)
+
+    monkeypatch.setattr(mongodb_driver, "MongoClient", create_client)
+    for attribute in [
+        "initialized",
+        "max_pool_size",
+        "min_pool_size",
+        "_client",
+        "_client_pid",
+        "_clients_created",
+        "_pool_listener",
+    ]:
+        monkeypatch.setattr(MongoDbDriver, attribute, getattr(MongoDbDriver, attribute))
+    monkeypatch.setattr(MongoDbDriver, "mongo_connection_string", "", raising=False)
+    monkeypatch.setattr(MongoDbDriver, "mongo_database", "", raising=False)
+
+    database = f"test_{uuid4().hex}"
+    MongoDbDriver.configure_credentials(
+        mongo_connection_string=mongo_connection_string, mongo_database=database
+    )
+
+    yield clients
+
+    mongomock.MongoClient(mongo_connection_string).drop_database(database)
+
+
+@pytest.fixture
+def create_driver(
+    request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> Callable[..., TracingDatabaseDriver]:
+    """Return a function creating a driver which stores its traces in `tmp_path`.
+
+    Its first argument is the kind of the driver: `json` or `jsonl` (the storage modes
+    of ParallelTinyDbDriver), `sqlite`, or `mongo`. The keyword arguments override
+    the class attributes of the driver (for example, `text_index`) during the test.
+    """
+
+    def create(kind: str, **options: Any) -> TracingDatabaseDriver:
+        factory: Type[TracingDatabaseDriver]
+        if kind == "mongo":
+            request.getfixturevalue("mongo_clients")
+            factory = MongoDbDriver
+        elif kind == "sqlite":
+            monkeypatch.setattr(SqliteDriver, "path_to_db", tmp_path / "traces.sqlite")
+            factory = SqliteDriver
+        else:
+            monkeypatch.setattr(
+                ParallelTinyDbDriver, "path_to_db", tmp_path / "db.json"
+            )
+            monkeypatch.setattr(ParallelTinyDbDriver, "storage_mode", kind)
+            factory = ParallelTinyDbDriver
+
+        for name, value in options.items():
+            monkeypatch.setattr(factory, name, value)
+
+        return factory()
+
+    return create
@@ -0,0 +1,198 @@
+import asyncio
+import gc
+import logging
+from pathlib import Path
+from time import sleep
+from types import SimpleNamespace
+from typing import Any, Callable, List, Optional
+
+import pytest
+from great_ai import (
+    MongoDbDriver,
+    ParallelTinyDbDriver,
+    SqliteDriver,
+    Trace,
+    TracingDatabaseDriver,
+)
+from great_ai.persistence import async_mongodb_driver, mongodb_driver
+from great_ai.persistence.threaded_async_tracing_database_driver import (
+    ThreadedAsyncTracingDatabaseDriver,
+)
+from great_ai.persistence.trace_writer import TraceWriter
+from great_ai.views import Filter, SortBy
+
+from conftest import create_trace
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture(params=["json", "sqlite", "mongo"])
+def driver(
+    request: Any,
+    create_driver: Callable[..., TracingDatabaseDriver],
+    monkeypatch: pytest.MonkeyPatch,
+) -> TracingDatabaseDriver:
+    # test the threaded wrapper even if motor is installed
+    monkeypatch.setattr(mongodb_driver, "AsyncIOMotorClient", None)
+    return create_driver(request.param)
+
+
+@pytest.mark.asyncio
+async def test_async_methods(driver: TracingDatabaseDriver) -> None:
+    database = driver.as_async()
+
+    await database.save(create_trace(0))
+    await database.save_batch([create_trace(i) for i in range(1, 10)])
+    assert await database.get("03") == create_trace(3)
+    assert await database.get("missing") is None
+
+    traces, count = await database.query(
+        conjunctive_filters=[Filter(property="arg:n:value", operator=">=", value=5)],
+        sort_by=[SortBy(column_id="arg:n:value", direction="desc")],
+        take=3,
+    )
+    assert [t.trace_id for t in traces] == ["09", "08", "07"]
+    assert count == 5
+
+    await database.update("03", create_trace(3).copy(update={"feedback": 3}))
+    assert (await database.get("03")).feedback == 3  # type: ignore
+
+    await database.delete_batch(["03", "04"])
+    assert [t.trace_id for t in driver.iter_query()] == [
+        f"{i:02}" for i in [0, 1, 2, 5, 6, 7, 8, 9]
+    ]
+
+
+def test_as_async(driver: TracingDatabaseDriver) -> None:
+    database = driver.as_async()
+
+    assert isinstance(database, ThreadedAsyncTracingDatabaseDriver)
+    if isinstance(driver, SqliteDriver):
+        assert database._max_workers == 1
+
+
+def test_motor_is_used_if_installed(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("motor")
+    monkeypatch.setattr(MongoDbDriver, "mongo_connection_string", "", raising=False)
+    monkeypatch.setattr(MongoDbDriver, "mongo_database", "", raising=False)
+
+    driver = MongoDbDriver.__new__(MongoDbDriver)
+    assert isinstance(driver.as_async(), async_mongodb_driver.AsyncMongoDbDriver)
+
+
+def test_motor_client_per_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    class FakeMotorClient:
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            self.is_closed = False
+            clients.append(self)
+
+        def __getitem__(self, database: str) -> Any:
+            return SimpleNamespace(traces=self)
+
+        def close(self) -> None:
+            self.is_closed = True
+
+    clients: List[FakeMotorClient] = []
+
+    monkeypatch.setattr(async_mongodb_driver, "AsyncIOMotorClient", FakeMotorClient)
+    monkeypatch.setattr(MongoDbDriver, "mongo_connection_string", "", raising=False)
+    monkeypatch.setattr(MongoDbDriver, "mongo_database", "", raising=False)
+    database = async_mongodb_driver.AsyncMongoDbDriver(
+        MongoDbDriver.__new__(MongoDbDriver)
+    )
+
+    async def get_client() -> Any:
+        return database._get_collection()
+
+    loops = [asyncio.new_event_loop() for _ in range(2)]
+    try:
+        first = loops[0].run_until_complete(get_client())
+        second = loops[1].run_until_complete(get_client())
+        assert loops[0].run_until_complete(get_client()) is first
+    finally:
+        for loop in loops:
+            loop.close()
+
+    assert clients == [first, second]
+    assert not first.is_closed and not second.is_closed
+
+    del loops, loop
+    gc.collect()
+    assert first.is_closed and second.is_closed
+
+
+@pytest.mark.asyncio
+async def test_motor_cursor_of_compressed_filters_is_consumed_lazily(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    class FakeMotorCursor:
+        def __init__(self, documents: List[Any]) -> None:
+            self.documents = iter(documents)
+            self.consumed = 0
+            self.is_closed = False
+
+        def __aiter__(self) -> "FakeMotorCursor":
+            return self
+
+        async def __anext__(self) -> Any:
+            try:
+                document = next(self.documents)
+            except StopIteration:
+                raise StopAsyncIteration
+            self.consumed += 1
+            return document
+
+        async def close(self) -> None:
+            self.is_closed = True
+
+    monkeypatch.setattr(async_mongodb_driver, "AsyncIOMotorClient", object)
+    database = async_mongodb_driver.AsyncMongoDbDriver(
+        MongoDbDriver.__new__(MongoDbDriver)
+    )
+    filters = [Filter(property="arg:n:value", operator=">=", value=0)]
+    documents = [create_trace(i).dict() for i in range(10)]
+
+    cursor = FakeMotorCursor(documents)
+    page, count = await database._page_compressed(
+        cursor, filters, skip=1, take=2, count="none"
+    )
+    assert [d["trace_id"] for d in page] == ["01", "02"]
+    assert count is None
+    assert cursor.consumed == 3 and cursor.is_closed
+
+    cursor = FakeMotorCursor(documents)
+    page, count = await database._page_compressed(cursor, filters, take=0)
+    assert page == [] and count == 10
+
+
+class SlowDriver(ParallelTinyDbDriver):
+    def get(self, id: str) -> Optional[Trace]:
+        sleep(0.5)
+        return None
+
+
+@pytest.mark.asyncio
+async def test_event_loop_is_not_blocked(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(ParallelTinyDbDriver, "path_to_db", tmp_path / "db.json")
+    database = SlowDriver().as_async()
+
+    get = asyncio.ensure_future(database.get("a"))
+    for _ in range(10):
+        await asyncio.sleep(0.01)
+
+    assert not get.done()
+    assert await get is None
+
+
+@pytest.mark.asyncio
+async def test_trace_writer_save_async(driver: TracingDatabaseDriver) -> None:
+    writer = TraceWriter(driver, logger=logger)
+
+    await writer.save_async([create_trace(0)])
+    await writer.save_async([create_trace(1), create_trace(2)])
+    await writer.flush_async()
+
+    assert [t.trace_id for t in driver.iter_query()] == ["00", "01", "02"]
+    assert writer.statistics.saved == 3
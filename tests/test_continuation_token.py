@@ -0,0 +1,145 @@
+import base64
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from great_ai import (
+    GreatAI,
+    Trace,
+    TracingDatabaseDriver,
+)
+from great_ai.context import get_context
+from great_ai.views import ContinuationToken, SortBy
+
+from conftest import create_trace
+
+traces = [
+    create_trace(
+        i,
+        original_execution_time_ms=i % 3,
+        logged_values={"arg:n:value": None if i % 4 == 0 else i % 5},
+        tags=["continuation_token_test"],
+    )
+    for i in range(20)
+]
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    database = create_driver(request.param)
+    database.save_batch(traces)
+    return database
+
+
+def ids(traces: List[Trace]) -> List[str]:
+    return [t.trace_id for t in traces]
+
+
+@pytest.mark.parametrize(
+    "sort_by",
+    [
+        [SortBy(column_id="original_execution_time_ms", direction="asc")],
+        [SortBy(column_id="original_execution_time_ms", direction="desc")],
+        [SortBy(column_id="arg:n:value", direction="asc")],
+        [
+            SortBy(column_id="arg:n:value", direction="desc"),
+            SortBy(column_id="created", direction="desc"),
+        ],
+    ],
+)
+def test_pages_match_offsets(
+    driver: TracingDatabaseDriver, sort_by: List[SortBy]
+) -> None:
+    expected, count = driver.query(sort_by=sort_by)
+    assert count == 20
+
+    pages: List[Trace] = []
+    token: Optional[str] = None
+    while True:
+        page, count = driver.query(
+            take=3, sort_by=sort_by, continuation_token=token, count="none"
+        )
+        assert count is None or count == 20
+        pages.extend(page)
+        if len(page) < 3:
+            break
+        token = driver.create_continuation_token(page[-1], sort_by)
+
+    assert ids(pages) == ids(expected)
+    assert ids(pages) == ids(driver.query(skip=0, take=20, sort_by=sort_by)[0])
+
+
+def test_approximate_count(driver: TracingDatabaseDriver) -> None:
+    assert driver.query(take=1, count="approximate")[1] == 20
+    assert (
+        driver.query(
+            take=1, conjunctive_tags=["continuation_token_test"], count="approximate"
+        )[1]
+        == 20
+    )
+
+
+def test_token_requires_the_same_sort(driver: TracingDatabaseDriver) -> None:
+    sort_by = [SortBy(column_id="created", direction="asc")]
+    token = driver.create_continuation_token(
+        driver.query(take=1, sort_by=sort_by)[0][0], sort_by
+    )
+
+    with pytest.raises(ValueError):
+        driver.query(continuation_token=token)
+
+    with pytest.raises(ValueError):
+        driver.query(
+            sort_by=[SortBy(column_id="created", direction="desc")],
+            continuation_token=token,
+        )
+
+    with pytest.raises(ValueError):
+        driver.query(sort_by=sort_by, continuation_token="not a token")
+
+    # tokens cannot be created without sorting, a forged one is rejected as well
+    unsorted = ContinuationToken(sort_by=[], values=[], trace_id="05")
+    with pytest.raises(ValueError):
+        driver.query(
+            take=3,
+            continuation_token=base64.urlsafe_b64encode(
+                unsorted.json().encode()
+            ).decode(),
+        )
+
+
+def test_traces_endpoint() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x
+
+    get_context().tracing_database.save_batch(traces)
+    try:
+        client = TestClient(f.app)
+        query: Dict[str, Any] = {
+            "sort": [{"column_id": "trace_id", "direction": "desc"}],
+            "conjunctive_tags": ["continuation_token_test"],
+        }
+
+        response = client.post("/traces?take=15&count=exact", json=query)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "20"
+
+        token = response.headers["X-Continuation-Token"]
+        params: Dict[str, Any] = {"take": 15, "continuation_token": token}
+        response = client.post("/traces", params=params, json=query)
+        assert response.status_code == 200
+        assert "X-Total-Count" not in response.headers
+        assert [t["trace_id"] for t in response.json()] == [
+            traces[i].trace_id for i in range(4, -1, -1)
+        ]
+        assert "X-Continuation-Token" not in response.headers
+
+        response = client.post(
+            "/traces", params={"continuation_token": token}, json={"sort": []}
+        )
+        assert response.status_code == 400
+    finally:
+        get_context().tracing_database.delete_batch([t.trace_id for t in traces])
@@ -0,0 +1,86 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List
+
+import pytest
+from great_ai import (
+    ParallelTinyDbDriver,
+    TracingDatabaseDriver,
+    add_ground_truth,
+    configure,
+    delete_ground_truth,
+    query_ground_truth,
+)
+from great_ai.views import Filter
+
+from conftest import create_trace
+
+traces = [
+    create_trace(
+        i,
+        logged_values={"arg:n:value": i, "arg:text:value": f"text {i % 3}"},
+        feedback=i if i % 2 else None,
+        tags=["delete_where_test", "even" if i % 2 == 0 else "odd"],
+    )
+    for i in range(10)
+]
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    database = create_driver(request.param, text_index=True)
+    database.save_batch(traces)
+    return database
+
+
+def get_ids(driver: TracingDatabaseDriver) -> List[str]:
+    return [t.trace_id for t in driver.iter_query()]
+
+
+def test_delete_where_tags_and_feedback(driver: TracingDatabaseDriver) -> None:
+    assert driver.delete_where(conjunctive_tags=["odd"], has_feedback=True) == 5
+    assert get_ids(driver) == ["00", "02", "04", "06", "08"]
+
+    assert driver.delete_where(conjunctive_tags=["odd"]) == 0
+    assert driver.delete_where(has_feedback=False) == 5
+    assert get_ids(driver) == []
+
+
+def test_delete_where_time_range(driver: TracingDatabaseDriver) -> None:
+    assert (
+        driver.delete_where(
+            since=datetime(2022, 7, 11, 14, 3), until=datetime(2022, 7, 11, 14, 5)
+        )
+        == 3
+    )
+    assert get_ids(driver) == ["00", "01", "02", "06", "07", "08", "09"]
+
+
+def test_delete_where_filters(driver: TracingDatabaseDriver) -> None:
+    assert (
+        driver.delete_where(
+            conjunctive_filters=[
+                Filter(property="arg:text:value", operator="contains", value="t 1"),
+                Filter(property="arg:n:value", operator=">", value=3),
+            ]
+        )
+        == 2
+    )
+    assert get_ids(driver) == ["00", "01", "02", "03", "05", "06", "08", "09"]
+
+    assert driver.delete_where(conjunctive_tags=["missing"]) == 0
+    assert len(get_ids(driver)) == 8
+
+
+def test_delete_ground_truth(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    configure(tracing_database_factory=ParallelTinyDbDriver)
+    monkeypatch.setattr(ParallelTinyDbDriver, "path_to_db", tmp_path / "db.json")
+
+    add_ground_truth([1, 2, 3], ["a", "b", "c"], train_split_ratio=1)
+    add_ground_truth([4, 5], ["d", "e"], train_split_ratio=0, test_split_ratio=1)
+
+    delete_ground_truth("train")
+
+    assert sorted(t.output for t in query_ground_truth()) == ["d", "e"]
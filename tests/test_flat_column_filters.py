@@ -0,0 +1,90 @@
+from typing import Callable, List
+
+import pytest
+from great_ai import ClassificationOutput, TracingDatabaseDriver
+from great_ai.views import Filter, Model
+
+from conftest import create_trace
+
+traces = [
+    create_trace(
+        1,
+        models=[Model(key="my-model", version=3)],
+        output=ClassificationOutput(label="positive", confidence=0.9),
+        feedback={"label": "positive"},
+        logged_values={
+            "arg:n:value": 1,
+            "arg:name:value": "andras",
+            "arg:person:value": {"name": "andras", "age": 30},
+        },
+    ),
+    create_trace(
+        2,
+        models=[Model(key="other-model", version=1)],
+        output=ClassificationOutput(label="negative", confidence=0.8),
+        logged_values={
+            "arg:n:value": 2,
+            "arg:name:value": "bela",
+            "arg:person:value": {"name": "bela", "age": 40},
+        },
+    ),
+]
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite", "mongo"])
+def driver(
+    request: pytest.FixtureRequest, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    driver = create_driver(request.param)
+    driver.save_batch(traces)
+    return driver
+
+
+@pytest.mark.parametrize(
+    "filter,expected",
+    [
+        (Filter(property="output_flat", operator="contains", value="positive"), ["01"]),
+        (
+            Filter(
+                property="output_flat",
+                operator="=",
+                value="{'confidence': 0.8, 'explanation': None, 'label': 'negative'}",
+            ),
+            ["02"],
+        ),
+        (
+            Filter(property="feedback_flat", operator="contains", value="positive"),
+            ["01"],
+        ),
+        (Filter(property="feedback_flat", operator="=", value="null"), ["02"]),
+        (Filter(property="models_flat", operator="contains", value="other"), ["02"]),
+        (Filter(property="models_flat", operator="=", value="my-model:3"), ["01"]),
+        (Filter(property="arg:n:value", operator=">", value=1), ["02"]),
+        (Filter(property="arg:name:value", operator="=", value="'andras'"), ["01"]),
+        (Filter(property="arg:name:value", operator="=", value="andras"), []),
+        (
+            Filter(property="arg:name:value", operator="contains", value="^'and"),
+            ["01"],
+        ),
+        (Filter(property="arg:name:value", operator="contains", value="^and"), []),
+        (
+            Filter(
+                property="arg:person:value",
+                operator="=",
+                value="{'age': 40, 'name': 'bela'}",
+            ),
+            ["02"],
+        ),
+        (
+            Filter(property="arg:person:value", operator="contains", value="andras"),
+            ["01"],
+        ),
+    ],
+)
+def test_columns_are_filtered_by_their_display_strings(
+    driver: TracingDatabaseDriver, filter: Filter, expected: List[str]
+) -> None:
+    result, count = driver.query(conjunctive_filters=[filter])
+
+    assert [t.trace_id for t in result] == expected
+    assert count == len(expected)
@@ -0,0 +1,73 @@
+from typing import List
+
+import numpy as np
+from great_ai.helper import get_cache_key
+from pydantic import BaseModel
+
+
+class Document(BaseModel):
+    title: str
+    tags: List[str]
+
+
+class OtherDocument(BaseModel):
+    title: str
+    tags: List[str]
+
+
+class Opaque:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+
+def test_key_is_canonical() -> None:
+    assert get_cache_key([{3, 1, 2}], {"a": {"y": 1, "x": 2}}) == get_cache_key(
+        [{1, 2, 3}], {"a": {"x": 2, "y": 1}}
+    )
+    assert get_cache_key([{2: "b", "1": "a"}], {}) == get_cache_key(
+        [{"1": "a", 2: "b"}], {}
+    )
+    assert get_cache_key([], {"a": 1, "b": 2}) == get_cache_key([], {"b": 2, "a": 1})
+
+
+def test_types_are_distinguished() -> None:
+    assert get_cache_key([1], {}) != get_cache_key([1.5], {})
+    assert get_cache_key([None], {}) != get_cache_key(["None"], {})
+    assert get_cache_key([Document(title="a", tags=[])], {}) != get_cache_key(
+        [OtherDocument(title="a", tags=[])], {}
+    )
+
+
+def test_containers_and_keys_are_distinguished() -> None:
+    pairs = [
+        ({1: "a"}, {"1": "a"}),
+        ((1, 2), [1, 2]),
+        ({"x": [1]}, {"x": (1,)}),
+        ({1, 2}, [1, 2]),
+        (np.arange(3), np.arange(3).tolist()),
+        (np.arange(3), np.arange(3).astype(float)),
+        (Document(title="a", tags=[]), ["Document", {"title": "a", "tags": []}]),
+    ]
+
+    for a, b in pairs:
+        assert get_cache_key([a], {}) != get_cache_key([b], {})
+        assert get_cache_key([], {"a": a}) != get_cache_key([], {"a": b})
+
+
+def test_pydantic_models() -> None:
+    assert get_cache_key([Document(title="a", tags=["b"])], {}) == get_cache_key(
+        [Document(title="a", tags=["b"])], {}
+    )
+    assert get_cache_key([Document(title="a", tags=["b"])], {}) != get_cache_key(
+        [Document(title="a", tags=["c"])], {}
+    )
+
+
+def test_numpy_arrays() -> None:
+    assert get_cache_key([np.arange(3)], {}) == get_cache_key([np.arange(3)], {})
+    assert get_cache_key([np.arange(3)], {}) != get_cache_key([np.arange(4)], {})
+
+
+def test_falls_back_to_pickle() -> None:
+    assert get_cache_key([(Opaque(1),)], {}) == get_cache_key([(Opaque(1),)], {})
+    assert get_cache_key([(Opaque(1),)], {}) != get_cache_key([(Opaque(2),)], {})
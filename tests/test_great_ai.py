@@ -1,7 +1,11 @@
 from asyncio import sleep
+from itertools import count, islice
+from typing import List
+from unittest.mock import patch
 
 import pytest
-from great_ai import GreatAI
+from great_ai import GreatAI, Trace
+from great_ai.context import get_context
 
 
 def test_process_batch() -> None:
@@ -47,3 +51,90 @@ async def test_process_batch_async_unpacked() -> None:
             [(2, "aa"), (1, "fa"), (3, "b")], unpack_arguments=True
         )
     ] == ["aaaa", "fa", "bbb"]
+
+
+def test_process_stream() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x + 2
+
+    traces = f.process_stream(iter([3, 9, 34]), chunk_size=2, concurrency=2)
+    assert [v.output for v in traces] == [5, 11, 36]
+
+
+def test_process_stream_unpacked_unordered() -> None:
+    @GreatAI.create
+    async def f(a: int, b: str) -> str:
+        await sleep(0.1)
+        return b * a
+
+    assert sorted(
+        v.output
+        for v in f.process_stream(
+            [(2, "aa"), (1, "fa"), (3, "b")],
+            chunk_size=1,
+            unpack_arguments=True,
+            unordered=True,
+        )
+    ) == ["aaaa", "bbb", "fa"]
+
+
+def test_process_stream_persists_in_chunks() -> None:
+    saved: List[List[Trace]] = []
+
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x * 2
+
+    with patch.object(
+        type(get_context().trace_writer), "save", lambda _, traces: saved.append(traces)
+    ):
+        traces = list(islice(f.process_stream(count(), chunk_size=4), 10))
+
+    assert [t.output for t in traces] == list(range(0, 20, 2))
+    assert [len(s) for s in saved] == [4, 4, 4]
+
+
+def test_process_batch_in_event_loop() -> None:
+    running = 0
+    max_running = 0
+
+    @GreatAI.create
+    async def f(x: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await sleep(0.05)
+        running -= 1
+        return x + 2
+
+    traces = f.process_batch(list(range(20)), concurrency=5, use_event_loop=True)
+
+    assert [t.output for t in traces] == [x + 2 for x in range(20)]
+    assert max_running == 5
+
+
+@pytest.mark.asyncio
+async def test_process_batch_in_event_loop_unpacked() -> None:
+    @GreatAI.create
+    async def f(a: int, b: str) -> str:
+        await sleep(0.1)
+        return b * a
+
+    assert [
+        v.output
+        for v in f.process_batch(
+            [(2, "aa"), (1, "fa"), (3, "b")],
+            unpack_arguments=True,
+            use_event_loop=True,
+        )
+    ] == ["aaaa", "fa", "bbb"]
+
+
+def test_process_batch_in_event_loop_requires_async() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x
+
+    with pytest.raises(ValueError):
+        f.process_batch([1], use_event_loop=True)
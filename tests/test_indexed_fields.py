@@ -0,0 +1,92 @@
+from pathlib import Path
+from typing import Callable
+
+import pytest
+from fastapi.testclient import TestClient
+from great_ai import (
+    GreatAI,
+    MongoDbDriver,
+    ParallelTinyDbDriver,
+    SqliteDriver,
+    configure,
+)
+from great_ai.views import Filter, SortBy
+
+
+@pytest.fixture
+def sqlite_driver(create_driver: Callable[..., SqliteDriver]) -> SqliteDriver:
+    return create_driver("sqlite")
+
+
+def test_sqlite_uses_expression_indexes(sqlite_driver: SqliteDriver) -> None:
+    filters = [Filter(property="arg:n:value", operator="=", value=3)]
+    sort_by = [SortBy(column_id="arg:n:value", direction="asc")]
+
+    plan = sqlite_driver.explain(conjunctive_filters=filters)
+    assert not plan.uses_index
+
+    sqlite_driver.create_indexes(["arg:n:value", "created"])
+
+    plan = sqlite_driver.explain(conjunctive_filters=filters)
+    assert plan.uses_index
+    assert len(plan.indexes) == 1 and plan.indexes[0].startswith("traces_")
+
+    plan = sqlite_driver.explain(sort_by=sort_by)
+    assert plan.uses_index
+    assert not any("TEMP B-TREE" in d for d in plan.details)
+
+    plan = sqlite_driver.explain(
+        conjunctive_filters=[Filter(property="arg:n:value", operator=">", value=3)],
+        sort_by=sort_by,
+    )
+    assert plan.uses_index
+
+    plan = sqlite_driver.explain(
+        conjunctive_filters=[Filter(property="arg:m:value", operator=">", value=3)]
+    )
+    assert not plan.uses_index
+
+
+def test_mongo_creates_indexes_for_both_directions(
+    create_driver: Callable[..., MongoDbDriver]
+) -> None:
+    driver = create_driver("mongo")
+    driver.create_indexes(["metric:accuracy"])
+
+    keys = [i["key"] for i in driver._get_collection().index_information().values()]
+    assert [("_flat.metric:accuracy", 1), ("_id", 1)] in keys
+    assert [("_flat.metric:accuracy", -1), ("_id", 1)] in keys
+
+
+def test_tinydb_reports_its_in_memory_indexes(
+    create_driver: Callable[..., ParallelTinyDbDriver], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    driver = create_driver("json")
+
+    assert not driver.explain(conjunctive_tags=["a"]).uses_index
+
+    monkeypatch.setattr(ParallelTinyDbDriver, "storage_mode", "jsonl")
+    assert driver.explain(conjunctive_tags=["a"]).indexes == ["tags"]
+    assert not driver.explain().uses_index
+
+
+def test_explain_endpoint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(SqliteDriver, "path_to_db", tmp_path / "traces.sqlite")
+    monkeypatch.setattr(SqliteDriver, "initialized", True)
+    configure(tracing_database_factory=SqliteDriver, indexed_fields=["arg:x:value"])
+
+    @GreatAI.create
+    def indexed_fields_test_function(x: int) -> int:
+        return x + 2
+
+    client = TestClient(indexed_fields_test_function.app)
+    response = client.post(
+        "/traces/explain",
+        json={
+            "filter": [{"property": "arg:x:value", "operator": "=", "value": 3}],
+            "sort": [],
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["uses_index"]
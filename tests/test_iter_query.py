@@ -0,0 +1,84 @@
+from multiprocessing import Lock
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+from great_ai import (
+    Trace,
+    TracingDatabaseDriver,
+    add_ground_truth,
+    delete_ground_truth,
+    iter_ground_truth,
+)
+from great_ai.persistence.trace_log import TraceLog
+from great_ai.views import Filter, SortBy
+
+from conftest import create_trace
+
+traces = [
+    create_trace(
+        i,
+        original_execution_time_ms=i % 3,
+        feedback=None if i % 2 else i,
+        tags=["iter_query_test"] + (["even"] if i % 2 == 0 else []),
+    )
+    for i in range(20)
+]
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    database = create_driver(request.param)
+    database.save_batch(traces)
+    return database
+
+
+def ids(traces: Iterator[Trace]) -> List[str]:
+    return [t.trace_id for t in traces]
+
+
+def test_iter_query_matches_query(driver: TracingDatabaseDriver) -> None:
+    cases: List[Dict[str, Any]] = [
+        {},
+        {"conjunctive_tags": ["even"]},
+        {"has_feedback": False},
+        {
+            "conjunctive_filters": [
+                Filter(property="arg:n:value", operator=">", value=4)
+            ]
+        },
+        {"sort_by": [SortBy(column_id="original_execution_time_ms", direction="desc")]},
+    ]
+    for kwargs in cases:
+        expected = ids(iter(driver.query(**kwargs)[0]))
+        result = ids(driver.iter_query(batch_size=3, **kwargs))
+
+        if "sort_by" in kwargs:
+            assert result == expected
+        else:
+            assert sorted(result) == sorted(expected)
+
+
+def test_trace_log_reads_in_batches(tmp_path: Path) -> None:
+    log = TraceLog(tmp_path / "traces.jsonl", Lock())
+    log.append(traces[:10])
+
+    documents = log.iter_select(tags=["even"], batch_size=2)
+    assert next(documents)["trace_id"] == "00"
+    log.delete(["04", "08"])
+    log.append([traces[10]])
+
+    assert [d["trace_id"] for d in documents] == ["02", "06"]
+
+
+def test_iter_ground_truth() -> None:
+    add_ground_truth(range(5), range(5), tags="iter_ground_truth_test")
+
+    try:
+        assert sorted(
+            t.input for t in iter_ground_truth("iter_ground_truth_test", batch_size=2)
+        ) == list(range(5))
+    finally:
+        delete_ground_truth("iter_ground_truth_test")
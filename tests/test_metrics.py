@@ -0,0 +1,77 @@
+from asyncio import sleep
+
+import pytest
+from fastapi.testclient import TestClient
+from great_ai import GreatAI, configure, parameter
+from great_ai.tracing.metrics_registry import MetricsRegistry
+
+
+def test_spans_are_recorded() -> None:
+    configure()
+
+    @GreatAI.create
+    @parameter("x", validate=lambda v: v > 0)
+    def f(x: int) -> int:
+        return x + 2
+
+    spans = {s.name: s for s in f(3).spans}
+
+    assert set(spans) == {"cache_lookup", "prediction", "parameter:x"}
+    assert spans["cache_lookup"].start_ms <= 0
+    assert spans["prediction"].depth == 0
+    assert spans["parameter:x"].depth == 1
+    assert spans["parameter:x"].start_ms >= spans["prediction"].start_ms
+
+
+@pytest.mark.asyncio
+async def test_spans_of_async_functions() -> None:
+    @GreatAI.create
+    async def f(x: int) -> int:
+        await sleep(0.05)
+        return x + 2
+
+    spans = {s.name: s for s in (await f(3)).spans}
+    assert spans["prediction"].duration_ms >= 50
+
+
+def test_metrics_endpoint() -> None:
+    configure()
+
+    @GreatAI.create
+    def metrics_test_function(x: int) -> int:
+        return x + 2
+
+    client = TestClient(metrics_test_function.app)
+    client.post("/predict", json={"x": 3})
+    client.post("/predict", json={"x": 3})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'great_ai_cache_hits_total{function="metrics_test_function"} 1' in (
+        response.text
+    )
+    assert (
+        'great_ai_traces_total{function="metrics_test_function",models="",'
+        + 'status="success"} 1'
+    ) in response.text
+    assert (
+        'great_ai_stage_duration_seconds_count{function="metrics_test_function",'
+        + 'models="",stage="prediction"} 1'
+    ) in response.text
+
+
+def test_histogram_is_cumulative() -> None:
+    registry = MetricsRegistry()
+    registry.observe_duration(function="f", models="", stage="s", duration_ms=0.1)
+    registry.observe_duration(function="f", models="", stage="s", duration_ms=20)
+    registry.observe_duration(function="f", models="", stage="s", duration_ms=1e6)
+
+    lines = registry.to_prometheus_text().splitlines()
+    labels = 'function="f",models="",stage="s"'
+
+    assert f'great_ai_stage_duration_seconds_bucket{{{labels},le="0.0005"}} 1' in lines
+    assert f'great_ai_stage_duration_seconds_bucket{{{labels},le="0.025"}} 2' in lines
+    assert f'great_ai_stage_duration_seconds_bucket{{{labels},le="+Inf"}} 3' in lines
+    assert f"great_ai_stage_duration_seconds_count{{{labels}}} 3" in lines
@@ -0,0 +1,121 @@
+import asyncio
+from time import sleep
+from typing import List
+
+import pytest
+from great_ai import GreatAI
+from great_ai.deploy.micro_batcher import MicroBatcher
+from great_ai.deploy.prediction_executor import PredictionExecutor
+
+
+def test_single_call() -> None:
+    calls: List[List[int]] = []
+
+    @GreatAI.create(max_batch_size=4)
+    def f(values: List[int]) -> List[int]:
+        calls.append(values)
+        return [v + 2 for v in values]
+
+    trace = f(3)
+    assert trace.output == 5
+    assert trace.logged_values["arg:values:value"] == 3
+    assert calls == [[3]]
+
+
+def test_process_batch_is_vectorised() -> None:
+    @GreatAI.create(max_batch_size=4)
+    def f(values: List[int]) -> List[int]:
+        return [len(values)] * len(values)
+
+    traces = f.process_batch(list(range(10)), concurrency=1)
+    assert [t.output for t in traces] == [4] * 8 + [2] * 2
+    assert len({t.trace_id for t in traces}) == 10
+
+
+def test_process_stream_is_vectorised() -> None:
+    @GreatAI.create(max_batch_size=4)
+    def f(values: List[int]) -> List[int]:
+        return [len(values)] * len(values)
+
+    traces = f.process_stream(
+        iter(range(10)), chunk_size=8, concurrency=1, do_not_persist_traces=True
+    )
+    assert [t.output for t in traces] == [4] * 8 + [2] * 2
+
+
+def test_wrong_output_length() -> None:
+    @GreatAI.create(max_batch_size=4)
+    def f(values: List[int]) -> List[int]:
+        return []
+
+    with pytest.raises(ValueError):
+        f(3)
+
+
+def test_multiple_inputs_are_not_allowed() -> None:
+    with pytest.raises(ValueError):
+
+        @GreatAI.create(max_batch_size=4)
+        def f(a: List[int], b: List[int]) -> List[int]:
+            return a
+
+
+@pytest.mark.asyncio
+async def test_async_single_call() -> None:
+    @GreatAI.create(max_batch_size=4)
+    async def f(values: List[str]) -> List[str]:
+        await asyncio.sleep(0.1)
+        return [v.upper() for v in values]
+
+    trace = await f("hi")
+    assert trace.output == "HI"
+    assert trace.logged_values["arg:values:length"] == 2
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_collects_concurrent_requests() -> None:
+    batches: List[List[int]] = []
+
+    def process(values: List[int]) -> List[int]:
+        batches.append(values)
+        return [v * 2 for v in values]
+
+    batcher = MicroBatcher(process, max_batch_size=3, max_wait_ms=50)
+    results = await asyncio.gather(*[batcher.submit(i) for i in range(7)])
+
+    assert results == [i * 2 for i in range(7)]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_propagates_exceptions() -> None:
+    def process(values: List[int]) -> List[int]:
+        raise ZeroDivisionError()
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=0)
+    with pytest.raises(ZeroDivisionError):
+        await asyncio.gather(*[batcher.submit(i) for i in range(3)])
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_does_not_block_event_loop() -> None:
+    batches: List[List[int]] = []
+
+    def process(values: List[int]) -> List[int]:
+        batches.append(values)
+        sleep(0.3)
+        return [v * 2 for v in values]
+
+    executor = PredictionExecutor(process)
+    batcher = MicroBatcher(
+        executor.run_without_blocking, max_batch_size=2, max_wait_ms=0
+    )
+    task = asyncio.ensure_future(asyncio.gather(*[batcher.submit(i) for i in range(4)]))
+
+    await asyncio.sleep(0.1)
+    assert not task.done()  # the event loop is free while predicting
+    assert batcher._tasks  # the running batches are referenced
+
+    assert await task == [0, 2, 4, 6]
+    assert batches == [[0, 1], [2, 3]]
+    assert not batcher._tasks
@@ -0,0 +1,89 @@
+from typing import Any, Dict, List
+
+import pytest
+from great_ai import MongoDbDriver
+from great_ai.persistence import mongodb_driver
+from great_ai.persistence.connection_pool_listener import ConnectionPoolListener
+from great_ai.views import Filter
+
+from conftest import create_trace
+
+
+@pytest.fixture
+def clients(mongo_clients: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    MongoDbDriver.configure_credentials(
+        mongo_connection_string=MongoDbDriver.mongo_connection_string,
+        mongo_database=MongoDbDriver.mongo_database,
+        max_pool_size="8",
+    )
+    return mongo_clients
+
+
+def test_client_is_reused(clients: List[Dict[str, Any]]) -> None:
+    driver = MongoDbDriver()
+    driver.save(create_trace(1, trace_id="a", tags=["f"]))
+    driver.save_batch(
+        [
+            create_trace(2, trace_id="b", tags=["f"]),
+            create_trace(3, trace_id="c", tags=["f"]),
+        ]
+    )
+    driver.update("a", create_trace(4, trace_id="a", tags=["f"]))
+    driver.delete("b")
+
+    a = driver.get("a")
+    assert a is not None and a.output == 4
+    assert [t.trace_id for t in driver.query(conjunctive_tags=["f"])[0]] == ["a", "c"]
+
+    assert len(clients) == 1
+    assert clients[0]["maxPoolSize"] == 8
+    assert driver.connection_pool_statistics.clients_created == 1
+    assert driver.connection_pool_statistics.max_pool_size == 8
+
+
+def test_client_is_recreated_after_fork(
+    clients: List[Dict[str, Any]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    driver = MongoDbDriver()
+    driver.save(create_trace(1, trace_id="a", tags=["f"]))
+
+    monkeypatch.setattr(mongodb_driver.os, "getpid", lambda: -1)
+    driver.get("a")
+    driver.get("a")
+
+    assert len(clients) == 2
+    assert driver.connection_pool_statistics.clients_created == 1
+
+
+def test_pool_listener() -> None:
+    listener = ConnectionPoolListener()
+
+    for _ in range(2):
+        listener.connection_created(None)  # type: ignore
+        listener.connection_checked_out(None)  # type: ignore
+    listener.connection_checked_in(None)  # type: ignore
+    listener.connection_check_out_failed(None)  # type: ignore
+
+    assert listener.open_connections == 2
+    assert listener.in_use == 1
+    assert listener.checkouts == 2
+    assert listener.failed_checkouts == 1
+
+
+def test_migrate_flat_documents(clients: List[Dict[str, Any]]) -> None:
+    driver = MongoDbDriver()
+    driver.save(create_trace(1, trace_id="a", tags=["f"]))
+    flat = create_trace(2, trace_id="b", tags=["f"]).to_flat_dict()
+    flat["_id"] = "b"
+    driver._get_collection().insert_one(flat)
+
+    report = driver.migrate(batch_size=1)
+
+    assert report.document_count == 2
+    assert report.migrated_count == 1
+    assert report.size_after_in_bytes < report.size_before_in_bytes
+    assert driver.migrate().migrated_count == 0
+    assert "output_flat" not in driver._get_collection().find_one("b")
+
+    filters = [Filter(property="output_flat", operator="contains", value=2)]
+    assert [t.trace_id for t in driver.query(conjunctive_filters=filters)[0]] == ["b"]
@@ -0,0 +1,140 @@
+import logging
+from datetime import datetime, timedelta
+from time import sleep
+from typing import Any, Callable, List
+
+import pytest
+from great_ai import MongoDbDriver, PersistencePolicy, TracingDatabaseDriver
+from great_ai.persistence.trace_sampler import TraceSampler
+from great_ai.persistence.trace_writer import TraceWriter
+
+from conftest import create_trace
+
+logger = logging.getLogger("test")
+
+
+def days_ago(days: float) -> str:
+    return (datetime.utcnow() - timedelta(days=days)).isoformat()
+
+
+def test_sampling_keeps_important_traces() -> None:
+    sampler = TraceSampler(
+        PersistencePolicy(sample_rate=0, keep_slow_percentile=90),
+        window_size=100,
+        min_observations=100,
+    )
+
+    assert not sampler.should_persist(create_trace(0, original_execution_time_ms=1000))
+    assert sampler.should_persist(create_trace(0, exception="ValueError"))
+    assert sampler.should_persist(create_trace(0, feedback=1))
+
+    for i in range(200):
+        sampler.should_persist(create_trace(i, original_execution_time_ms=i % 100))
+
+    assert sampler.slow_threshold_ms == 89
+    assert sampler.should_persist(create_trace(0, original_execution_time_ms=95))
+    assert not sampler.should_persist(create_trace(0, original_execution_time_ms=50))
+
+
+def test_sample_rate() -> None:
+    sampler = TraceSampler(PersistencePolicy(sample_rate=0.2))
+    kept = sum(sampler.should_persist(create_trace(i)) for i in range(5000))
+
+    assert 800 < kept < 1200
+
+    with pytest.raises(ValueError):
+        TraceSampler(PersistencePolicy(sample_rate=2))
+
+
+@pytest.fixture(params=["json", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    return create_driver(request.param)
+
+
+def ids(driver: TracingDatabaseDriver) -> List[str]:
+    return sorted(t.trace_id for t in driver.iter_query())
+
+
+def test_writer_samples_traces(driver: TracingDatabaseDriver) -> None:
+    writer = TraceWriter(driver, logger=logger, policy=PersistencePolicy(sample_rate=0))
+
+    writer.save(
+        [
+            create_trace(0, created=days_ago(0)),
+            create_trace(1, created=days_ago(0), exception="ValueError"),
+        ]
+    )
+    writer.save([create_trace(2, created=days_ago(0), feedback=2)])
+
+    assert ids(driver) == ["01", "02"]
+    assert writer.statistics.sampled_out == 1
+    assert writer.statistics.saved == 2
+
+
+def test_prune(driver: TracingDatabaseDriver) -> None:
+    driver.save_batch(
+        [
+            create_trace(0, created=days_ago(10)),
+            create_trace(1, created=days_ago(10), feedback=1),
+            create_trace(2, created=days_ago(1)),
+        ]
+    )
+
+    assert driver.prune(datetime.utcnow() - timedelta(days=5)) == 1
+    assert ids(driver) == ["01", "02"]
+
+    assert (
+        driver.prune(datetime.utcnow() - timedelta(days=5), keep_with_feedback=False)
+        == 1
+    )
+    assert ids(driver) == ["02"]
+
+
+def test_writer_prunes_local_drivers(
+    create_driver: Callable[..., TracingDatabaseDriver]
+) -> None:
+    driver = create_driver("sqlite")
+    driver.save(create_trace(0, created=days_ago(10)))
+
+    writer = TraceWriter(
+        driver, logger=logger, policy=PersistencePolicy(retention_days=5)
+    )
+    writer.save([create_trace(1, created=days_ago(0))])
+
+    for _ in range(100):
+        if writer.statistics.pruned:
+            break
+        sleep(0.05)
+
+    assert writer.statistics.pruned == 1
+    assert ids(driver) == ["01"]
+
+
+def test_mongo_uses_ttl_index(driver: TracingDatabaseDriver) -> None:
+    if not isinstance(driver, MongoDbDriver):
+        pytest.skip("only MongoDbDriver has built-in expiry")
+
+    writer = TraceWriter(
+        driver, logger=logger, policy=PersistencePolicy(retention_days=5)
+    )
+    writer.save(
+        [
+            create_trace(0, created=days_ago(0)),
+            create_trace(1, created=days_ago(0), feedback=1),
+        ]
+    )
+
+    collection = driver._get_collection()
+    assert any(
+        index.get("expireAfterSeconds") == 0
+        for index in collection.index_information().values()
+    )
+
+    document = collection.find_one("00")
+    assert document["expires_at"] - datetime.fromisoformat(
+        document["created"]
+    ) == pytest.approx(timedelta(days=5), abs=timedelta(milliseconds=1))
+    assert "expires_at" not in collection.find_one("01")
+    assert driver.get("00") is not None
@@ -0,0 +1,197 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import sleep
+from typing import List
+from unittest.mock import patch
+
+import pytest
+from great_ai import (
+    GreatAI,
+    InMemoryPredictionCache,
+    SqlitePredictionCache,
+    Trace,
+    configure,
+)
+from great_ai.context import get_context
+
+from conftest import create_trace
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache_factory(request, tmp_path: Path):  # type: ignore
+    if request.param == "memory":
+        yield InMemoryPredictionCache
+        return
+
+    with patch.object(SqlitePredictionCache, "path_to_db", tmp_path / "cache.sqlite"):
+        yield SqlitePredictionCache
+
+
+def test_hits_and_misses(cache_factory) -> None:  # type: ignore
+    cache = cache_factory("f:0.0.1", max_size=10)
+
+    assert cache.get("a") is None
+    cache.set("a", create_trace(0, trace_id="a", output="a"))
+    assert cache.get("a").output == "a"
+
+    statistics = cache.statistics
+    assert statistics.backend == cache_factory.__name__
+    assert (statistics.hits, statistics.misses, statistics.size) == (1, 1, 1)
+
+
+def test_least_recently_used_is_evicted(cache_factory) -> None:  # type: ignore
+    cache = cache_factory("f:0.0.1", max_size=2)
+
+    cache.set("a", create_trace(0, trace_id="a", output="a"))
+    cache.set("b", create_trace(0, trace_id="b", output="b"))
+    cache.get("a")
+    cache.set("c", create_trace(0, trace_id="c", output="c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.statistics.size == 2
+
+
+def test_eviction_by_size_in_bytes(cache_factory) -> None:  # type: ignore
+    size_of_trace = InMemoryPredictionCache("f", max_size=1, max_size_in_bytes=10**6)
+    size_of_trace.set("a", create_trace(0, trace_id="a", output="a"))
+    single_size = size_of_trace.statistics.size_in_bytes
+
+    cache = cache_factory("f:0.0.1", max_size=10, max_size_in_bytes=single_size * 2)
+    for key in "abcd":
+        cache.set(key, create_trace(0, trace_id=key, output=key))
+
+    statistics = cache.statistics
+    assert statistics.size == 2
+    assert statistics.size_in_bytes <= statistics.max_size_in_bytes
+    assert cache.get("d") is not None
+
+
+def test_expired_entries_are_missing(cache_factory) -> None:  # type: ignore
+    cache = cache_factory("f:0.0.1", max_size=10, ttl_seconds=60)
+
+    with patch("great_ai.prediction_cache.prediction_cache.time", return_value=0):
+        cache.set("a", create_trace(0, trace_id="a", output="a"))
+
+    with patch("great_ai.prediction_cache.prediction_cache.time", return_value=30):
+        assert cache.get("a") is not None
+
+    with patch("great_ai.prediction_cache.prediction_cache.time", return_value=61):
+        assert cache.get("a") is None
+
+
+def test_sqlite_cache_is_shared(tmp_path: Path) -> None:
+    with patch.object(SqlitePredictionCache, "path_to_db", tmp_path / "cache.sqlite"):
+        SqlitePredictionCache("f:0.0.1", max_size=10).set(
+            "a", create_trace(0, trace_id="a", output="a")
+        )
+
+        assert SqlitePredictionCache("f:0.0.1", max_size=10).get("a") is not None
+        assert SqlitePredictionCache("f:0.0.2", max_size=10).get("a") is None
+
+
+def test_great_ai_uses_configured_cache(tmp_path: Path) -> None:
+    calls: List[dict] = []
+
+    with patch.object(SqlitePredictionCache, "path_to_db", tmp_path / "cache.sqlite"):
+        configure(prediction_cache_factory=SqlitePredictionCache)
+
+        @GreatAI.create
+        def f(value: dict) -> int:
+            calls.append(value)
+            return len(value)
+
+        first = f({"a": 1, "b": [1, 2]})
+        second = f({"b": [1, 2], "a": 1})
+
+    configure()
+
+    assert first.trace_id == second.trace_id
+    assert len(calls) == 1
+    assert f._cache is not None
+    assert f._cache.statistics.hits == 1
+
+
+def test_caching_can_be_disabled() -> None:
+    configure(prediction_cache_size=0)
+    assert get_context().prediction_cache_size == 0
+
+    @GreatAI.create
+    def f(value: int) -> int:
+        return value
+
+    assert f(1).trace_id != f(1).trace_id
+    configure()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_calls_are_coalesced() -> None:
+    calls: List[int] = []
+
+    @GreatAI.create
+    async def f(value: int) -> int:
+        calls.append(value)
+        await asyncio.sleep(0.1)
+        return value
+
+    traces = await asyncio.gather(*[f(1) for _ in range(5)])
+
+    assert len(calls) == 1
+    assert len({t.trace_id for t in traces}) == 1
+    assert f._cache is not None
+    assert f._cache.statistics.coalesced == 4
+
+
+def test_transient_traces_are_cached_separately() -> None:
+    @GreatAI.create
+    def f(value: int) -> int:
+        return value
+
+    transient = f(1, do_not_persist_traces=True)
+
+    assert f(1).trace_id != transient.trace_id
+    assert f(1, do_not_persist_traces=True).trace_id == transient.trace_id
+
+
+def test_concurrent_sync_calls_are_coalesced(cache_factory) -> None:  # type: ignore
+    configure(prediction_cache_factory=cache_factory)
+    calls: List[int] = []
+
+    @GreatAI.create
+    def f(value: int) -> int:
+        calls.append(value)
+        sleep(0.2)
+        return value
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        traces = list(executor.map(f, [1] * 5))
+
+    configure()
+
+    assert len(calls) == 1
+    assert len({t.trace_id for t in traces}) == 1
+    assert f._cache is not None
+    assert f._cache.statistics.coalesced == 4
+
+
+def test_exceptions_are_shared_with_waiting_callers() -> None:
+    cache = InMemoryPredictionCache("f:0.0.1", max_size=10)
+
+    def compute() -> Trace:
+        sleep(0.2)
+        raise ValueError("oh no")
+
+    def call() -> str:
+        try:
+            cache.get_or_compute("a", compute)
+        except ValueError as e:
+            return str(e)
+        return "no exception"
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        assert list(executor.map(lambda _: call(), range(3))) == ["oh no"] * 3
+
+    assert cache.statistics.coalesced == 2
+    assert cache.statistics.size == 0
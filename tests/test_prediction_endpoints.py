@@ -0,0 +1,118 @@
+import asyncio
+from time import sleep, time
+from typing import Any, List
+
+from fastapi.testclient import TestClient
+from great_ai import GreatAI
+from great_ai.context import get_context
+
+
+def test_predict() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x + 2
+
+    client = TestClient(f.app)
+    response = client.post("/predict", json={"x": 3})
+
+    assert response.status_code == 200
+    assert response.json()["output"] == 5
+
+
+def test_predict_batch_saves_once(monkeypatch: Any) -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x * 3
+
+    saved_batches: List[int] = []
+    database = get_context().tracing_database
+
+    def save(*_: Any) -> None:
+        raise AssertionError("save should not be called")
+
+    def save_batch(traces: List[Any]) -> List[str]:
+        saved_batches.append(len(traces))
+        return [t.trace_id for t in traces]
+
+    monkeypatch.setattr(database, "save", save)
+    monkeypatch.setattr(database, "save_batch", save_batch)
+
+    client = TestClient(f.app)
+    response = client.post("/predict_batch", json=[{"x": 1}, {"x": 7}, {"x": 1}])
+
+    assert response.status_code == 200
+    assert [t["output"] for t in response.json()] == [3, 21, 3]
+    assert saved_batches == [2]  # the third one was served from cache
+
+
+def test_predict_batch_saves_the_traces_of_every_item(monkeypatch: Any) -> None:
+    @GreatAI.create
+    async def f(x: int) -> int:
+        if x == 0:
+            raise ValueError("x cannot be 0")
+        await asyncio.sleep(0.1)  # finishes after the failing prediction
+        return x
+
+    saved: List[Any] = []
+    database = get_context().tracing_database
+
+    def save_batch(traces: List[Any]) -> List[str]:
+        saved.extend(traces)
+        return [t.trace_id for t in traces]
+
+    monkeypatch.setattr(database, "save_batch", save_batch)
+
+    client = TestClient(f.app)
+    response = client.post("/predict_batch", json=[{"x": 1}, {"x": 0}, {"x": 2}])
+
+    assert response.status_code == 500
+    assert "x cannot be 0" in response.json()["detail"]
+    assert len(saved) == 3
+    assert {(t.output, t.exception) for t in saved} == {
+        (None, "ValueError: x cannot be 0"),
+        (1, None),
+        (2, None),
+    }
+
+
+def test_predict_batch_async() -> None:
+    @GreatAI.create
+    async def f(text: str) -> str:
+        return text.upper()
+
+    client = TestClient(f.app)
+    response = client.post("/predict_batch", json=[{"text": "a"}, {"text": "b"}])
+
+    assert response.status_code == 200
+    assert [t["output"] for t in response.json()] == ["A", "B"]
+
+
+def test_predict_batch_batched() -> None:
+    batch_sizes: List[int] = []
+
+    @GreatAI.create(max_batch_size=2)
+    def f(values: List[int]) -> List[int]:
+        batch_sizes.append(len(values))
+        return [-v for v in values]
+
+    client = TestClient(f.app)
+    response = client.post("/predict_batch", json=[{"values": v} for v in range(3)])
+
+    assert response.status_code == 200
+    assert [t["output"] for t in response.json()] == [0, -1, -2]
+    assert batch_sizes == [2, 1]
+
+
+def test_predict_batch_runs_sync_items_concurrently() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        sleep(0.3)
+        return x
+
+    client = TestClient(f.app)
+    start = time()
+    response = client.post("/predict_batch", json=[{"x": x} for x in range(4)])
+
+    assert response.status_code == 200
+    assert [t["output"] for t in response.json()] == [0, 1, 2, 3]
+    assert time() - start < 1
@@ -0,0 +1,91 @@
+import asyncio
+from time import sleep
+
+import pytest
+from great_ai import GreatAI
+from great_ai.deploy.prediction_executor import (
+    QUEUE_WAIT_TIME_METRIC_NAME,
+    PredictionExecutor,
+)
+from great_ai.tracing import TracingContext
+
+
+@pytest.mark.asyncio
+async def test_inline() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x + 1
+
+    trace = await PredictionExecutor(f).run(1)
+    assert trace.output == 2
+    assert QUEUE_WAIT_TIME_METRIC_NAME not in trace.logged_values
+
+
+@pytest.mark.asyncio
+async def test_thread_does_not_block_event_loop() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        sleep(0.5)
+        return x + 1
+
+    executor = PredictionExecutor(f, strategy="thread", max_workers=1)
+    task = asyncio.ensure_future(
+        asyncio.gather(executor.run(1), executor.run(2), executor.run(3))
+    )
+
+    await asyncio.sleep(0.1)
+    assert not task.done()  # the event loop is free while predicting
+
+    traces = await task
+    executor.shutdown()
+
+    assert [t.output for t in traces] == [2, 3, 4]
+    assert traces[2].logged_values[QUEUE_WAIT_TIME_METRIC_NAME] >= 500
+
+
+@pytest.mark.asyncio
+async def test_process() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        return x * 2
+
+    executor = PredictionExecutor(f, strategy="process", max_workers=2)
+    traces = await asyncio.gather(*[executor.run(i) for i in range(4)])
+    executor.shutdown()
+
+    assert [t.output for t in traces] == [0, 2, 4, 6]
+    assert all(QUEUE_WAIT_TIME_METRIC_NAME in t.logged_values for t in traces)
+
+
+@pytest.mark.asyncio
+async def test_process_returns_its_traces() -> None:
+    @GreatAI.create
+    def f(x: int) -> int:
+        if x == 0:
+            raise ValueError("x cannot be 0")
+        return x
+
+    executor = PredictionExecutor(f, strategy="process", max_workers=2)
+    with TracingContext.collect_traces(persist=False) as collected:
+        results = await asyncio.gather(
+            *[executor.run(i) for i in range(3)], return_exceptions=True
+        )
+    executor.shutdown()
+
+    assert isinstance(results[0], ValueError)
+    assert len(collected) == 3
+    assert {(t.output, t.exception) for t in collected} == {
+        (None, "ValueError: x cannot be 0"),
+        (1, None),
+        (2, None),
+    }
+
+
+@pytest.mark.asyncio
+async def test_async_function_is_awaited() -> None:
+    @GreatAI.create
+    async def f(x: int) -> int:
+        return x - 1
+
+    trace = await PredictionExecutor(f, strategy="process").run(1)
+    assert trace.output == 0
@@ -0,0 +1,88 @@
+import random
+from typing import Any, Dict, List
+
+from great_ai import Trace
+from great_ai.persistence.query_documents import get_flat_value, query_documents
+from great_ai.views import Filter, Model, SortBy
+
+
+def create_document(i: int) -> Dict[str, Any]:
+    return Trace(
+        trace_id=str(i),
+        created=f"2022-07-11T14:{i % 60:02}:00",
+        original_execution_time_ms=i % 7,
+        logged_values={
+            "arg:text:value": f"text number {i}",
+            "arg:n:value": i % 5,
+            "arg:list:value": [i, {"a": i}],
+        },
+        models=[Model(key="model", version=i % 3)],
+        exception=None if i % 4 else "Oops",
+        output={"label": i % 2, "confidence": i / 100},
+        feedback=None if i % 3 else i,
+        tags=["f", "online"],
+    ).dict()
+
+
+def test_flat_values_match_to_flat_dict() -> None:
+    for i in range(12):
+        document = create_document(i)
+        flat = Trace.parse_obj(document).to_flat_dict()
+        for key, value in flat.items():
+            assert get_flat_value(document, key) == value
+
+
+def test_filters() -> None:
+    documents = [create_document(i) for i in range(100)]
+
+    traces, count = query_documents(
+        documents,
+        conjunctive_filters=[
+            Filter(property="arg:n:value", operator=">=", value=3),
+            Filter(property="exception_flat", operator="contains", value="OOPS"),
+            # logged strings are pformatted, see Trace.to_flat_dict
+            Filter(property="arg:text:value", operator="!=", value="'text number 8'"),
+        ],
+    )
+
+    expected = [str(i) for i in range(100) if i % 5 >= 3 and i % 4 == 0 and i != 8]
+    assert [t.trace_id for t in traces] == expected
+    assert count == len(expected)
+
+    traces, count = query_documents(
+        documents,
+        conjunctive_filters=[Filter(property="feedback", operator=">", value=90)],
+    )
+    assert [t.trace_id for t in traces] == ["93", "96", "99"]
+
+
+def test_paging_matches_full_sort() -> None:
+    documents = [create_document(i) for i in range(200)]
+    random.Random(42).shuffle(documents)
+    sort_by = [
+        SortBy(column_id="feedback", direction="desc"),
+        SortBy(column_id="original_execution_time_ms", direction="asc"),
+    ]
+
+    everything, _ = query_documents(documents, sort_by=sort_by)
+    pages: List[Trace] = []
+    for skip in range(0, 200, 30):
+        page, count = query_documents(documents, skip=skip, take=30, sort_by=sort_by)
+        assert count == 200
+        pages.extend(page)
+
+    assert [t.trace_id for t in pages] == [t.trace_id for t in everything]
+    assert everything[0].feedback == 198
+    assert everything[-1].feedback is None  # missing values come last
+
+
+def test_sorting_strings_in_descending_order() -> None:
+    documents = [create_document(i) for i in range(20)]
+
+    traces, _ = query_documents(
+        documents, take=3, sort_by=[SortBy(column_id="created", direction="desc")]
+    )
+
+    assert [t.created for t in traces] == sorted(
+        (d["created"] for d in documents), reverse=True
+    )[:3]
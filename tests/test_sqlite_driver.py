@@ -0,0 +1,156 @@
+import json
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pytest
+from great_ai import SqliteDriver, Trace
+from great_ai.context import _initialize_tracing_database
+from great_ai.views import Filter, SortBy
+
+from conftest import create_trace, first_created
+
+traces = {
+    id: create_trace(
+        i,
+        trace_id=id,
+        logged_values={"arg:text:value": f"text of {id}", "arg:n:value": i},
+        output=i + 1,
+        feedback=feedback,
+        tags=tags,
+    )
+    for i, (id, tags, feedback) in enumerate(
+        [
+            ("a", ["f", "online"], None),
+            ("b", ["f", "ground_truth"], None),
+            ("c", ["g", "ground_truth"], 3),
+            ("d", ["f", "online"], None),
+            ("e", ["old"], None),
+        ]
+    )
+}
+
+
+@pytest.fixture
+def driver(create_driver: Callable[..., SqliteDriver]) -> SqliteDriver:
+    driver = create_driver("sqlite")
+    driver.save_batch([traces["a"], traces["b"], traces["c"]])
+    driver.save(traces["d"])
+    return driver
+
+
+def ids(traces: List[Trace]) -> List[str]:
+    return [t.trace_id for t in traces]
+
+
+def test_get(driver: SqliteDriver) -> None:
+    trace: Optional[Trace] = driver.get("b")
+
+    assert trace is not None
+    assert trace.output == 2
+    assert trace.logged_values["arg:text:value"] == "text of b"
+    assert driver.get("unknown") is None
+
+
+def test_query_by_tags_and_time(driver: SqliteDriver) -> None:
+    traces, count = driver.query(conjunctive_tags=["f", "online"])
+    assert ids(traces) == ["a", "d"]
+    assert count == 2
+
+    traces, count = driver.query(
+        since=first_created + timedelta(minutes=1),
+        until=first_created + timedelta(minutes=2),
+    )
+    assert ids(traces) == ["b", "c"]
+
+    traces, count = driver.query(has_feedback=True)
+    assert ids(traces) == ["c"]
+    traces, count = driver.query(has_feedback=False)
+    assert ids(traces) == ["a", "b", "d"]
+
+
+def test_query_with_filters(driver: SqliteDriver) -> None:
+    traces, count = driver.query(
+        conjunctive_filters=[Filter(property="output", operator=">=", value=2)]
+    )
+    assert ids(traces) == ["b", "c", "d"]
+
+    traces, count = driver.query(
+        conjunctive_filters=[
+            Filter(property="arg:text:value", operator="contains", value="OF [ad]")
+        ]
+    )
+    assert ids(traces) == ["a", "d"]
+
+    traces, count = driver.query(
+        conjunctive_filters=[
+            Filter(property="arg:n:value", operator="contains", value=2)
+        ]
+    )
+    assert ids(traces) == ["c"]
+
+
+def test_sorting_and_paging(driver: SqliteDriver) -> None:
+    traces, count = driver.query(
+        sort_by=[SortBy(column_id="output", direction="desc")], skip=1, take=2
+    )
+
+    assert ids(traces) == ["c", "b"]
+    assert count == 4
+
+
+def test_update_and_delete(driver: SqliteDriver) -> None:
+    new_version = traces["a"].copy(
+        update={"output": 10, "tags": ["h"], "feedback": "good"}
+    )
+    driver.update("a", new_version)
+
+    assert ids(driver.query(conjunctive_tags=["h"])[0]) == ["a"]
+    assert ids(driver.query(conjunctive_tags=["online"])[0]) == ["d"]
+    assert ids(driver.query(has_feedback=True)[0]) == ["a", "c"]
+
+    driver.delete("a")
+    driver.delete_batch(["b", "c"])
+
+    assert ids(driver.query()[0]) == ["d"]
+    assert ids(driver.query(conjunctive_tags=["f"])[0]) == ["d"]
+
+
+def test_configured_from_sqlite_ini(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(SqliteDriver, "initialized", False)
+    monkeypatch.setattr(SqliteDriver, "path_to_db", SqliteDriver.path_to_db)
+    (tmp_path / "sqlite.ini").write_text("sqlite_path = my_traces.sqlite\n")
+
+    assert (
+        _initialize_tracing_database(None, logger=logging.getLogger("test"))
+        == SqliteDriver
+    )
+    assert SqliteDriver.path_to_db == Path("my_traces.sqlite")
+
+
+def test_migrate_flat_documents(driver: SqliteDriver) -> None:
+    flat = traces["e"]
+    driver._execute_in_transaction(
+        lambda connection: connection.execute(
+            "INSERT INTO traces (trace_id, created, document) VALUES (?, ?, ?)",
+            (flat.trace_id, flat.created, json.dumps(flat.to_flat_dict())),
+        )
+    )
+    filters = [Filter(property="arg:text:value", operator="contains", value="of e")]
+    # the display fields filtered by are only stored by the migration
+    assert ids(driver.query(conjunctive_filters=filters)[0]) == []
+
+    report = driver.migrate(batch_size=2)
+
+    assert report.document_count == 5
+    assert report.migrated_count == 1
+    assert report.size_after_in_bytes < report.size_before_in_bytes
+    assert driver.migrate().migrated_count == 0
+
+    assert ids(driver.query(conjunctive_filters=filters)[0]) == ["e"]
+    trace = driver.get("e")
+    assert trace is not None and trace.to_flat_dict() == flat.to_flat_dict()
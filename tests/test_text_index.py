@@ -0,0 +1,108 @@
+import sqlite3
+from typing import Any, Callable, List
+
+import pytest
+from great_ai import SqliteDriver, TracingDatabaseDriver
+from great_ai.views import Filter
+
+from conftest import create_trace
+
+texts = ["hello world", "hello, word!", "other words", "hello <b>world</b>", None]
+
+
+traces = [
+    create_trace(
+        i,
+        logged_values={"arg:text:value": texts[i % len(texts)], "arg:n:value": i},
+        output={"label": "world"} if i % 2 else f"output {i}",
+    )
+    for i in range(10)
+]
+
+
+@pytest.fixture(params=["jsonl", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    return create_driver(request.param, text_index=True)
+
+
+def search(
+    driver: TracingDatabaseDriver, property: str, value: str, **kwargs: Any
+) -> List[str]:
+    traces, count = driver.query(
+        conjunctive_filters=[
+            Filter(property=property, operator="contains", value=value)
+        ],
+        **kwargs,
+    )
+    assert count == len(traces)
+    return [t.trace_id for t in traces]
+
+
+def test_contains_matches_substrings(driver: TracingDatabaseDriver) -> None:
+    driver.save_batch(traces[:10])
+
+    assert search(driver, "arg:text:value", "wor") == [
+        f"{i:02}" for i in [0, 1, 2, 3, 5, 6, 7, 8]
+    ]
+    assert search(driver, "arg:text:value", "lo wor") == ["00", "05"]
+    assert search(driver, "arg:text:value", "rl") == ["00", "03", "05", "08"]
+    assert search(driver, "arg:text:value", "d") == [
+        f"{i:02}" for i in [0, 1, 2, 3, 5, 6, 7, 8]
+    ]
+    assert search(driver, "arg:text:value", "missing") == []
+    assert search(driver, "arg:text:value", "other.*s") == ["02", "07"]
+    assert search(driver, "output_flat", "output 4") == ["04"]
+    assert [
+        t.trace_id
+        for t in driver.iter_query(
+            conjunctive_filters=[
+                Filter(property="arg:text:value", operator="contains", value="word")
+            ]
+        )
+    ] == ["01", "02", "06", "07"]
+
+
+def test_non_string_values_are_candidates(driver: TracingDatabaseDriver) -> None:
+    driver.save_batch(traces[:4])
+
+    assert search(driver, "output_flat", "output") == ["00", "02"]
+    # the output of the odd traces is a dictionary, its display string is searched
+    assert search(driver, "output_flat", "label") == ["01", "03"]
+
+
+def test_index_follows_updates_and_deletes(driver: TracingDatabaseDriver) -> None:
+    driver.save_batch(traces[:3])
+
+    updated = traces[2].copy(update={"logged_values": {"arg:text:value": "goodbye"}})
+    driver.update("02", updated)
+    driver.delete_batch(["00"])
+
+    assert search(driver, "arg:text:value", "good") == ["02"]
+    assert search(driver, "arg:text:value", "hello") == ["01"]
+    assert search(driver, "arg:text:value", "other") == []
+
+
+def test_migrate_indexes_existing_traces(
+    create_driver: Callable[..., TracingDatabaseDriver]
+) -> None:
+    create_driver("sqlite").save_batch(traces[:5])
+
+    driver = create_driver("sqlite", text_index=True)
+    assert search(driver, "arg:text:value", "hello") == []
+
+    driver.migrate()
+    assert search(driver, "arg:text:value", "hello") == ["00", "01", "03"]
+
+
+def test_trigrams_of_existing_text_indexes(
+    create_driver: Callable[..., TracingDatabaseDriver]
+) -> None:
+    create_driver("sqlite", text_index=True).save_batch(traces[:5])
+    connection = sqlite3.connect(SqliteDriver.path_to_db)
+    connection.execute("DROP TABLE trace_trigrams")  # created by earlier versions
+    connection.close()
+
+    driver = create_driver("sqlite", text_index=True)
+    assert search(driver, "arg:text:value", "hello") == ["00", "01", "03"]
@@ -0,0 +1,141 @@
+from typing import Callable
+
+import pytest
+from great_ai import MongoDbDriver, SqliteDriver, TracingDatabaseDriver
+from great_ai.persistence import trace_compressor
+from great_ai.persistence.trace_compressor import COMPRESSED_KEY, TraceCompressor
+from great_ai.views import Filter, SortBy
+from great_ai.views.outputs.sequence_labeling_output import (
+    LabeledToken,
+    SequenceLabelingOutput,
+)
+
+from conftest import create_trace
+
+trace = create_trace(
+    0,
+    trace_id="a",
+    logged_values={
+        "arg:text:value": "lorem ipsum " * 100,
+        "arg:language:value": "en",
+        "arg:length:value": 1200,
+    },
+    output=SequenceLabelingOutput(
+        labeled_tokens=[
+            LabeledToken(token="lorem", tag="O", confidence=0.5, explanation=None)
+        ]
+        * 50,
+        explanation=None,
+    ),
+    tags=["f"],
+)
+
+
+def test_only_large_payloads_are_compressed() -> None:
+    document = trace.dict()
+    compressed = TraceCompressor(threshold_in_bytes=100, algorithm="zlib").compress(
+        document
+    )
+
+    assert compressed["logged_values"]["arg:text:value"][COMPRESSED_KEY] == "zlib"
+    assert compressed["logged_values"]["arg:language:value"] == "en"
+    assert compressed["logged_values"]["arg:length:value"] == 1200
+    assert compressed["output"][COMPRESSED_KEY] == "zlib"
+    assert compressed["feedback"] is None
+    assert compressed["created"] == document["created"]
+
+    assert TraceCompressor.decompress(compressed) == document
+    assert TraceCompressor(threshold_in_bytes=None).compress(document) == document
+
+
+def test_base64() -> None:
+    document = trace.dict()
+    compressed = TraceCompressor(threshold_in_bytes=100, binary=False).compress(
+        document
+    )
+
+    assert isinstance(compressed["output"]["data"], str)
+    assert TraceCompressor.decompress(compressed) == document
+
+
+def test_zstd_falls_back_to_zlib(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(trace_compressor, "zstandard", None)
+
+    assert TraceCompressor(threshold_in_bytes=100, algorithm="zstd").algorithm == "zlib"
+
+
+def test_zstd() -> None:
+    pytest.importorskip("zstandard")
+    document = trace.dict()
+    compressed = TraceCompressor(threshold_in_bytes=100, algorithm="zstd").compress(
+        document
+    )
+
+    assert compressed["output"][COMPRESSED_KEY] == "zstd"
+    assert TraceCompressor.decompress(compressed) == document
+
+
+def test_sqlite_driver(create_driver: Callable[..., SqliteDriver]) -> None:
+    driver = create_driver("sqlite", compression_threshold_in_bytes=100)
+    driver.save(trace)
+
+    assert driver.get("a") == trace
+    assert driver.query(
+        conjunctive_filters=[
+            Filter(property="arg:length:value", operator=">", value=1000),
+            Filter(property="arg:language:value", operator="=", value="'en'"),
+        ]
+    )[0] == [trace]
+
+    (document,) = (
+        driver._get_connection().execute("SELECT document FROM traces").fetchone()
+    )
+    assert COMPRESSED_KEY in document
+    assert len(document) < len(trace.json()) / 2
+
+
+def test_mongodb_driver(create_driver: Callable[..., MongoDbDriver]) -> None:
+    driver = create_driver("mongo", compression_threshold_in_bytes=100)
+    driver.save(trace)
+
+    assert driver.get("a") == trace
+    assert list(driver.iter_query(conjunctive_tags=["f"])) == [trace]
+    assert isinstance(driver._get_collection().find_one("a")["output"]["data"], bytes)
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "mongo"])
+def test_filters_match_compressed_values(
+    kind: str, create_driver: Callable[..., TracingDatabaseDriver]
+) -> None:
+    driver = create_driver(kind, compression_threshold_in_bytes=100)
+    other = create_trace(1, logged_values={"arg:text:value": "dolor sit " * 100})
+    driver.save_batch([trace, other, create_trace(2), create_trace(3)])
+
+    for filter in [
+        Filter(property="arg:text:value", operator="contains", value="LOREM"),
+        Filter(property="output_flat", operator="contains", value="lorem"),
+        Filter(
+            property="arg:text:value",
+            operator="=",
+            value=trace.to_flat_dict()["arg:text:value"],
+        ),
+    ]:
+        assert driver.query(conjunctive_filters=[filter]) == ([trace], 1)
+        assert list(driver.iter_query(conjunctive_filters=[filter])) == [trace]
+
+    text_filter = Filter(property="arg:text:value", operator="contains", value="o")
+    assert driver.query(conjunctive_filters=[text_filter], take=1) == ([trace], 2)
+    assert driver.query(conjunctive_filters=[text_filter], skip=1) == ([other], 2)
+    assert driver.query(conjunctive_filters=[text_filter], take=1, count="none") == (
+        [trace],
+        None,
+    )
+
+    sort_by = [SortBy(column_id="created", direction="asc")]
+    token = driver.create_continuation_token(trace, sort_by)
+    assert driver.query(
+        conjunctive_filters=[text_filter], sort_by=sort_by, continuation_token=token
+    ) == ([other], 2)
+
+    assert driver.delete_where(conjunctive_filters=[text_filter]) == 2
+    assert [t.trace_id for t in driver.query()[0]] == ["02", "03"]
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+from uuid import UUID
+
+import pytest
+from great_ai import (
+    GreatAI,
+    MongoDbDriver,
+    ParallelTinyDbDriver,
+    add_ground_truth,
+    configure,
+    generate_time_ordered_trace_id,
+    query_ground_truth,
+)
+from great_ai.persistence.get_trace_id_range import get_trace_id_range
+
+from conftest import create_trace, first_created
+
+
+def get_created(minute: int) -> datetime:
+    return first_created + timedelta(minutes=minute, microseconds=999)
+
+
+traces = [
+    create_trace(
+        minute,
+        trace_id=generate_time_ordered_trace_id(get_created(minute)),
+        created=get_created(minute).isoformat(),
+    )
+    for minute in range(10)
+]
+
+
+@pytest.fixture
+def mongo_driver(create_driver: Callable[..., MongoDbDriver]) -> MongoDbDriver:
+    return create_driver("mongo", time_ordered_ids=True)
+
+
+def test_time_ordered_ids_follow_creation_time() -> None:
+    shuffled = [traces[minute] for minute in [5, 1, 3, 2, 4]]
+
+    assert sorted(t.trace_id for t in shuffled) == [
+        t.trace_id for t in sorted(shuffled, key=lambda t: t.created)
+    ]
+    assert all(UUID(t.trace_id).version == 7 for t in shuffled)
+
+    for trace in shuffled:
+        created = datetime.fromisoformat(trace.created)
+        lower, upper = get_trace_id_range(since=created, until=created)
+        assert lower is not None and upper is not None
+        assert lower <= trace.trace_id < upper
+
+        lower, upper = get_trace_id_range(
+            since=created + timedelta(milliseconds=1),
+            until=created - timedelta(milliseconds=1),
+        )
+        assert lower is not None and upper is not None
+        assert not lower <= trace.trace_id and not trace.trace_id < upper
+
+
+def test_mongo_uses_id_ranges(mongo_driver: MongoDbDriver) -> None:
+    mongo_driver.save_batch(traces)
+
+    conditions = mongo_driver._get_conditions(
+        conjunctive_filters=[],
+        conjunctive_tags=[],
+        since=first_created,
+        until=None,
+        has_feedback=None,
+    )
+    assert {
+        "_id": {"$gte": get_trace_id_range(since=first_created, until=None)[0]}
+    } in (conditions)
+
+    result, count = mongo_driver.query(
+        since=first_created + timedelta(minutes=2, microseconds=999),
+        until=first_created + timedelta(minutes=4, microseconds=999),
+    )
+    assert [t.output for t in result] == [2, 3, 4]
+    assert count == 3
+
+    assert (
+        mongo_driver.delete_where(
+            until=first_created + timedelta(minutes=4, microseconds=998)
+        )
+        == 4
+    )
+    assert [t.output for t in mongo_driver.iter_query()] == [4, 5, 6, 7, 8, 9]
+
+
+def test_configured_trace_id_generator(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    configure(
+        tracing_database_factory=ParallelTinyDbDriver,
+        trace_id_generator=generate_time_ordered_trace_id,
+    )
+    monkeypatch.setattr(ParallelTinyDbDriver, "path_to_db", tmp_path / "db.json")
+
+    try:
+
+        @GreatAI.create
+        def trace_id_test_function(x: int) -> int:
+            return x
+
+        trace = trace_id_test_function(1)
+        assert UUID(trace.trace_id).version == 7
+
+        add_ground_truth([1, 2], [3, 4])
+        assert all(UUID(t.trace_id).version == 7 for t in query_ground_truth())
+    finally:
+        configure(tracing_database_factory=ParallelTinyDbDriver)
@@ -0,0 +1,223 @@
+import os
+import threading
+from datetime import timedelta
+from multiprocessing import Lock
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import pytest
+from great_ai import ParallelTinyDbDriver
+from great_ai.persistence.file_lock import FileLock
+from great_ai.persistence.trace_log import TraceLog
+from great_ai.views import Filter
+
+from conftest import create_trace, first_created
+
+lock = Lock()
+
+
+def ids(result: Tuple[List[dict], int]) -> List[str]:
+    documents, count = result
+    assert len(documents) == count
+    return [d["trace_id"] for d in documents]
+
+
+def test_indexes(tmp_path: Path) -> None:
+    log = TraceLog(tmp_path / "traces.jsonl", lock)
+    log.append(
+        [
+            create_trace(0, trace_id="a", tags=["f", "online"]),
+            create_trace(1, trace_id="b", tags=["f", "ground_truth"], feedback=1),
+            create_trace(2, trace_id="c", tags=["g", "online"]),
+        ]
+    )
+
+    assert ids(log.select()) == ["a", "b", "c"]
+    assert ids(log.select(tags=["online", "f"])) == ["a"]
+    assert ids(log.select(since=first_created + timedelta(minutes=1))) == ["b", "c"]
+    assert ids(log.select(until=first_created + timedelta(minutes=1))) == ["a", "b"]
+    assert ids(log.select(has_feedback=True)) == ["b"]
+    assert ids(log.select(tags=["f"], has_feedback=False)) == ["a"]
+    assert ids(log.select(tags=["unknown"])) == []
+    assert log.select(tags=["online"], skip=1, take=5)[0][0]["trace_id"] == "c"
+    assert log.select(tags=["online"], skip=1, take=5)[1] == 2
+
+    b = log.get("b")
+    assert b is not None and b["feedback"] == 1
+    assert log.get("unknown") is None
+
+
+def test_updates_and_deletes_only_append(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    log = TraceLog(path, lock)
+    log.append(
+        [
+            create_trace(0, trace_id="a", tags=["f"]),
+            create_trace(0, trace_id="b", tags=["f"]),
+        ]
+    )
+
+    log.append([create_trace(0, trace_id="a", tags=["g"], feedback="good")])
+    log.delete(["b", "unknown"])
+
+    assert ids(log.select()) == ["a"]
+    assert ids(log.select(tags=["f"])) == []
+    assert ids(log.select(tags=["g"], has_feedback=True)) == ["a"]
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_incremental_reload(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    writer = TraceLog(path, lock)
+    reader = TraceLog(path, lock)
+
+    writer.append([create_trace(0, trace_id="a", tags=["f"])])
+    assert ids(reader.select(tags=["f"])) == ["a"]
+
+    writer.append([create_trace(0, trace_id="b", tags=["f"])])
+    writer.delete(["a"])
+    assert ids(reader.select(tags=["f"])) == ["b"]
+
+
+def test_compaction(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    log = TraceLog(path, lock)
+    other = TraceLog(path, lock)
+
+    log.append([create_trace(i, trace_id=str(i), tags=["f"]) for i in range(10)])
+    log.delete([str(i) for i in range(0, 10, 2)])
+    log.append([create_trace(1, trace_id="1", tags=["g"])])
+    assert ids(other.select()) == ["1", "3", "5", "7", "9"]
+
+    log.compact()
+
+    assert len(path.read_text().splitlines()) == 5
+    assert ids(log.select(tags=["g"])) == ["1"]
+    assert ids(log.select(tags=["f"])) == ["3", "5", "7", "9"]
+    assert ids(other.select(tags=["f"])) == ["3", "5", "7", "9"]
+
+    log.append([create_trace(10, trace_id="10", tags=["f"])])
+    assert ids(other.select(since=first_created + timedelta(minutes=9))) == ["9", "10"]
+
+
+def test_compaction_is_exclusive_across_processes(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    log = TraceLog(path, lock)
+    log.append([create_trace(i, trace_id="a", tags=["f"]) for i in range(10)])
+    # the temporary files of other processes must be left intact
+    (tmp_path / "traces.jsonl.compacting").write_text("other")
+
+    with FileLock(tmp_path / "traces.jsonl.compaction.lock"):
+        log.compact()
+    assert len(path.read_text().splitlines()) == 10
+
+    log.compact()
+    assert len(path.read_text().splitlines()) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "traces.jsonl",
+        "traces.jsonl.compacting",
+        "traces.jsonl.compaction.lock",
+        "traces.jsonl.lock",
+    ]
+    assert (tmp_path / "traces.jsonl.compacting").read_text() == "other"
+
+
+def test_independent_processes(tmp_path: Path) -> None:
+    path = tmp_path / "traces.jsonl"
+    # separate locks as in independently started processes
+    log = TraceLog(path, Lock())
+    other = TraceLog(path, Lock())
+
+    for i in range(10):
+        (log if i % 2 else other).append([create_trace(i, trace_id=str(i))])
+    log.delete([str(i) for i in range(0, 10, 2)])
+
+    for id in ["1", "3", "5", "7", "9"]:
+        for instance in [log, other]:
+            trace = instance.get(id)
+            assert trace is not None and trace["trace_id"] == id
+
+
+def test_appends_wait_for_the_compaction(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "traces.jsonl"
+    log = TraceLog(path, Lock())
+    other = TraceLog(path, Lock())
+    log.append([create_trace(i, trace_id="a") for i in range(10)])
+
+    replace = os.replace
+    appending: List[threading.Thread] = []
+
+    def replace_while_appending(source: Path, target: Path) -> None:
+        thread = threading.Thread(
+            target=lambda: other.append([create_trace(99, trace_id="99")])
+        )
+        thread.start()
+        thread.join(timeout=0.2)
+        appending.append(thread)
+        replace(source, target)
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "replace", replace_while_appending)
+        log.compact()
+
+    [thread] = appending
+    thread.join()
+    for instance in [log, other, TraceLog(path, Lock())]:
+        assert ids(instance.select()) == ["a", "99"]
+        trace = instance.get("99")
+        assert trace is not None and trace["trace_id"] == "99"
+
+
+def test_compaction_in_background(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(TraceLog, "min_obsolete_lines_before_compaction", 10)
+    path = tmp_path / "traces.jsonl"
+    log = TraceLog(path, lock)
+
+    for i in range(30):
+        log.append([create_trace(i, trace_id="a", tags=["f"])])
+
+    for _ in range(100):
+        if len(path.read_text().splitlines()) < 30:
+            break
+        log.get("a")  # wait for the compaction thread
+    else:
+        pytest.fail("The log has not been compacted")
+
+    trace = log.get("a")
+    assert trace is not None and trace["output"] == 29
+
+
+def test_driver_in_jsonl_mode(
+    tmp_path: Path, create_driver: Callable[..., ParallelTinyDbDriver]
+) -> None:
+    driver = create_driver("jsonl")
+
+    driver.save_batch(
+        [
+            create_trace(0, trace_id="a", tags=["f"]),
+            create_trace(0, trace_id="b", tags=["f"]),
+        ]
+    )
+    driver.save(create_trace(1, trace_id="c", tags=["g"]))
+    driver.update("a", create_trace(2, trace_id="a", tags=["f"], feedback=True))
+    driver.delete("b")
+
+    assert (tmp_path / "db.jsonl").exists()
+    assert not (tmp_path / "db.json").exists()
+
+    a = driver.get("a")
+    assert a is not None and a.feedback is True
+
+    traces, count = driver.query(
+        conjunctive_tags=["f"],
+        conjunctive_filters=[Filter(property="output", operator=">", value=1)],
+    )
+    assert [t.trace_id for t in traces] == ["a"]
+    assert count == 1
+
+    driver.delete_batch(["a", "c"])
+    assert driver.query() == ([], 0)
@@ -0,0 +1,173 @@
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+from fastapi.testclient import TestClient
+from great_ai import (
+    GreatAI,
+    ParallelTinyDbDriver,
+    PersistencePolicy,
+    TracingDatabaseDriver,
+    configure,
+)
+from great_ai.persistence.trace_aggregator import TraceAggregator
+from great_ai.persistence.trace_writer import TraceWriter
+from great_ai.views import Model, QuantileSketch, TraceStatisticsBucket
+
+from conftest import create_trace
+
+logger = logging.getLogger("test")
+
+
+models = [Model(key="my-model", version=3)]
+
+
+@pytest.fixture(params=["memory", "json", "sqlite", "mongo"])
+def driver(
+    request: Any, create_driver: Callable[..., TracingDatabaseDriver]
+) -> TracingDatabaseDriver:
+    if request.param == "memory":
+
+        class InMemoryDriver(ParallelTinyDbDriver):
+            merge_statistics = TracingDatabaseDriver.merge_statistics
+            get_statistics = TracingDatabaseDriver.get_statistics
+
+        create_driver("json")
+        return InMemoryDriver()
+
+    return create_driver(request.param)
+
+
+def test_sketches_are_mergeable() -> None:
+    a = QuantileSketch()
+    b = QuantileSketch()
+    for i in range(1000):
+        (a if i % 2 else b).add(i)
+
+    a.merge(b)
+
+    assert a.count == 1000
+    assert a.zero_count == 1
+    assert abs(a.quantile(0.9) - 899) / 899 <= 0.01  # type: ignore
+    assert a.quantile(0) == 0
+
+
+def test_statistics_are_merged_in_the_database(driver: TracingDatabaseDriver) -> None:
+    first = TraceStatisticsBucket(start="2022-07-11T14:00:00")
+    first.add(create_trace(10, models=models, tags=["a.b", "$c"]))
+    first.add(create_trace(20, models=models, exception="ValueError"))
+    second = TraceStatisticsBucket(start="2022-07-11T14:00:00")
+    second.add(create_trace(30, models=models, tags=["a.b"]))
+    second.add_feedback(create_trace(30, models=models, tags=["a.b"]), 1)
+    later = TraceStatisticsBucket(start="2022-07-11T14:05:00")
+    later.add(create_trace(40, models=models))
+
+    driver.merge_statistics([first])
+    driver.merge_statistics([second, later])
+
+    buckets = driver.get_statistics()
+    assert [b.start for b in buckets] == ["2022-07-11T14:00:00", "2022-07-11T14:05:00"]
+
+    bucket = buckets[0]
+    assert bucket.overall.count == 3
+    assert bucket.overall.error_count == 1
+    assert bucket.overall.feedback_count == 1
+    assert bucket.overall.execution_time_ms.count == 3
+    assert bucket.by_tag["a.b"].count == 2
+    assert bucket.by_tag["$c"].count == 1
+    assert bucket.by_model["my-model:3"].count == 3
+
+    assert [
+        b.start
+        for b in driver.get_statistics(
+            since=datetime(2022, 7, 11, 14, 5), until=datetime(2022, 7, 11, 15)
+        )
+    ] == ["2022-07-11T14:05:00"]
+    assert driver.get_statistics(until=datetime(2022, 7, 11, 14)) == []
+
+
+def test_statistics_are_cumulative(driver: TracingDatabaseDriver) -> None:
+    traces = [create_trace(1), create_trace(2)]
+    bucket = TraceStatisticsBucket(start="2022-07-11T14:00:00")
+    for trace in traces:
+        bucket.add(trace)
+    driver.save_batch(traces)
+    driver.merge_statistics([bucket])
+
+    driver.delete("01")
+    driver.prune(datetime(2023, 1, 1))
+
+    assert driver.query() == ([], 0)
+    assert [b.overall.count for b in driver.get_statistics()] == [2]
+
+
+@pytest.mark.parametrize("storage_mode", ["json", "jsonl"])
+def test_tinydb_stores_the_statistics_in_its_database(
+    storage_mode: str,
+    tmp_path: Path,
+    create_driver: Callable[..., TracingDatabaseDriver],
+) -> None:
+    driver = create_driver(storage_mode)
+    driver.merge_statistics([TraceStatisticsBucket(start="2022-07-11T14:00:00")])
+
+    assert len(driver.get_statistics()) == 1
+    assert {p.name for p in tmp_path.iterdir()} <= {"db.json", "db.jsonl"}
+
+
+def test_trace_writer_aggregates_sampled_out_traces(
+    driver: TracingDatabaseDriver,
+) -> None:
+    aggregator = TraceAggregator(driver, logger=logger, flush_interval_seconds=1e6)
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        policy=PersistencePolicy(sample_rate=0),
+        aggregator=aggregator,
+    )
+
+    writer.save([create_trace(i) for i in range(1, 11)])
+    assert driver.get_statistics() == []
+
+    aggregator.flush()
+
+    assert writer.statistics.sampled_out == 10
+    assert [(b.start, b.overall.count) for b in driver.get_statistics()] == [
+        ("2022-07-11T14:00:00", 4),
+        ("2022-07-11T14:05:00", 5),
+        ("2022-07-11T14:10:00", 1),
+    ]
+
+
+def test_stats_endpoint(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    configure(tracing_database_factory=ParallelTinyDbDriver)
+    # the pending statistics of the previous tests are flushed by `configure`
+    monkeypatch.setattr(ParallelTinyDbDriver, "path_to_db", tmp_path / "db.json")
+
+    @GreatAI.create
+    def statistics_test_function(x: int) -> int:
+        if x < 0:
+            raise ValueError(x)
+        return x + 2
+
+    client = TestClient(statistics_test_function.app)
+    for x in [1, 2, 3, -1]:
+        client.post("/predict", json={"x": x})
+
+    response = client.get("/traces/stats", params={"quantiles": [0.5]})
+    assert response.status_code == 200
+
+    [statistics] = response.json()
+    assert statistics["count"] == 4
+    assert statistics["error_rate"] == 0.25
+    assert statistics["feedback_coverage"] == 0
+    assert set(statistics["execution_time_ms"]) == {"p50"}
+    assert statistics["by_tag"]["statistics_test_function"]["count"] == 4
+
+    response = client.get("/traces/stats", params={"bucket_minutes": 60})
+    assert response.status_code == 200
+    assert sum(s["count"] for s in response.json()) == 4
+
+    assert client.get("/traces/stats", params={"bucket_minutes": 7}).status_code == 400
+    assert client.get("/traces/stats", params={"quantiles": [2]}).status_code == 400
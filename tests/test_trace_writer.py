@@ -0,0 +1,164 @@
+import logging
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from great_ai import Trace, TracingDatabaseDriver, WriteBehindConfig
+from great_ai.persistence.trace_writer import TraceWriter
+
+logger = logging.getLogger("test")
+
+
+class RecordingDriver(TracingDatabaseDriver):
+    is_production_ready = False
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: List[List[str]] = []
+
+    def save(self, document: Trace) -> str:
+        self.batches.append([document.trace_id])
+        return document.trace_id
+
+    def save_batch(self, documents: List[Trace]) -> List[str]:
+        self.batches.append([d.trace_id for d in documents])
+        return [d.trace_id for d in documents]
+
+    def get(self, id: str) -> Optional[Trace]:
+        raise NotImplementedError()
+
+    def query(self, **_: Any) -> Tuple[List[Trace], int]:
+        raise NotImplementedError()
+
+    def update(self, id: str, new_version: Trace) -> None:
+        raise NotImplementedError()
+
+    def delete(self, id: str) -> None:
+        raise NotImplementedError()
+
+    def delete_batch(self, ids: List[str]) -> None:
+        raise NotImplementedError()
+
+
+def get_traces(count: int) -> List[Trace]:
+    return [
+        Trace(
+            trace_id=str(i),
+            created=datetime.utcnow().isoformat(),
+            original_execution_time_ms=0,
+            logged_values={},
+            models=[],
+            exception=None,
+            output=i,
+            tags=[],
+        )
+        for i in range(count)
+    ]
+
+
+def test_synchronous() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(driver, logger=logger)
+
+    writer.save(get_traces(1))
+    writer.save(get_traces(2))
+
+    assert driver.batches == [["0"], ["0", "1"]]
+    assert writer.statistics.saved == 3
+
+
+def test_write_behind_flush() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        config=WriteBehindConfig(max_batch_size=100, flush_interval_ms=60 * 1000),
+    )
+
+    for trace in get_traces(10):
+        writer.save([trace])
+    assert driver.batches == []
+
+    writer.flush()
+    assert driver.batches == [[str(i) for i in range(10)]]
+
+    statistics = writer.statistics
+    assert statistics.saved == 10
+    assert statistics.queued == 0
+    assert statistics.flushes == 1
+
+    writer.close()
+
+
+def test_write_behind_batch_size() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        config=WriteBehindConfig(max_batch_size=4, flush_interval_ms=60 * 1000),
+    )
+
+    writer.save(get_traces(10))
+    writer.close()
+
+    assert sum(len(b) for b in driver.batches) == 10
+    assert all(len(b) <= 4 for b in driver.batches)
+
+
+def test_drop_newest() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        config=WriteBehindConfig(
+            max_batch_size=100,
+            flush_interval_ms=60 * 1000,
+            max_queue_size=3,
+            overflow_policy="drop_newest",
+        ),
+    )
+
+    writer.save(get_traces(5))
+    writer.close()
+
+    assert driver.batches == [["0", "1", "2"]]
+    assert writer.statistics.dropped == 2
+
+
+def test_drop_oldest() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        config=WriteBehindConfig(
+            max_batch_size=100,
+            flush_interval_ms=60 * 1000,
+            max_queue_size=3,
+            overflow_policy="drop_oldest",
+        ),
+    )
+
+    writer.save(get_traces(5))
+    writer.close()
+
+    assert driver.batches == [["2", "3", "4"]]
+    assert writer.statistics.dropped == 2
+
+
+def test_save_synchronously_on_overflow() -> None:
+    driver = RecordingDriver()
+    writer = TraceWriter(
+        driver,
+        logger=logger,
+        config=WriteBehindConfig(
+            max_batch_size=100,
+            flush_interval_ms=60 * 1000,
+            max_queue_size=3,
+            overflow_policy="save_synchronously",
+        ),
+    )
+
+    writer.save(get_traces(5))
+    assert driver.batches == [["3", "4"]]
+
+    writer.close()
+    assert driver.batches == [["3", "4"], ["0", "1", "2"]]
@@ -0,0 +1,64 @@
+import asyncio
+from itertools import count
+from typing import Iterator, List
+
+import pytest
+from great_ai.utilities import async_parallel_map
+
+
+@pytest.mark.asyncio
+async def test_order_is_preserved() -> None:
+    async def f(x: int) -> int:
+        await asyncio.sleep(0.01 * (x % 3))
+        return x**2
+
+    assert [v async for v in async_parallel_map(f, range(20), concurrency=4)] == [
+        x**2 for x in range(20)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_unordered() -> None:
+    async def f(x: int) -> int:
+        await asyncio.sleep(0.1 if x == 0 else 0)
+        return x
+
+    results = [
+        v async for v in async_parallel_map(f, range(5), concurrency=5, unordered=True)
+    ]
+    assert results[-1] == 0
+    assert sorted(results) == list(range(5))
+
+
+@pytest.mark.asyncio
+async def test_inputs_are_read_lazily() -> None:
+    read: List[int] = []
+
+    def inputs() -> Iterator[int]:
+        for i in count():
+            read.append(i)
+            yield i
+
+    async def f(x: int) -> int:
+        await asyncio.sleep(0)
+        return x
+
+    results = []
+    async for v in async_parallel_map(f, inputs(), concurrency=2):
+        results.append(v)
+        if len(results) == 10:
+            break
+
+    assert results == list(range(10))
+    assert len(read) <= 10 + 2 * 2
+
+
+@pytest.mark.asyncio
+async def test_exception_is_propagated() -> None:
+    async def f(x: int) -> int:
+        if x == 3:
+            raise ValueError("oh no")
+        return x
+
+    with pytest.raises(ValueError):
+        [v async for v in async_parallel_map(f, range(10))]
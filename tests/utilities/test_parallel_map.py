@@ -28,6 +28,14 @@ def test_with_iterable() -> None:
     )
 
 
+def test_stopping_early() -> None:
+    from itertools import count
+
+    results = parallel_map(lambda x: x * 2, count(), chunk_size=10, concurrency=2)
+    assert [v for v, _ in zip(results, range(5))] == [0, 2, 4, 6, 8]
+    results.close()  # type: ignore
+
+
 def test_simple_case_invalid_values() -> None:
     with pytest.raises(AssertionError):
         list(parallel_map(lambda v: v**2, range(COUNT), concurrency=0))